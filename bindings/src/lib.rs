@@ -0,0 +1,400 @@
+//! In-process Python bindings for the zkml chunk prover.
+//!
+//! Exposes `zkml::utils::proving_kzg` to Python as the `zkml_native` extension module,
+//! so Ray actors can prove chunks without spawning `prove_chunk` and without going
+//! through proof files on disk. `evaluate_dag` computes a model's activations without
+//! proving, and `chunk_boundaries` the inputs of chunks from them.
+//!
+//! Build with: cd bindings && maturin develop --release
+//!
+//! Results are returned as dicts with the same keys as `result.json`, plus:
+//!   - proof: The proof bytes
+//!   - public_vals: Public values as concatenated 32-byte field elements
+//!   - vk: The serialized verifying key when verification is deferred, else None
+//!   - boundary: The tensors live after the chunk, msgpack-encoded like an input file
+//!   - boundaries: For multi-input proofs, the boundary of each input
+
+use std::fs;
+use std::panic::{self, AssertUnwindSafe};
+
+use halo2_proofs::halo2curves::bn256::Fr;
+use halo2_proofs::halo2curves::ff::PrimeField;
+use pyo3::exceptions::{PyRuntimeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict};
+
+use zkml::model::ModelCircuit;
+use zkml::utils::loader::{encode_input_msgpack, load_model_msgpack};
+use zkml::utils::proving_kzg::{ChunkProver, MultiProofResult, SetupTimings};
+use zkml::utils::witness::{
+    activations_to_msgpack, boundary_from_activations, evaluate_dag as evaluate_model_dag,
+};
+
+fn hex_to_fr(hex: &str) -> PyResult<Fr> {
+    // Remove 0x prefix if present
+    let hex = hex.strip_prefix("0x").unwrap_or(hex);
+
+    if hex.len() != 64 {
+        return Err(PyValueError::new_err(
+            "prev_merkle_root must be 64 hex characters (32 bytes)",
+        ));
+    }
+
+    let bytes = hex::decode(hex).map_err(|e| PyValueError::new_err(e.to_string()))?;
+    let arr: [u8; 32] = bytes.try_into().unwrap();
+    Option::from(Fr::from_repr(arr))
+        .ok_or_else(|| PyValueError::new_err("prev_merkle_root is not a valid field element"))
+}
+
+fn fr_to_hex(fr: &Fr) -> String {
+    format!("0x{}", hex::encode(fr.to_repr()))
+}
+
+fn panic_message(err: Box<dyn std::any::Any + Send>) -> String {
+    if let Some(msg) = err.downcast_ref::<&str>() {
+        msg.to_string()
+    } else if let Some(msg) = err.downcast_ref::<String>() {
+        msg.clone()
+    } else {
+        "prover panicked".to_string()
+    }
+}
+
+fn result_to_dict(
+    py: Python<'_>,
+    result: &MultiProofResult,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_merkle_root: Option<String>,
+) -> PyResult<PyObject> {
+    let public_vals: Vec<u8> = result
+        .instances
+        .iter()
+        .flat_map(|instance| instance.public_vals.iter())
+        .flat_map(|val| val.to_repr())
+        .collect();
+    let merkle_roots: Vec<Option<String>> = result
+        .instances
+        .iter()
+        .map(|instance| instance.merkle_root.as_ref().map(fr_to_hex))
+        .collect();
+    let boundaries: Vec<Bound<'_, PyBytes>> = result
+        .instances
+        .iter()
+        .map(|instance| PyBytes::new_bound(py, &encode_input_msgpack(&instance.boundary)))
+        .collect();
+
+    let dict = PyDict::new_bound(py);
+    dict.set_item("chunk_start", chunk_start)?;
+    dict.set_item("chunk_end", chunk_end)?;
+    dict.set_item("use_merkle", use_merkle)?;
+    dict.set_item("prev_merkle_root", prev_merkle_root)?;
+    dict.set_item("merkle_root", merkle_roots[0].clone())?;
+    dict.set_item("proving_time_ms", result.proving_time_ms as u64)?;
+    dict.set_item("verify_time_ms", result.verify_time_ms as u64)?;
+    dict.set_item("proof_size_bytes", result.proof.len())?;
+    dict.set_item("public_vals_count", result.instances[0].public_vals.len())?;
+    dict.set_item("load_time_ms", result.load_time_ms as u64)?;
+    dict.set_item("params_time_ms", result.params_time_ms as u64)?;
+    dict.set_item("keygen_vk_time_ms", result.keygen_vk_time_ms as u64)?;
+    dict.set_item("keygen_pk_time_ms", result.keygen_pk_time_ms as u64)?;
+    dict.set_item("key_load_time_ms", result.key_load_time_ms as u64)?;
+    dict.set_item("witness_time_ms", result.witness_time_ms as u64)?;
+    dict.set_item("k", result.k)?;
+    dict.set_item("rows_used", result.rows_used)?;
+    dict.set_item("peak_rss_bytes", result.peak_rss_bytes)?;
+    dict.set_item("proof", PyBytes::new_bound(py, &result.proof))?;
+    dict.set_item("public_vals", PyBytes::new_bound(py, &public_vals))?;
+    dict.set_item("vk", result.vk.as_ref().map(|vk| PyBytes::new_bound(py, vk)))?;
+    dict.set_item("num_instances", result.instances.len())?;
+    dict.set_item("merkle_roots", merkle_roots)?;
+    dict.set_item("boundary", boundaries[0].clone())?;
+    dict.set_item("boundaries", boundaries)?;
+    Ok(dict.into_any().unbind())
+}
+
+fn set_timings(dict: &Bound<'_, PyDict>, timings: &SetupTimings) -> PyResult<()> {
+    dict.set_item("load_time_ms", timings.load_time_ms as u64)?;
+    dict.set_item("params_time_ms", timings.params_time_ms as u64)?;
+    dict.set_item("keygen_vk_time_ms", timings.keygen_vk_time_ms as u64)?;
+    dict.set_item("keygen_pk_time_ms", timings.keygen_pk_time_ms as u64)?;
+    dict.set_item("key_load_time_ms", timings.key_load_time_ms as u64)?;
+    dict.set_item("witness_time_ms", timings.witness_time_ms as u64)?;
+    Ok(())
+}
+
+/// Chunk prover that keeps model configs, KZG params and proving keys resident.
+///
+/// Proving releases the GIL, so other Python threads keep running. With `check=True`
+/// each circuit is first checked with MockProver (slow; for debugging circuits).
+/// `k` and `num_cols` override the per-chunk k and the model's column count.
+/// With `low_memory=True` nothing is kept resident between proofs.
+#[pyclass(name = "ChunkProver")]
+struct PyChunkProver {
+    inner: ChunkProver,
+}
+
+#[pymethods]
+impl PyChunkProver {
+    #[new]
+    #[pyo3(signature = (params_dir = "./params_kzg", verify = true, check = false, k = None, num_cols = None, low_memory = false))]
+    fn new(
+        params_dir: &str,
+        verify: bool,
+        check: bool,
+        k: Option<u32>,
+        num_cols: Option<usize>,
+        low_memory: bool,
+    ) -> PyResult<Self> {
+        fs::create_dir_all(params_dir).map_err(|e| PyRuntimeError::new_err(e.to_string()))?;
+        let mut inner = ChunkProver::new(params_dir);
+        inner.set_verify(verify);
+        inner.set_check(check);
+        inner.set_k(k);
+        inner.set_num_cols(num_cols);
+        inner.set_low_memory(low_memory);
+        Ok(Self { inner })
+    }
+
+    /// Generate and verify a KZG proof for layers [chunk_start, chunk_end)
+    #[pyo3(signature = (config_path, input_path, chunk_start, chunk_end, use_merkle = false, prev_merkle_root = None))]
+    fn prove(
+        &mut self,
+        py: Python<'_>,
+        config_path: &str,
+        input_path: &str,
+        chunk_start: usize,
+        chunk_end: usize,
+        use_merkle: bool,
+        prev_merkle_root: Option<String>,
+    ) -> PyResult<PyObject> {
+        let prev_root = prev_merkle_root.as_deref().map(hex_to_fr).transpose()?;
+
+        let inner = &mut self.inner;
+        let result = py
+            .allow_threads(|| {
+                panic::catch_unwind(AssertUnwindSafe(|| {
+                    inner.prove_multi(
+                        config_path,
+                        &[(input_path, prev_root)],
+                        chunk_start,
+                        chunk_end,
+                        use_merkle,
+                    )
+                }))
+            })
+            .map_err(|err| PyRuntimeError::new_err(panic_message(err)))?;
+
+        result_to_dict(
+            py,
+            &result,
+            chunk_start,
+            chunk_end,
+            use_merkle,
+            prev_merkle_root,
+        )
+    }
+
+    /// Prove several inputs of layers [chunk_start, chunk_end) in one proof.
+    ///
+    /// `prev_merkle_roots` is None or one root per input. `public_vals` concatenates
+    /// each input's public values, and `merkle_roots` and `boundaries` are per input.
+    #[pyo3(signature = (config_path, input_paths, chunk_start, chunk_end, use_merkle = false, prev_merkle_roots = None))]
+    fn prove_multi(
+        &mut self,
+        py: Python<'_>,
+        config_path: &str,
+        input_paths: Vec<String>,
+        chunk_start: usize,
+        chunk_end: usize,
+        use_merkle: bool,
+        prev_merkle_roots: Option<Vec<String>>,
+    ) -> PyResult<PyObject> {
+        let prev_roots: Vec<Option<Fr>> = match &prev_merkle_roots {
+            Some(roots) if roots.len() != input_paths.len() => {
+                return Err(PyValueError::new_err(
+                    "prev_merkle_roots must have one root per input",
+                ))
+            }
+            Some(roots) => roots
+                .iter()
+                .map(|root| hex_to_fr(root).map(Some))
+                .collect::<PyResult<_>>()?,
+            None => vec![None; input_paths.len()],
+        };
+        if input_paths.is_empty() {
+            return Err(PyValueError::new_err("input_paths is empty"));
+        }
+        let inputs: Vec<(&str, Option<Fr>)> = input_paths
+            .iter()
+            .map(|path| path.as_str())
+            .zip(prev_roots)
+            .collect();
+
+        let inner = &mut self.inner;
+        let result = py
+            .allow_threads(|| {
+                panic::catch_unwind(AssertUnwindSafe(|| {
+                    inner.prove_multi(config_path, &inputs, chunk_start, chunk_end, use_merkle)
+                }))
+            })
+            .map_err(|err| PyRuntimeError::new_err(panic_message(err)))?;
+
+        result_to_dict(
+            py,
+            &result,
+            chunk_start,
+            chunk_end,
+            use_merkle,
+            prev_merkle_roots.and_then(|roots| roots.into_iter().next()),
+        )
+    }
+
+    /// Load the config, params and proving key for layers [chunk_start, chunk_end)
+    /// without proving. k is picked for input_path, so pass a representative input.
+    ///
+    /// Returns {k, rows_used} and the setup timings (load_time_ms, params_time_ms, ...).
+    #[pyo3(signature = (config_path, input_path, chunk_start, chunk_end, use_merkle = false, prev_merkle_root = None))]
+    fn warmup(
+        &mut self,
+        py: Python<'_>,
+        config_path: &str,
+        input_path: &str,
+        chunk_start: usize,
+        chunk_end: usize,
+        use_merkle: bool,
+        prev_merkle_root: Option<String>,
+    ) -> PyResult<PyObject> {
+        let prev_root = prev_merkle_root.as_deref().map(hex_to_fr).transpose()?;
+
+        let inner = &mut self.inner;
+        let result = py
+            .allow_threads(|| {
+                panic::catch_unwind(AssertUnwindSafe(|| {
+                    inner.warmup(
+                        config_path,
+                        input_path,
+                        chunk_start,
+                        chunk_end,
+                        use_merkle,
+                        prev_root,
+                    )
+                }))
+            })
+            .map_err(|err| PyRuntimeError::new_err(panic_message(err)))?;
+
+        let dict = PyDict::new_bound(py);
+        dict.set_item("k", result.k)?;
+        dict.set_item("rows_used", result.rows_used)?;
+        set_timings(&dict, &result.timings)?;
+        Ok(dict.into_any().unbind())
+    }
+
+    /// What the prover keeps resident: {configs, params_ks, proving_keys, rss_bytes,
+    /// peak_rss_bytes}
+    fn memory_report(&self, py: Python<'_>) -> PyResult<PyObject> {
+        let report = self.inner.memory_report();
+        let dict = PyDict::new_bound(py);
+        dict.set_item("configs", report.configs)?;
+        dict.set_item("params_ks", report.params_ks)?;
+        dict.set_item("proving_keys", report.proving_keys)?;
+        dict.set_item("rss_bytes", report.rss_bytes)?;
+        dict.set_item("peak_rss_bytes", report.peak_rss_bytes)?;
+        Ok(dict.into_any().unbind())
+    }
+}
+
+/// Generate and verify a KZG proof for layers [chunk_start, chunk_end).
+///
+/// Equivalent to running the `prove_chunk` binary, without the process or file I/O.
+#[pyfunction]
+#[pyo3(signature = (config_path, input_path, chunk_start, chunk_end, use_merkle = false, prev_merkle_root = None, params_dir = "./params_kzg"))]
+fn prove_chunk(
+    py: Python<'_>,
+    config_path: &str,
+    input_path: &str,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_merkle_root: Option<String>,
+    params_dir: &str,
+) -> PyResult<PyObject> {
+    PyChunkProver::new(params_dir, true, false, None, None, true)?.prove(
+        py,
+        config_path,
+        input_path,
+        chunk_start,
+        chunk_end,
+        use_merkle,
+        prev_merkle_root,
+    )
+}
+
+/// Compute the outputs of every layer of the model for an input, without proving.
+///
+/// Returns {tensor_idx: (shape, data)} with data as a flat list of ints.
+#[pyfunction]
+fn evaluate_dag(py: Python<'_>, config_path: &str, input_path: &str) -> PyResult<PyObject> {
+    let tensors = py
+        .allow_threads(|| {
+            panic::catch_unwind(|| {
+                let config = load_model_msgpack(config_path, input_path);
+                let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, true);
+                evaluate_model_dag(&circuit).map(|activations| activations_to_msgpack(&activations))
+            })
+        })
+        .map_err(|err| PyRuntimeError::new_err(panic_message(err)))?
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+
+    let dict = PyDict::new_bound(py);
+    for tensor in tensors {
+        dict.set_item(tensor.idx, (tensor.shape, tensor.data))?;
+    }
+    Ok(dict.into_any().unbind())
+}
+
+/// The boundary a chunk ending at each layer in `ends` would write, from one evaluation
+/// of the whole model: the input of the chunk starting there.
+///
+/// Returns {end: boundary bytes}, msgpack-encoded like an input file.
+#[pyfunction]
+fn chunk_boundaries(
+    py: Python<'_>,
+    config_path: &str,
+    input_path: &str,
+    ends: Vec<usize>,
+) -> PyResult<PyObject> {
+    let boundaries = py
+        .allow_threads(|| {
+            panic::catch_unwind(|| {
+                let config = load_model_msgpack(config_path, input_path);
+                let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, true);
+                evaluate_model_dag(&circuit).map(|activations| {
+                    ends.iter()
+                        .map(|end| {
+                            let boundary = boundary_from_activations(&circuit, &activations, *end);
+                            (*end, encode_input_msgpack(&boundary))
+                        })
+                        .collect::<Vec<_>>()
+                })
+            })
+        })
+        .map_err(|err| PyRuntimeError::new_err(panic_message(err)))?
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+
+    let dict = PyDict::new_bound(py);
+    for (end, boundary) in boundaries {
+        dict.set_item(end, PyBytes::new_bound(py, &boundary))?;
+    }
+    Ok(dict.into_any().unbind())
+}
+
+#[pymodule]
+fn zkml_native(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<PyChunkProver>()?;
+    m.add_function(wrap_pyfunction!(prove_chunk, m)?)?;
+    m.add_function(wrap_pyfunction!(evaluate_dag, m)?)?;
+    m.add_function(wrap_pyfunction!(chunk_boundaries, m)?)?;
+    Ok(())
+}
@@ -0,0 +1,281 @@
+"""
+Warm per-chunk prover for Ray actors.
+
+A ChunkWorker proves one layer range of one model for many inputs. The model
+config, KZG params and proving key are loaded once and stay resident, so a
+worker that proves the same chunk for thousands of inputs does the setup once
+instead of once per input.
+
+Results carry the proof, public values and boundary in memory, so they can
+travel through the Ray object store instead of through files on the worker's
+disk; a DirectorySink additionally writes them to shared storage.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+from python.rust_prover import (
+    DirectorySink,
+    NativeProver,
+    ProofResult,
+    ProverDaemon,
+    read_outputs,
+    zkml_native,
+)
+
+try:
+    import ray
+except ImportError:
+    # Only needed for RemoteChunkWorker
+    ray = None
+
+
+def _process_memory(pid: int) -> dict:
+    """Current and peak RSS of a process in bytes, from /proc (Linux only)."""
+    report = {"rss_bytes": None, "peak_rss_bytes": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    report["rss_bytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    report["peak_rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return report
+
+
+class ChunkWorker:
+    """
+    Prover for layers [chunk_start, chunk_end) of one model.
+    
+    Uses the in-process zkml_native prover if it is installed, else a
+    ProverDaemon; either keeps the config, params and proving key resident
+    between prove() calls. Setup happens in __init__ if warmup_input is given,
+    else on warmup() or the first prove(). k is picked from the input's values,
+    so warm up with a representative input.
+    
+    Inputs may be files or msgpack bytes, e.g. the boundary of the previous
+    chunk's result, so chunks can be chained through the object store:
+    
+        worker = RemoteChunkWorker.remote(config, 2, 4, warmup_input=sample)
+        result = ray.get(worker.prove.remote(prev_result.boundary))
+    """
+    
+    def __init__(
+        self,
+        config_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        params_dir: str = "./params_kzg",
+        use_merkle: bool = False,
+        warmup_input: Optional[str] = None,
+        verify: bool = True,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        sink: Optional[DirectorySink] = None,
+    ):
+        """
+        Args:
+            config_path: Path to model config/weights (msgpack)
+            chunk_start: Start layer index (inclusive)
+            chunk_end: End layer index (exclusive)
+            params_dir: Directory for KZG params
+            use_merkle: Enable Merkle tree for intermediate values
+            warmup_input: If set, warm up with this input before returning
+            verify: Verify proofs after proving; if False, the verifying key is
+                returned for deferred verification
+            k: Prove with 2^k rows (default: the smallest k that fits)
+            num_cols: Number of advice columns (default: the model's)
+            sink: Also write every result to shared storage
+        
+        Raises:
+            FileNotFoundError: If the config is not found, or neither
+                zkml_native nor the prove_chunk binary is available
+        """
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        self.config_path = config_path
+        self.chunk_start = chunk_start
+        self.chunk_end = chunk_end
+        self.use_merkle = use_merkle
+        self.sink = sink
+        self.num_proofs = 0
+        self.setup_time_ms = 0
+        # Inputs given as bytes and daemon outputs live here only while proving
+        self._scratch_dir = tempfile.mkdtemp(prefix="zkml_worker_")
+        
+        if zkml_native is not None:
+            self.backend = "native"
+            self._prover = NativeProver(params_dir, verify=verify, k=k, num_cols=num_cols)
+        else:
+            self.backend = "daemon"
+            self._prover = ProverDaemon(
+                params_dir=params_dir, verify=verify, k=k, num_cols=num_cols
+            )
+        
+        if warmup_input is not None:
+            self.warmup(warmup_input)
+    
+    def warmup(
+        self,
+        input_path: Union[str, bytes],
+        prev_merkle_root: Optional[str] = None,
+    ) -> dict:
+        """
+        Load the config, params and proving key for this chunk.
+        
+        The daemon backend has no setup-only request, so it proves the input
+        once and discards the proof.
+        
+        Args:
+            input_path: A representative input of this chunk (the model input
+                for chunk_start == 0, else a boundary), as a file or bytes
+            prev_merkle_root: Previous chunk's Merkle root, if proofs bind one
+        
+        Returns:
+            Dict with k, rows_used and the setup timings in milliseconds
+        """
+        start = time.monotonic()
+        if self.backend == "native":
+            with self._input_file(input_path) as path:
+                report = self._prover.warmup(
+                    self.config_path,
+                    path,
+                    self.chunk_start,
+                    self.chunk_end,
+                    self.use_merkle,
+                    prev_merkle_root,
+                )
+        else:
+            result = self._prove(input_path, prev_merkle_root, output_dir=None)
+            report = {
+                "k": result.k,
+                "rows_used": result.rows_used,
+                "load_time_ms": result.load_time_ms,
+                "params_time_ms": result.params_time_ms,
+                "keygen_vk_time_ms": result.keygen_vk_time_ms,
+                "keygen_pk_time_ms": result.keygen_pk_time_ms,
+                "key_load_time_ms": result.key_load_time_ms,
+                "witness_time_ms": result.witness_time_ms,
+            }
+        self.setup_time_ms += int((time.monotonic() - start) * 1000)
+        return report
+    
+    def prove(
+        self,
+        input_path: Union[str, bytes],
+        prev_merkle_root: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> ProofResult:
+        """
+        Prove this chunk for one input.
+        
+        Args:
+            input_path: Model input (chunk_start == 0) or the previous chunk's
+                boundary, as a file or as msgpack bytes
+            prev_merkle_root: Previous chunk's Merkle root (hex string)
+            output_dir: Also write the proof files here
+            name: Name of the result in the sink (default: a unique name
+                under chunk_<start>_<end>)
+        
+        Returns:
+            ProofResult with proof, public_vals, vk (if verification is
+            deferred) and boundary in memory. File paths are set only for
+            output_dir or the sink; nothing is left in temp dirs.
+        """
+        result = self._prove(input_path, prev_merkle_root, output_dir)
+        if self.sink is not None:
+            if name is None:
+                name = os.path.join(
+                    f"chunk_{self.chunk_start}_{self.chunk_end}", uuid.uuid4().hex
+                )
+            result = self.sink.put(name, result)
+        self.num_proofs += 1
+        return result
+    
+    def _prove(
+        self,
+        input_path: Union[str, bytes],
+        prev_merkle_root: Optional[str],
+        output_dir: Optional[str],
+    ) -> ProofResult:
+        """Prove one input and load the outputs into memory."""
+        # The daemon always writes files; keep them only until they are read
+        prove_dir = output_dir
+        if prove_dir is None and self.backend == "daemon":
+            prove_dir = tempfile.mkdtemp(prefix="proof_", dir=self._scratch_dir)
+        
+        with self._input_file(input_path) as path:
+            try:
+                result = self._prover.prove_chunk(
+                    self.config_path,
+                    path,
+                    self.chunk_start,
+                    self.chunk_end,
+                    self.use_merkle,
+                    prev_merkle_root,
+                    output_dir=prove_dir,
+                )
+            except BaseException:
+                if prove_dir != output_dir:
+                    shutil.rmtree(prove_dir, ignore_errors=True)
+                raise
+        return read_outputs(result, remove=prove_dir != output_dir)
+    
+    @contextmanager
+    def _input_file(self, input_path: Union[str, bytes]) -> Iterator[str]:
+        """Path of an input given as a path or as bytes (written to a scratch
+        file that is removed afterwards)."""
+        if isinstance(input_path, str):
+            yield input_path
+            return
+        fd, path = tempfile.mkstemp(prefix="input_", suffix=".msgpack", dir=self._scratch_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(input_path)
+            yield path
+        finally:
+            os.remove(path)
+    
+    def memory_report(self) -> dict:
+        """
+        Memory held by the prover.
+        
+        Returns:
+            Dict with backend, rss_bytes and peak_rss_bytes of the proving
+            process (this process, or the daemon's), num_proofs and
+            setup_time_ms; the native backend adds the configs, params_ks
+            and proving_keys it holds
+        """
+        if self.backend == "native":
+            report = self._prover.memory_report()
+        else:
+            report = _process_memory(self._prover.pid)
+        report["backend"] = self.backend
+        report["num_proofs"] = self.num_proofs
+        report["setup_time_ms"] = self.setup_time_ms
+        return report
+    
+    def close(self) -> None:
+        """Stop the daemon, if any, and remove the scratch dir. The native
+        prover is freed with the worker."""
+        if self.backend == "daemon":
+            self._prover.close()
+        shutil.rmtree(self._scratch_dir, ignore_errors=True)
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+# Ray actor version of ChunkWorker, e.g. RemoteChunkWorker.options(num_cpus=8).remote(...)
+RemoteChunkWorker = ray.remote(ChunkWorker) if ray is not None else None
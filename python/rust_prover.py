@@ -5,18 +5,33 @@ This module provides a Python interface to the zkml proof generation system,
 allowing Ray workers to generate ZK proofs for model chunks.
 """
 
+import asyncio
+import hashlib
 import json
 import os
+import shutil
+import socket
 import subprocess
 import tempfile
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import zkml_native
+except ImportError:
+    # Optional in-process prover, built from bindings/ with maturin
+    zkml_native = None
 
 
 @dataclass
 class ProofResult:
-    """Result from proof generation."""
+    """Result from proof generation.
+    
+    File paths are None when the proof was produced in-process without an
+    output_dir; the proof and public values are then only held in memory.
+    """
     chunk_start: int
     chunk_end: int
     use_merkle: bool
@@ -26,20 +41,77 @@ class ProofResult:
     verify_time_ms: int
     proof_size_bytes: int
     public_vals_count: int
-    proof_path: str
-    public_vals_path: str
-    output_dir: str
+    proof_path: Optional[str]
+    public_vals_path: Optional[str]
+    output_dir: Optional[str]
+    proof: Optional[bytes] = None
+    public_vals: Optional[bytes] = None
+    # Per-phase breakdown (None if the prover did not report it)
+    load_time_ms: Optional[int] = None
+    params_time_ms: Optional[int] = None
+    keygen_vk_time_ms: Optional[int] = None
+    keygen_pk_time_ms: Optional[int] = None
+    key_load_time_ms: Optional[int] = None
+    witness_time_ms: Optional[int] = None
+    serialize_time_ms: Optional[int] = None
+    k: Optional[int] = None
+    rows_used: Optional[int] = None
+    # None if unavailable, or if another proof ran in the same prover process
+    peak_rss_bytes: Optional[int] = None
+    # True if served from a ProofCache without running the prover
+    cached: bool = False
+    # Verifying key, written when verification is deferred (verify=False)
+    vk_path: Optional[str] = None
+    # Tensors live after the chunk (msgpack, input format). Pass the file as the
+    # input of the chunk starting at chunk_end instead of the model input.
+    boundary_path: Optional[str] = None
+    boundary: Optional[bytes] = None
+    # Multi-input proofs (prove_chunk_multi): one proof covers num_instances
+    # inputs, public_vals holds their public values in input order and the
+    # fields above describe the first input
+    num_instances: int = 1
+    merkle_roots: Optional[List[Optional[str]]] = None
+    boundary_paths: Optional[List[str]] = None
+    # Serialized verifying key, when verification is deferred and the result
+    # is held in memory (see read_outputs())
+    vk: Optional[bytes] = None
+    # Boundary of each input of a multi-input proof, in memory
+    boundaries: Optional[List[bytes]] = None
+    
+    def public_vals_array(self) -> "numpy.ndarray":
+        """Public values as a (count, 32) uint8 array of little-endian field
+        elements; a view of the bytes, not a copy."""
+        import numpy as np
+        
+        if self.public_vals is None:
+            raise ValueError("public_vals is not in memory; see read_outputs()")
+        return np.frombuffer(self.public_vals, dtype=np.uint8).reshape(-1, 32)
 
 
 def find_prove_chunk_binary() -> str:
     """Find the prove_chunk binary, checking common locations."""
+    return _find_binary("prove_chunk")
+
+
+def find_verify_chunks_binary() -> str:
+    """Find the verify_chunks binary, checking common locations."""
+    return _find_binary("verify_chunks")
+
+
+def find_evaluate_dag_binary() -> str:
+    """Find the evaluate_dag binary, checking common locations."""
+    return _find_binary("evaluate_dag")
+
+
+def _find_binary(name: str) -> str:
+    """Find a zkml binary by name in the cargo target dirs or on PATH."""
     # Check common locations relative to this file
     this_dir = Path(__file__).parent
     candidates = [
-        this_dir.parent / "zkml" / "target" / "release" / "prove_chunk",
-        this_dir.parent / "zkml" / "target" / "debug" / "prove_chunk",
-        Path("zkml") / "target" / "release" / "prove_chunk",
-        Path("zkml") / "target" / "debug" / "prove_chunk",
+        this_dir.parent / "zkml" / "target" / "release" / name,
+        this_dir.parent / "zkml" / "target" / "debug" / name,
+        Path("zkml") / "target" / "release" / name,
+        Path("zkml") / "target" / "debug" / name,
     ]
     
     for candidate in candidates:
@@ -49,7 +121,7 @@ def find_prove_chunk_binary() -> str:
     # Try PATH
     try:
         result = subprocess.run(
-            ["which", "prove_chunk"],
+            ["which", name],
             capture_output=True,
             text=True,
             check=True
@@ -59,11 +131,222 @@ def find_prove_chunk_binary() -> str:
         pass
     
     raise FileNotFoundError(
-        "Could not find prove_chunk binary. "
-        "Build it with: cd zkml && cargo build --bin prove_chunk --release"
+        f"Could not find {name} binary. "
+        f"Build it with: cd zkml && cargo build --bin {name} --release"
     )
 
 
+# Files that make up one prove_chunk output
+_OUTPUT_FILES = ("proof.bin", "public_vals.bin", "result.json")
+# vk.bin is written only when verification is deferred; boundary.msgpack by
+# provers that export chunk boundaries
+_OPTIONAL_OUTPUT_FILES = ("vk.bin", "boundary.msgpack")
+
+
+# Master SRS every params file in a params dir is derived from (see zkml's
+# utils/srs.rs): k as 4 bytes, g and its Lagrange basis, then g2 and s_g2
+MASTER_SRS_FILE = "master.params"
+_SRS_G2_BYTES = 2 * 128
+
+
+class ProofCache:
+    """
+    Content-addressed on-disk cache of prove_chunk outputs.
+    
+    Entries are keyed by a SHA-256 over the config and input file contents,
+    the layer range, the Merkle settings, the prover binary and the KZG setup
+    (the master SRS's s_g2), so a cached proof is only served for
+    byte-identical requests against the same setup. Each entry stores the
+    proof.bin/public_vals.bin/result.json triple. Entries are evicted least
+    recently used first once the cache exceeds max_bytes.
+    
+    The cache directory can be shared between processes: entries are
+    published with an atomic rename.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024**3):
+        """
+        Args:
+            cache_dir: Directory holding cache entries (created if needed)
+            max_bytes: Total size budget for cached files
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # File digests, memoized by (path, mtime, size) to avoid rehashing
+        # large model configs on every request
+        self._digests = {}
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _file_digest(self, path: str) -> str:
+        st = os.stat(path)
+        memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digest = h.hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+    
+    @staticmethod
+    def _srs_digest(params_dir: str) -> Optional[str]:
+        """Digest of the master SRS's k, g2 and s_g2, which identify the setup."""
+        path = os.path.join(params_dir, MASTER_SRS_FILE)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(4)
+                f.seek(-_SRS_G2_BYTES, os.SEEK_END)
+                g2 = f.read(_SRS_G2_BYTES)
+        except OSError:
+            return None
+        return hashlib.sha256(header + g2).hexdigest()
+    
+    def key(
+        self,
+        config_path: str,
+        input_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool,
+        prev_merkle_root: Optional[str],
+        binary_path: str,
+        verify: bool = True,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        params_dir: str = "./params_kzg",
+    ) -> Optional[str]:
+        """Compute the cache key for a prove_chunk request.
+        
+        Returns None while params_dir has no master SRS: the setup the proof
+        will be made against is only known once the prover has created it.
+        """
+        srs_digest = self._srs_digest(params_dir)
+        if srs_digest is None:
+            return None
+        h = hashlib.sha256()
+        for part in (
+            self._file_digest(config_path),
+            self._file_digest(input_path),
+            str(chunk_start),
+            str(chunk_end),
+            str(use_merkle),
+            str(prev_merkle_root),
+            self._file_digest(binary_path),
+            str(verify),
+            str(k),
+            str(num_cols),
+            srs_digest,
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+    
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+    
+    def get(self, key: str, output_dir: Optional[str] = None) -> Optional[ProofResult]:
+        """
+        Look up a cached proof and copy it to output_dir.
+        
+        Args:
+            key: Cache key from key()
+            output_dir: Where to copy the cached files (temp dir if None)
+        
+        Returns:
+            ProofResult with cached=True, or None on a miss
+        """
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+        
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix="zkml_proof_")
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        try:
+            for name in _OUTPUT_FILES:
+                shutil.copyfile(
+                    os.path.join(entry_dir, name), os.path.join(output_dir, name)
+                )
+            for name in _OPTIONAL_OUTPUT_FILES:
+                if os.path.exists(os.path.join(entry_dir, name)):
+                    shutil.copyfile(
+                        os.path.join(entry_dir, name), os.path.join(output_dir, name)
+                    )
+            # Mark as recently used
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            # Evicted concurrently
+            return None
+        
+        result = _read_result(output_dir)
+        result.cached = True
+        return result
+    
+    def put(self, key: str, result: ProofResult) -> None:
+        """Store the output files of a finished proof, then enforce the size budget."""
+        entry_dir = self._entry_dir(key)
+        if os.path.isdir(entry_dir) or result.output_dir is None:
+            return
+        
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+        try:
+            for name in _OUTPUT_FILES:
+                shutil.copyfile(
+                    os.path.join(result.output_dir, name), os.path.join(tmp_dir, name)
+                )
+            for name in _OPTIONAL_OUTPUT_FILES:
+                if os.path.exists(os.path.join(result.output_dir, name)):
+                    shutil.copyfile(
+                        os.path.join(result.output_dir, name), os.path.join(tmp_dir, name)
+                    )
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process published the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        
+        self.evict()
+    
+    def size_bytes(self) -> int:
+        """Total size of all cache entries."""
+        return sum(size for _, size, _ in self._entries())
+    
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """(entry_dir, size_bytes, last_used) for every published entry."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("."):
+                continue
+            entry_dir = os.path.join(self.cache_dir, name)
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir)
+                )
+                entries.append((entry_dir, size, os.stat(entry_dir).st_mtime))
+            except OSError:
+                continue
+        return entries
+    
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for entry_dir, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+    
+    def clear(self) -> None:
+        """Remove all cache entries."""
+        for entry_dir, _, _ in self._entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
 def prove_chunk(
     config_path: str,
     input_path: str,
@@ -74,13 +357,19 @@ def prove_chunk(
     params_dir: str = "./params_kzg",
     output_dir: Optional[str] = None,
     binary_path: Optional[str] = None,
+    cache: Optional[ProofCache] = None,
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
 ) -> ProofResult:
     """
     Generate a ZK proof for a model chunk using the Rust prover.
     
     Args:
         config_path: Path to model config/weights (msgpack)
-        input_path: Path to input data (msgpack)
+        input_path: Path to input data (msgpack); for chunk_start > 0, the
+            boundary_path of the chunk ending at chunk_start
         chunk_start: Start layer index (inclusive)
         chunk_end: End layer index (exclusive)
         use_merkle: Enable Merkle tree for intermediate values
@@ -88,6 +377,13 @@ def prove_chunk(
         params_dir: Directory for KZG params
         output_dir: Output directory for proof files (temp dir if None)
         binary_path: Path to prove_chunk binary (auto-detect if None)
+        cache: Serve identical requests from this cache instead of proving
+        verify: Verify the proof after proving; if False, write vk.bin for
+            deferred verification with verify_chunks()
+        k: Prove with 2^k rows (default: the smallest k that fits the chunk)
+        num_cols: Number of advice columns (default: the model's)
+        low_memory: Drop the model config after building the circuit, for a
+            smaller peak RSS (does not change the proof)
     
     Returns:
         ProofResult with proof metadata and file paths
@@ -97,6 +393,761 @@ def prove_chunk(
         subprocess.CalledProcessError: If proof generation fails
         ValueError: If result.json is invalid
     """
+    if cache is not None:
+        if binary_path is None:
+            binary_path = find_prove_chunk_binary()
+        key_args = (
+            config_path, input_path, chunk_start, chunk_end,
+            use_merkle, prev_merkle_root, binary_path, verify, k, num_cols, params_dir,
+        )
+        cache_key = cache.key(*key_args)
+        cached = cache.get(cache_key, output_dir) if cache_key is not None else None
+        if cached is not None:
+            return cached
+    
+    cmd, output_dir = _build_command(
+        config_path,
+        input_path,
+        chunk_start,
+        chunk_end,
+        use_merkle,
+        prev_merkle_root,
+        params_dir,
+        output_dir,
+        binary_path,
+        verify,
+        k,
+        num_cols,
+        low_memory,
+    )
+    
+    # Run prover
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+    )
+    
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode,
+            cmd,
+            output=result.stdout,
+            stderr=result.stderr,
+        )
+    
+    proof_result = _read_result(output_dir)
+    if cache is not None:
+        # The prover creates the master SRS if there was none
+        cache_key = cache_key or cache.key(*key_args)
+        if cache_key is not None:
+            cache.put(cache_key, proof_result)
+    return proof_result
+
+
+def prove_chunk_multi(
+    config_path: str,
+    input_paths: List[str],
+    chunk_start: int,
+    chunk_end: int,
+    use_merkle: bool = False,
+    prev_merkle_roots: Optional[List[str]] = None,
+    params_dir: str = "./params_kzg",
+    output_dir: Optional[str] = None,
+    binary_path: Optional[str] = None,
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
+) -> ProofResult:
+    """
+    Prove several inputs of the same chunk in one proof.
+    
+    All inputs share k, params, proving key and the polynomial opening, so
+    the per-proof fixed costs are paid once. Useful for many small requests
+    against the same model.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        input_paths: Input files (msgpack); they must give the same tensors
+        chunk_start: Start layer index (inclusive)
+        chunk_end: End layer index (exclusive)
+        use_merkle: Enable Merkle tree for intermediate values
+        prev_merkle_roots: None, or one previous Merkle root per input
+        params_dir: Directory for KZG params
+        output_dir: Output directory for proof files (temp dir if None)
+        binary_path: Path to prove_chunk binary (auto-detect if None)
+        verify: Verify the proof after proving; if False, write vk.bin for
+            deferred verification with verify_chunks()
+        k: Prove with 2^k rows (default: the smallest k that fits all inputs)
+        num_cols: Number of advice columns (default: the model's)
+        low_memory: Drop the model config after building the circuits
+    
+    Returns:
+        ProofResult with num_instances, merkle_roots and boundary_paths set
+    
+    Raises:
+        FileNotFoundError: If binary or input files not found
+        ValueError: If prev_merkle_roots doesn't match input_paths
+        subprocess.CalledProcessError: If proof generation fails
+    """
+    if not input_paths:
+        raise ValueError("input_paths is empty")
+    if prev_merkle_roots is not None and len(prev_merkle_roots) != len(input_paths):
+        raise ValueError("prev_merkle_roots must have one root per input")
+    
+    cmd, output_dir = _build_command(
+        config_path,
+        input_paths,
+        chunk_start,
+        chunk_end,
+        use_merkle,
+        prev_merkle_roots,
+        params_dir,
+        output_dir,
+        binary_path,
+        verify,
+        k,
+        num_cols,
+        low_memory,
+    )
+    
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+    )
+    
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode,
+            cmd,
+            output=result.stdout,
+            stderr=result.stderr,
+        )
+    
+    return _read_result(output_dir)
+
+
+@dataclass
+class ChunkJob:
+    """One proof job for prove_chunks_batch()."""
+    input_path: str
+    chunk_start: int
+    chunk_end: int
+    use_merkle: bool = False
+    prev_merkle_root: Optional[str] = None
+    output_dir: Optional[str] = None
+    config_path: Optional[str] = None
+
+
+def prove_chunks_batch(
+    jobs: List[ChunkJob],
+    config_path: Optional[str] = None,
+    params_dir: str = "./params_kzg",
+    binary_path: Optional[str] = None,
+    return_exceptions: bool = False,
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
+) -> List[ProofResult]:
+    """
+    Prove many chunk jobs in a single prove_chunk process.
+    
+    Runs `prove_chunk --manifest`, so jobs that share a circuit shape (same
+    config, layer range and Merkle settings) load the KZG params and generate
+    the proving key only once.
+    
+    Args:
+        jobs: Jobs to prove, in order
+        config_path: Model config for jobs that don't set their own
+        params_dir: Directory for KZG params
+        binary_path: Path to prove_chunk binary (auto-detect if None)
+        return_exceptions: Return a RuntimeError in place of each failed job
+            instead of raising on the first failure
+        verify: Verify each proof after proving; if False, write vk.bin for
+            deferred verification with verify_chunks()
+        k: Prove every job with 2^k rows (default: the smallest k that fits
+            each chunk)
+        num_cols: Number of advice columns (default: the model's)
+        low_memory: Keep nothing resident between jobs, for a smaller peak
+            RSS (does not change the proofs)
+    
+    Returns:
+        One ProofResult per job, in the order of jobs
+    
+    Raises:
+        FileNotFoundError: If binary or input files not found
+        RuntimeError: If a job failed and return_exceptions is False
+        subprocess.CalledProcessError: If the prover process itself failed
+    """
+    if binary_path is None:
+        binary_path = find_prove_chunk_binary()
+    os.makedirs(params_dir, exist_ok=True)
+    
+    manifest = []
+    for job in jobs:
+        job_config = job.config_path or config_path
+        if job_config is None:
+            raise ValueError("Job has no config_path and no default was given")
+        if not os.path.exists(job_config):
+            raise FileNotFoundError(f"Config file not found: {job_config}")
+        if not os.path.exists(job.input_path):
+            raise FileNotFoundError(f"Input file not found: {job.input_path}")
+        
+        output_dir = job.output_dir
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix="zkml_proof_")
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        manifest.append({
+            "config": job_config,
+            "input": job.input_path,
+            "start": job.chunk_start,
+            "end": job.chunk_end,
+            "use_merkle": job.use_merkle,
+            "prev_root": job.prev_merkle_root,
+            "output_dir": output_dir,
+        })
+    
+    with tempfile.TemporaryDirectory(prefix="zkml_manifest_") as tmp_dir:
+        manifest_path = os.path.join(tmp_dir, "jobs.json")
+        results_path = os.path.join(tmp_dir, "results.json")
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+        
+        cmd = [
+            binary_path,
+            "--manifest", manifest_path,
+            "--results", results_path,
+            "--params-dir", params_dir,
+        ]
+        cmd.extend(_prover_flags(verify, k, num_cols, low_memory))
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        
+        # Exit code 1 with a results file means some jobs failed
+        if not os.path.exists(results_path):
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+            )
+        with open(results_path, "r") as f:
+            responses = json.load(f)
+    
+    results = []
+    for entry, response in zip(manifest, responses):
+        if response.get("status") == "ok":
+            results.append(_result_from_json(response["result"], entry["output_dir"]))
+            continue
+        error = RuntimeError(
+            f"Proof generation failed for layers "
+            f"[{entry['start']}, {entry['end']}) of {entry['input']}: "
+            f"{response.get('error')}"
+        )
+        if not return_exceptions:
+            raise error
+        results.append(error)
+    
+    return results
+
+
+def verify_chunks(
+    proof_dirs: List[str],
+    config_path: str,
+    params_dir: str = "./params_kzg",
+    batch_size: int = 16,
+    binary_path: Optional[str] = None,
+    num_cols: Optional[int] = None,
+) -> List[bool]:
+    """
+    Batch-verify chunk proofs written with verify=False.
+    
+    Runs the verify_chunks binary, which folds each batch of proofs into one
+    accumulated pairing check and verifies batches on a thread pool.
+    
+    Args:
+        proof_dirs: Output directories containing proof.bin, public_vals.bin,
+            vk.bin and result.json
+        config_path: Path to model config (msgpack) the proofs were made for
+        params_dir: Directory with the KZG params used for proving
+        batch_size: Number of proofs per accumulated pairing check
+        binary_path: Path to verify_chunks binary (auto-detect if None)
+        num_cols: Column count the proofs were made with, if overridden
+    
+    Returns:
+        Whether each proof is valid, in the order of proof_dirs
+    
+    Raises:
+        FileNotFoundError: If the binary or a vk.bin is not found
+        subprocess.CalledProcessError: If verification could not run
+    """
+    if binary_path is None:
+        binary_path = find_verify_chunks_binary()
+    for proof_dir in proof_dirs:
+        if not os.path.exists(os.path.join(proof_dir, "vk.bin")):
+            raise FileNotFoundError(
+                f"vk.bin not found in {proof_dir} (prove with verify=False)"
+            )
+    
+    with tempfile.TemporaryDirectory(prefix="zkml_verify_") as tmp_dir:
+        results_path = os.path.join(tmp_dir, "results.json")
+        cmd = [
+            binary_path,
+            "--config", config_path,
+            "--params-dir", params_dir,
+            "--batch-size", str(batch_size),
+            "--results", results_path,
+        ]
+        if num_cols is not None:
+            cmd.extend(["--num-cols", str(num_cols)])
+        cmd.extend(proof_dirs)
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        
+        # Exit code 1 with a results file means some proofs are invalid
+        if not os.path.exists(results_path):
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+            )
+        with open(results_path, "r") as f:
+            results = json.load(f)
+    
+    return [entry["valid"] for entry in results]
+
+
+def evaluate_dag(
+    config_path: str,
+    input_path: str,
+    binary_path: Optional[str] = None,
+) -> Dict[int, "numpy.ndarray"]:
+    """
+    Compute a model's intermediate activations without proving.
+    
+    Runs the model's layers on the witness-only backend, so the values are
+    exactly those the prover would assign, at a fraction of the cost of
+    proving the preceding chunks. Uses the in-process zkml_native module if it
+    is installed, else the evaluate_dag binary.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        input_path: Path to input data (msgpack)
+        binary_path: Path to evaluate_dag binary (auto-detect if None)
+    
+    Returns:
+        Output of every layer as an int64 array of fixed-point values, by tensor index
+    
+    Raises:
+        FileNotFoundError: If the binary is not found
+        subprocess.CalledProcessError: If evaluation fails
+    """
+    import numpy as np
+    
+    if zkml_native is not None and binary_path is None:
+        tensors = zkml_native.evaluate_dag(config_path, input_path)
+        return {
+            idx: np.array(data, dtype=np.int64).reshape(shape)
+            for idx, (shape, data) in tensors.items()
+        }
+    
+    import msgpack
+    
+    if binary_path is None:
+        binary_path = find_evaluate_dag_binary()
+    with tempfile.TemporaryDirectory(prefix="zkml_eval_") as tmp_dir:
+        output_path = os.path.join(tmp_dir, "activations.msgpack")
+        cmd = [
+            binary_path,
+            "--config", config_path,
+            "--input", input_path,
+            "--output", output_path,
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+            )
+        with open(output_path, "rb") as f:
+            tensors = msgpack.unpackb(f.read())
+    
+    return {
+        tensor["idx"]: np.array(tensor["data"], dtype=np.int64).reshape(tensor["shape"])
+        for tensor in tensors
+    }
+
+
+def chunk_boundaries(
+    config_path: str,
+    input_path: str,
+    ends: List[int],
+    binary_path: Optional[str] = None,
+) -> Dict[int, bytes]:
+    """
+    Inputs of chunks starting at each layer in ends, from one evaluation of
+    the whole model.
+    
+    The boundary a chunk ending at layer `end` would write (the tensors
+    later layers still read) is the input of the chunk [end, ...), so all
+    chunks can be proven at once instead of each waiting for the proof of the
+    one before it. Uses zkml_native if it is installed, else the evaluate_dag
+    binary.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        input_path: Path to input data (msgpack)
+        ends: Layers to compute the boundary at
+        binary_path: Path to evaluate_dag binary (auto-detect if None)
+    
+    Returns:
+        {end: boundary bytes}, msgpack-encoded like an input file
+    
+    Raises:
+        FileNotFoundError: If the binary is not found
+        subprocess.CalledProcessError: If evaluation fails
+    """
+    if not ends:
+        return {}
+    if zkml_native is not None and binary_path is None:
+        return dict(zkml_native.chunk_boundaries(config_path, input_path, list(ends)))
+    
+    if binary_path is None:
+        binary_path = find_evaluate_dag_binary()
+    with tempfile.TemporaryDirectory(prefix="zkml_boundaries_") as tmp_dir:
+        cmd = [
+            binary_path,
+            "--config", config_path,
+            "--input", input_path,
+            "--boundary-at", ",".join(str(end) for end in ends),
+            "--boundary-dir", tmp_dir,
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+            )
+        boundaries = {}
+        for end in ends:
+            with open(os.path.join(tmp_dir, f"boundary_{end}.msgpack"), "rb") as f:
+                boundaries[end] = f.read()
+    return boundaries
+
+
+def find_layer_costs_binary() -> str:
+    """Find the layer_costs binary, checking common locations."""
+    return _find_binary("layer_costs")
+
+
+def layer_costs(
+    config_path: str,
+    num_cols: Optional[int] = None,
+    binary_path: Optional[str] = None,
+) -> dict:
+    """
+    Estimate the rows of every layer of a model.
+    
+    Uses the layers' num_rows estimates (as estimate_cost does), so it needs
+    no input and takes a fraction of a second.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        num_cols: Estimate for this many advice columns instead of the model's
+        binary_path: Path to layer_costs binary (auto-detect if None)
+    
+    Returns:
+        Dict with num_cols, base_rows (rows every chunk needs) and layers, a
+        list of {layer_type, num_rows, assign_rows} in layer order
+    
+    Raises:
+        FileNotFoundError: If the binary is not found
+        subprocess.CalledProcessError: If estimation fails
+    """
+    if binary_path is None:
+        binary_path = find_layer_costs_binary()
+    cmd = [binary_path, "--config", config_path]
+    if num_cols is not None:
+        cmd.extend(["--num-cols", str(num_cols)])
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+        )
+    return json.loads(proc.stdout)
+
+
+def partition_layers(
+    costs: Sequence[float],
+    num_chunks: int,
+    rows: Optional[Sequence[int]] = None,
+    max_rows: Optional[int] = None,
+    base_rows: int = 0,
+) -> List[Tuple[int, int]]:
+    """
+    Split layers into contiguous chunks of roughly equal cost.
+    
+    Minimizes the cost of the most expensive chunk, which bounds the time of
+    the slowest worker. If max_rows is set, chunks also stay within it, and
+    more than num_chunks chunks are returned if the layers don't fit otherwise.
+    
+    Args:
+        costs: Cost of each layer, e.g. estimated rows or measured proving time
+        num_chunks: Number of chunks to aim for (at most one per layer)
+        rows: Rows of each layer, for max_rows (default: costs)
+        max_rows: Most rows a chunk may use, e.g. 2**max_k
+        base_rows: Rows every chunk needs on top of its layers'
+    
+    Returns:
+        List of (start, end) layer ranges, end exclusive, covering all layers
+    
+    Raises:
+        ValueError: If a single layer does not fit in max_rows
+    """
+    num_layers = len(costs)
+    if num_layers == 0:
+        return []
+    if rows is None:
+        rows = costs
+    
+    if max_rows is not None:
+        for i, layer_rows in enumerate(rows):
+            if base_rows + layer_rows > max_rows:
+                raise ValueError(
+                    f"Layer {i} needs {base_rows + layer_rows} rows, more than "
+                    f"max_rows={max_rows}"
+                )
+    
+    def split(max_cost: float, min_chunks: int) -> List[Tuple[int, int]]:
+        # Greedily fill chunks up to max_cost (and max_rows), leaving at least
+        # one layer for each of the remaining min_chunks chunks
+        chunks = []
+        start = 0
+        cost = 0.0
+        chunk_rows = base_rows
+        for i in range(num_layers):
+            over = i > start and (
+                cost + costs[i] > max_cost
+                or (max_rows is not None and chunk_rows + rows[i] > max_rows)
+                or num_layers - i < min_chunks - len(chunks)
+            )
+            if over:
+                chunks.append((start, i))
+                start, cost, chunk_rows = i, 0.0, base_rows
+            cost += costs[i]
+            chunk_rows += rows[i]
+        chunks.append((start, num_layers))
+        return chunks
+    
+    # Chunks needed to respect max_rows alone
+    num_chunks = max(min(num_chunks, num_layers), len(split(float("inf"), 1)))
+    
+    # The smallest max cost is the cost of some contiguous range of layers
+    prefix = [0.0]
+    for cost in costs:
+        prefix.append(prefix[-1] + cost)
+    candidates = sorted({
+        prefix[end] - prefix[start]
+        for start in range(num_layers)
+        for end in range(start + 1, num_layers + 1)
+    })
+    lo, hi = 0, len(candidates) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(split(candidates[mid], 1)) <= num_chunks:
+            hi = mid
+        else:
+            lo = mid + 1
+    return split(candidates[lo], num_chunks)
+
+
+def partition_model_by_cost(
+    config_path: str,
+    num_chunks: int,
+    max_k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    layer_times: Optional[Sequence[float]] = None,
+    num_layers: Optional[int] = None,
+    binary_path: Optional[str] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Split a model into chunks of roughly equal proving cost.
+    
+    Balances the layers' estimated rows (see layer_costs()), or layer_times
+    if measured, and keeps every chunk within 2**max_k rows. A Conv2D or
+    FullyConnected layer can need orders of magnitude more rows than a
+    Reshape, so splitting by layer count leaves most workers idle.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        num_chunks: Number of chunks to aim for (see partition_layers())
+        max_k: Largest k a chunk may need (None = no cap)
+        num_cols: Number of advice columns the chunks are proved with
+        layer_times: Measured proving time of each layer, to balance on
+            instead of the row estimates
+        num_layers: Only partition the first num_layers layers (default: all)
+        binary_path: Path to layer_costs binary (auto-detect if None)
+    
+    Returns:
+        List of (start, end) layer ranges, end exclusive
+    """
+    estimate = layer_costs(config_path, num_cols=num_cols, binary_path=binary_path)
+    layers = estimate["layers"][:num_layers]
+    rows = [layer["num_rows"] + layer["assign_rows"] for layer in layers]
+    costs = rows if layer_times is None else list(layer_times)[:len(layers)]
+    if len(costs) != len(layers):
+        raise ValueError(
+            f"layer_times has {len(costs)} entries, the model has {len(layers)} layers"
+        )
+    return partition_layers(
+        costs,
+        num_chunks,
+        rows=rows,
+        max_rows=None if max_k is None else 2**max_k,
+        base_rows=estimate["base_rows"],
+    )
+
+
+# Memory of a prover beyond its polynomials: runtime, model config and weights
+PROVER_BASE_MEMORY = 512 * 1024**2
+# Rows per CPU worth reserving; FFTs and MSMs of smaller circuits don't speed up
+# with more threads
+ROWS_PER_CPU = 2**14
+
+
+@dataclass
+class ChunkResources:
+    """Estimated k, peak memory and CPUs of proving one chunk."""
+    start: int
+    end: int
+    rows: int
+    k: int
+    memory_bytes: int
+    num_cpus: int
+    
+    def ray_options(self) -> dict:
+        """Options for an actor or task proving this chunk, for .options(**...).
+        
+        Reserves the chunk's memory and CPUs, so Ray only places it on a node
+        with room for it, and sizes the prover's thread pool to match.
+        """
+        return {
+            "num_cpus": self.num_cpus,
+            "memory": self.memory_bytes,
+            "runtime_env": {"env_vars": {"RAYON_NUM_THREADS": str(self.num_cpus)}},
+        }
+
+
+def chunk_memory_bytes(estimate: dict, k: int) -> int:
+    """
+    Estimated peak memory of proving a chunk with 2**k rows.
+    
+    The prover holds estimate["num_polys"] polynomials of 2**k field elements
+    (32 bytes) in evaluation and coefficient form and on the extended coset,
+    plus the KZG params (two 64-byte points per row).
+    
+    Args:
+        estimate: Output of layer_costs()
+        k: The chunk's k
+    """
+    bytes_per_row = 32 * (2 + estimate["extension"]) * estimate["num_polys"] + 128
+    return PROVER_BASE_MEMORY + bytes_per_row * 2**k
+
+
+def estimate_chunk_resources(
+    config_path: str,
+    chunks: Sequence[Tuple[int, int]],
+    num_cols: Optional[int] = None,
+    ks: Optional[Sequence[int]] = None,
+    max_cpus: Optional[int] = None,
+    memory_scale: float = 1.0,
+    binary_path: Optional[str] = None,
+) -> List[ChunkResources]:
+    """
+    Estimate the k, peak memory and CPUs each chunk needs.
+    
+    k is the smallest with room for the chunk's estimated rows (see
+    layer_costs()), up to the model's k. A chunk whose values need a wider
+    lookup range is proven with a larger k; pass the measured ks (the "k" of
+    earlier results, or of warmup()) when known. The memory estimate is
+    rough; compare it with the peak_rss_bytes of real proofs and set
+    memory_scale accordingly.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        chunks: (start, end) layer ranges, e.g. from partition_model_by_cost()
+        num_cols: Number of advice columns the chunks are proved with
+        ks: Known k of each chunk, instead of the row-based estimate
+        max_cpus: Most CPUs to reserve for one chunk (all cores if None)
+        memory_scale: Factor applied to the memory estimates
+        binary_path: Path to layer_costs binary (auto-detect if None)
+    
+    Returns:
+        ChunkResources of each chunk, in order
+    """
+    estimate = layer_costs(config_path, num_cols=num_cols, binary_path=binary_path)
+    layers = estimate["layers"]
+    if max_cpus is None:
+        max_cpus = os.cpu_count() or 1
+    
+    resources = []
+    for i, (start, end) in enumerate(chunks):
+        rows = estimate["base_rows"] + sum(
+            layer["num_rows"] + layer["assign_rows"] for layer in layers[start:end]
+        )
+        if ks is not None:
+            k = ks[i]
+        else:
+            k = min(max(rows - 1, 1).bit_length(), estimate["k"])
+        resources.append(ChunkResources(
+            start=start,
+            end=end,
+            rows=rows,
+            k=k,
+            memory_bytes=int(chunk_memory_bytes(estimate, k) * memory_scale),
+            num_cpus=max(1, min(max_cpus, 2**k // ROWS_PER_CPU)),
+        ))
+    return resources
+
+
+def _prover_flags(
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
+) -> List[str]:
+    """prove_chunk flags shared by single proofs, manifests and the server."""
+    flags = []
+    if not verify:
+        flags.append("--no-verify")
+    if k is not None:
+        flags.extend(["--k", str(k)])
+    if num_cols is not None:
+        flags.extend(["--num-cols", str(num_cols)])
+    if low_memory:
+        flags.append("--low-memory")
+    return flags
+
+
+def _build_command(
+    config_path: str,
+    input_path: Union[str, List[str]],
+    chunk_start: int,
+    chunk_end: int,
+    use_merkle: bool,
+    prev_merkle_root: Union[None, str, List[str]],
+    params_dir: str,
+    output_dir: Optional[str],
+    binary_path: Optional[str],
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
+) -> Tuple[List[str], str]:
+    """Validate inputs, create directories and build the prove_chunk command.
+    
+    input_path and prev_merkle_root may be lists (one root per input) for a
+    multi-input proof.
+    
+    Returns:
+        (command, output_dir)
+    """
     # Find binary
     if binary_path is None:
         binary_path = find_prove_chunk_binary()
@@ -104,8 +1155,10 @@ def prove_chunk(
     # Validate inputs exist
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Config file not found: {config_path}")
-    if not os.path.exists(input_path):
-        raise FileNotFoundError(f"Input file not found: {input_path}")
+    input_paths = [input_path] if isinstance(input_path, str) else input_path
+    for path in input_paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Input file not found: {path}")
     
     # Create output directory
     if output_dir is None:
@@ -116,39 +1169,33 @@ def prove_chunk(
     # Ensure params directory exists
     os.makedirs(params_dir, exist_ok=True)
     
-    # Build command
     cmd = [
         binary_path,
         "--config", config_path,
-        "--input", input_path,
         "--start", str(chunk_start),
         "--end", str(chunk_end),
         "--params-dir", params_dir,
         "--output-dir", output_dir,
     ]
     
+    for path in input_paths:
+        cmd.extend(["--input", path])
+    
     if use_merkle:
         cmd.append("--use-merkle")
     
-    if prev_merkle_root is not None:
-        cmd.extend(["--prev-root", prev_merkle_root])
-    
-    # Run prover
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-    )
+    if isinstance(prev_merkle_root, str):
+        prev_merkle_root = [prev_merkle_root]
+    for root in prev_merkle_root or []:
+        cmd.extend(["--prev-root", root])
     
-    if result.returncode != 0:
-        raise subprocess.CalledProcessError(
-            result.returncode,
-            cmd,
-            output=result.stdout,
-            stderr=result.stderr,
-        )
+    cmd.extend(_prover_flags(verify, k, num_cols, low_memory))
     
-    # Parse result
+    return cmd, output_dir
+
+
+def _read_result(output_dir: str) -> ProofResult:
+    """Parse result.json written by prove_chunk into a ProofResult."""
     result_path = os.path.join(output_dir, "result.json")
     if not os.path.exists(result_path):
         raise ValueError(f"result.json not found in {output_dir}")
@@ -156,6 +1203,292 @@ def prove_chunk(
     with open(result_path, "r") as f:
         data = json.load(f)
     
+    return _result_from_json(data, output_dir)
+
+
+async def prove_chunk_async(
+    config_path: str,
+    input_path: str,
+    chunk_start: int,
+    chunk_end: int,
+    use_merkle: bool = False,
+    prev_merkle_root: Optional[str] = None,
+    params_dir: str = "./params_kzg",
+    output_dir: Optional[str] = None,
+    binary_path: Optional[str] = None,
+    timeout: Optional[float] = None,
+    num_threads: Optional[int] = None,
+    cache: Optional[ProofCache] = None,
+    verify: bool = True,
+    k: Optional[int] = None,
+    num_cols: Optional[int] = None,
+    low_memory: bool = False,
+) -> ProofResult:
+    """
+    Asynchronous version of prove_chunk().
+    
+    Runs the prove_chunk binary with asyncio.create_subprocess_exec so a single
+    event loop can keep several provers busy. If the awaiting task is cancelled
+    or the timeout expires, the prover process is killed.
+    
+    Args:
+        config_path: Path to model config/weights (msgpack)
+        input_path: Path to input data (msgpack)
+        chunk_start: Start layer index (inclusive)
+        chunk_end: End layer index (exclusive)
+        use_merkle: Enable Merkle tree for intermediate values
+        prev_merkle_root: Previous chunk's Merkle root (hex string)
+        params_dir: Directory for KZG params
+        output_dir: Output directory for proof files (temp dir if None)
+        binary_path: Path to prove_chunk binary (auto-detect if None)
+        timeout: Seconds before the prover is killed (no limit if None)
+        num_threads: Prover thread pool size (RAYON_NUM_THREADS); all cores if None
+        cache: Serve identical requests from this cache instead of proving
+        verify: Verify the proof after proving; if False, write vk.bin for
+            deferred verification with verify_chunks()
+        k: Prove with 2^k rows (default: the smallest k that fits the chunk)
+        num_cols: Number of advice columns (default: the model's)
+        low_memory: Drop the model config after building the circuit, for a
+            smaller peak RSS (does not change the proof)
+    
+    Returns:
+        ProofResult with proof metadata and file paths
+    
+    Raises:
+        FileNotFoundError: If binary or input files not found
+        subprocess.CalledProcessError: If proof generation fails
+        asyncio.TimeoutError: If the timeout expires
+        ValueError: If result.json is invalid
+    """
+    if cache is not None:
+        if binary_path is None:
+            binary_path = find_prove_chunk_binary()
+        key_args = (
+            config_path, input_path, chunk_start, chunk_end,
+            use_merkle, prev_merkle_root, binary_path, verify, k, num_cols, params_dir,
+        )
+        cache_key = cache.key(*key_args)
+        cached = cache.get(cache_key, output_dir) if cache_key is not None else None
+        if cached is not None:
+            return cached
+    
+    cmd, output_dir = _build_command(
+        config_path,
+        input_path,
+        chunk_start,
+        chunk_end,
+        use_merkle,
+        prev_merkle_root,
+        params_dir,
+        output_dir,
+        binary_path,
+        verify,
+        k,
+        num_cols,
+        low_memory,
+    )
+    
+    env = None
+    if num_threads is not None:
+        env = dict(os.environ, RAYON_NUM_THREADS=str(num_threads))
+    
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException:
+        # Timeout or cancellation: don't leave an orphaned prover running
+        if proc.returncode is None:
+            proc.kill()
+            await asyncio.shield(proc.wait())
+        raise
+    
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode,
+            cmd,
+            output=stdout.decode(errors="replace"),
+            stderr=stderr.decode(errors="replace"),
+        )
+    
+    proof_result = _read_result(output_dir)
+    if cache is not None:
+        # The prover creates the master SRS if there was none
+        cache_key = cache_key or cache.key(*key_args)
+        if cache_key is not None:
+            cache.put(cache_key, proof_result)
+    return proof_result
+
+
+# Rough peak memory of one prove_chunk process for MNIST-sized chunks
+DEFAULT_MEMORY_PER_PROOF = 2 * 1024**3
+
+
+def _total_memory_bytes() -> Optional[int]:
+    """Physical memory of this machine, or None if unknown."""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class ProverPool:
+    """
+    Runs prove_chunk_async() calls with bounded concurrency.
+    
+    The number of concurrent provers is capped by the core count and by the
+    memory budget divided by the expected per-proof memory, whichever is lower.
+    Each prover's thread pool is sized so the running provers share the cores
+    instead of oversubscribing them.
+    
+    Example:
+        pool = ProverPool(memory_budget_bytes=64 * 1024**3)
+        results = await asyncio.gather(*[
+            pool.prove_chunk(config, inp, start, end) for start, end in chunks
+        ])
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        memory_budget_bytes: Optional[int] = None,
+        memory_per_proof_bytes: int = DEFAULT_MEMORY_PER_PROOF,
+        params_dir: str = "./params_kzg",
+        binary_path: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[ProofCache] = None,
+        verify: bool = True,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        low_memory: bool = False,
+    ):
+        """
+        Args:
+            max_concurrency: Maximum concurrent provers (core count if None)
+            memory_budget_bytes: Memory available to provers (physical memory if None)
+            memory_per_proof_bytes: Expected peak memory of one prover process
+            params_dir: Directory for KZG params
+            binary_path: Path to prove_chunk binary (auto-detect if None)
+            timeout: Default per-call timeout in seconds (no limit if None)
+            cache: Serve identical requests from this cache instead of proving
+            verify: Verify proofs on the provers; if False, write vk.bin for
+                deferred verification with verify_chunks()
+            k: Default k of every proof (the smallest that fits if None)
+            num_cols: Default number of advice columns (the model's if None)
+            low_memory: Default low_memory setting of every proof
+        """
+        num_cores = os.cpu_count() or 1
+        if max_concurrency is None:
+            max_concurrency = num_cores
+        if memory_budget_bytes is None:
+            memory_budget_bytes = _total_memory_bytes()
+        if memory_budget_bytes is not None:
+            max_concurrency = min(
+                max_concurrency, memory_budget_bytes // memory_per_proof_bytes
+            )
+        
+        self.max_concurrency = max(1, max_concurrency)
+        self.threads_per_proof = max(1, num_cores // self.max_concurrency)
+        self.params_dir = params_dir
+        self.binary_path = binary_path or find_prove_chunk_binary()
+        self.timeout = timeout
+        self.cache = cache
+        self.verify = verify
+        self.k = k
+        self.num_cols = num_cols
+        self.low_memory = low_memory
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+    
+    async def prove_chunk(
+        self,
+        config_path: str,
+        input_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool = False,
+        prev_merkle_root: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        timeout: Optional[float] = None,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        low_memory: Optional[bool] = None,
+    ) -> ProofResult:
+        """
+        Prove a chunk once a prover slot is free.
+        
+        The timeout (defaulting to the pool's) covers proving only, not the
+        time spent waiting for a slot.
+        
+        Args:
+            config_path: Path to model config/weights (msgpack)
+            input_path: Path to input data (msgpack)
+            chunk_start: Start layer index (inclusive)
+            chunk_end: End layer index (exclusive)
+            use_merkle: Enable Merkle tree for intermediate values
+            prev_merkle_root: Previous chunk's Merkle root (hex string)
+            output_dir: Output directory for proof files (temp dir if None)
+            timeout: Seconds before the prover is killed
+            k, num_cols, low_memory: Override the pool's defaults for this proof
+        
+        Returns:
+            ProofResult with proof metadata and file paths
+        """
+        async with self._semaphore:
+            return await prove_chunk_async(
+                config_path,
+                input_path,
+                chunk_start,
+                chunk_end,
+                use_merkle=use_merkle,
+                prev_merkle_root=prev_merkle_root,
+                params_dir=self.params_dir,
+                output_dir=output_dir,
+                binary_path=self.binary_path,
+                timeout=timeout if timeout is not None else self.timeout,
+                num_threads=self.threads_per_proof,
+                cache=self.cache,
+                verify=self.verify,
+                k=k if k is not None else self.k,
+                num_cols=num_cols if num_cols is not None else self.num_cols,
+                low_memory=low_memory if low_memory is not None else self.low_memory,
+            )
+    
+    async def prove_chunks(
+        self,
+        config_path: str,
+        input_path: str,
+        chunks: List[Tuple[int, int]],
+        return_exceptions: bool = False,
+    ) -> List[ProofResult]:
+        """
+        Prove several independent chunks concurrently.
+        
+        Args:
+            config_path: Path to model config/weights (msgpack)
+            input_path: Path to input data (msgpack)
+            chunks: (chunk_start, chunk_end) layer ranges
+            return_exceptions: Return failures in place of results instead of raising
+        
+        Returns:
+            ProofResults in the order of chunks
+        """
+        return await asyncio.gather(
+            *[
+                self.prove_chunk(config_path, input_path, start, end)
+                for start, end in chunks
+            ],
+            return_exceptions=return_exceptions,
+        )
+
+
+def _result_from_json(data: dict, output_dir: Optional[str]) -> ProofResult:
+    """Build a ProofResult from result.json contents written to output_dir."""
+    has_files = output_dir is not None
     return ProofResult(
         chunk_start=data["chunk_start"],
         chunk_end=data["chunk_end"],
@@ -166,12 +1499,647 @@ def prove_chunk(
         verify_time_ms=data["verify_time_ms"],
         proof_size_bytes=data["proof_size_bytes"],
         public_vals_count=data["public_vals_count"],
-        proof_path=os.path.join(output_dir, "proof.bin"),
-        public_vals_path=os.path.join(output_dir, "public_vals.bin"),
+        proof_path=os.path.join(output_dir, "proof.bin") if has_files else None,
+        public_vals_path=(
+            os.path.join(output_dir, "public_vals.bin") if has_files else None
+        ),
         output_dir=output_dir,
+        proof=data.get("proof"),
+        public_vals=data.get("public_vals"),
+        load_time_ms=data.get("load_time_ms"),
+        params_time_ms=data.get("params_time_ms"),
+        keygen_vk_time_ms=data.get("keygen_vk_time_ms"),
+        keygen_pk_time_ms=data.get("keygen_pk_time_ms"),
+        key_load_time_ms=data.get("key_load_time_ms"),
+        witness_time_ms=data.get("witness_time_ms"),
+        serialize_time_ms=data.get("serialize_time_ms"),
+        k=data.get("k"),
+        rows_used=data.get("rows_used"),
+        peak_rss_bytes=data.get("peak_rss_bytes"),
+        vk_path=(
+            os.path.join(output_dir, "vk.bin")
+            if has_files and os.path.exists(os.path.join(output_dir, "vk.bin"))
+            else None
+        ),
+        boundary_path=(
+            os.path.join(output_dir, "boundary.msgpack")
+            if has_files and os.path.exists(os.path.join(output_dir, "boundary.msgpack"))
+            else None
+        ),
+        boundary=data.get("boundary"),
+        num_instances=data.get("num_instances", 1),
+        merkle_roots=data.get("merkle_roots"),
+        boundary_paths=_boundary_paths(output_dir, data.get("num_instances", 1)),
+        vk=data.get("vk"),
+        boundaries=data.get("boundaries"),
     )
 
 
+# ProofResult fields that are not written to result.json
+_RESULT_DATA_FIELDS = ("proof", "public_vals", "vk", "boundary", "boundaries")
+_RESULT_PATH_FIELDS = (
+    "proof_path", "public_vals_path", "output_dir", "vk_path", "boundary_path",
+    "boundary_paths", "cached",
+)
+
+
+def read_outputs(result: ProofResult, remove: bool = False) -> ProofResult:
+    """
+    Load a proof's output files into memory.
+    
+    Fills in proof, public_vals, vk and the boundaries from the files in
+    result.output_dir, so the result can be sent to another process or node
+    (e.g. through the Ray object store) without sharing a filesystem.
+    
+    Args:
+        result: Result of a proof written to output_dir
+        remove: Delete output_dir afterwards and clear the file paths
+    
+    Returns:
+        A new ProofResult with the data in memory
+    """
+    if result.output_dir is None:
+        return result
+    
+    def read(path: Optional[str]) -> Optional[bytes]:
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    
+    boundaries = [read(path) for path in result.boundary_paths or []]
+    loaded = replace(
+        result,
+        proof=result.proof or read(result.proof_path),
+        public_vals=result.public_vals or read(result.public_vals_path),
+        vk=result.vk or read(result.vk_path),
+        boundary=result.boundary or read(result.boundary_path),
+        boundaries=result.boundaries or boundaries or None,
+    )
+    if remove:
+        shutil.rmtree(result.output_dir, ignore_errors=True)
+        loaded = replace(
+            loaded,
+            proof_path=None,
+            public_vals_path=None,
+            output_dir=None,
+            vk_path=None,
+            boundary_path=None,
+            boundary_paths=None,
+        )
+    return loaded
+
+
+class DirectorySink:
+    """
+    Writes proof results to a shared directory, e.g. on NFS or a mounted
+    bucket, in the same layout as prove_chunk's output_dir.
+    
+    Each result is written under its own name and published with an atomic
+    rename, so readers never see a partial entry.
+    """
+    
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory to write results under (created if needed)
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def put(self, name: str, result: ProofResult) -> ProofResult:
+        """
+        Write a result held in memory (see read_outputs()) to root/name.
+        
+        Returns:
+            The result with its file paths pointing into root/name
+        """
+        if result.proof is None or result.public_vals is None:
+            raise ValueError("result has no proof in memory; see read_outputs()")
+        output_dir = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(output_dir), exist_ok=True)
+        
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=os.path.dirname(output_dir))
+        try:
+            files = {
+                "proof.bin": result.proof,
+                "public_vals.bin": result.public_vals,
+                "vk.bin": result.vk,
+            }
+            boundaries = result.boundaries or [result.boundary]
+            if len(boundaries) == 1:
+                files["boundary.msgpack"] = boundaries[0]
+            else:
+                for i, boundary in enumerate(boundaries):
+                    files[f"boundary_{i}.msgpack"] = boundary
+            for file_name, data in files.items():
+                if data is not None:
+                    with open(os.path.join(tmp_dir, file_name), "wb") as f:
+                        f.write(data)
+            metadata = {
+                key: value for key, value in asdict(result).items()
+                if key not in _RESULT_DATA_FIELDS + _RESULT_PATH_FIELDS
+            }
+            with open(os.path.join(tmp_dir, "result.json"), "w") as f:
+                json.dump(metadata, f, indent=2)
+            if os.path.isdir(output_dir):
+                shutil.rmtree(output_dir)
+            os.rename(tmp_dir, output_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        with open(os.path.join(output_dir, "result.json"), "r") as f:
+            data = json.load(f)
+        written = _result_from_json(data, output_dir)
+        return replace(
+            written,
+            proof=result.proof,
+            public_vals=result.public_vals,
+            vk=result.vk,
+            boundary=result.boundary,
+            boundaries=result.boundaries,
+            cached=result.cached,
+        )
+
+
+def _boundary_paths(output_dir: Optional[str], num_instances: int) -> Optional[List[str]]:
+    """Boundary file of each input of a proof, or None if they were not written."""
+    if output_dir is None:
+        return None
+    if num_instances == 1:
+        names = ["boundary.msgpack"]
+    else:
+        names = [f"boundary_{i}.msgpack" for i in range(num_instances)]
+    paths = [os.path.join(output_dir, name) for name in names]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return paths
+
+
+class ProverDaemon:
+    """
+    Long-lived prove_chunk server that keeps params and proving keys warm.
+    
+    Starts `prove_chunk --serve` once and sends each proof request over a Unix
+    socket, so model configs, KZG params and proving keys are loaded only once
+    per process instead of once per chunk. `prove_chunk()` takes the same
+    arguments as the module-level `prove_chunk()` (minus params_dir,
+    binary_path and verify, which are fixed per daemon) and returns the same
+    ProofResult. k, num_cols and low_memory default to the daemon's.
+    
+    Example:
+        with ProverDaemon(params_dir="./params_kzg") as prover:
+            result = prover.prove_chunk(config, inp, 0, 2)
+    """
+    
+    def __init__(
+        self,
+        params_dir: str = "./params_kzg",
+        binary_path: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        startup_timeout: float = 30.0,
+        log_path: Optional[str] = None,
+        verify: bool = True,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        low_memory: bool = False,
+    ):
+        """
+        Args:
+            params_dir: Directory for KZG params
+            binary_path: Path to prove_chunk binary (auto-detect if None)
+            socket_path: Unix socket path (temp path if None)
+            startup_timeout: Seconds to wait for the server socket to appear
+            log_path: File for server stdout/stderr (discarded if None)
+            verify: Verify proofs in the server; if False, write vk.bin for
+                deferred verification with verify_chunks()
+            k: Prove with 2^k rows (default: the smallest k that fits each chunk)
+            num_cols: Number of advice columns (default: the model's)
+            low_memory: Keep nothing resident between proofs, for a smaller
+                peak RSS (does not change the proofs)
+        
+        Raises:
+            FileNotFoundError: If the binary is not found
+            RuntimeError: If the server does not start in time
+        """
+        if binary_path is None:
+            binary_path = find_prove_chunk_binary()
+        os.makedirs(params_dir, exist_ok=True)
+        
+        self.params_dir = params_dir
+        self.binary_path = binary_path
+        self.verify = verify
+        self.k = k
+        self.num_cols = num_cols
+        self._owns_socket_dir = socket_path is None
+        if socket_path is None:
+            socket_path = os.path.join(
+                tempfile.mkdtemp(prefix="zkml_prover_"), "prove_chunk.sock"
+            )
+        self.socket_path = socket_path
+        
+        cmd = [
+            binary_path,
+            "--serve", socket_path,
+            "--params-dir", params_dir,
+        ]
+        cmd.extend(_prover_flags(verify, k, num_cols, low_memory))
+        
+        self._log = open(log_path, "ab") if log_path else subprocess.DEVNULL
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._connect(startup_timeout)
+    
+    @property
+    def pid(self) -> int:
+        """Process id of the prove_chunk server."""
+        return self._process.pid
+    
+    def _connect(self, timeout: float) -> None:
+        """Wait for the server socket and open a connection to it."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    f"prove_chunk server exited with code {self._process.returncode}"
+                )
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError(
+                        f"prove_chunk server did not start within {timeout}s"
+                    )
+                time.sleep(0.05)
+        self._sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+    
+    def _request(self, payload: dict) -> dict:
+        """Send one JSON request line and read one JSON response line."""
+        if self._sock is None:
+            raise RuntimeError("ProverDaemon is closed")
+        self._sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        line = self._reader.readline()
+        if not line:
+            raise RuntimeError(
+                f"prove_chunk server closed the connection "
+                f"(exit code {self._process.poll()})"
+            )
+        return json.loads(line)
+    
+    def prove_chunk(
+        self,
+        config_path: str,
+        input_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool = False,
+        prev_merkle_root: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        cache: Optional[ProofCache] = None,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        low_memory: Optional[bool] = None,
+    ) -> ProofResult:
+        """
+        Generate a ZK proof for a model chunk using the warm server.
+        
+        Args:
+            config_path: Path to model config/weights (msgpack)
+            input_path: Path to input data (msgpack)
+            chunk_start: Start layer index (inclusive)
+            chunk_end: End layer index (exclusive)
+            use_merkle: Enable Merkle tree for intermediate values
+            prev_merkle_root: Previous chunk's Merkle root (hex string)
+            output_dir: Output directory for proof files (temp dir if None)
+            cache: Serve identical requests from this cache instead of proving
+            k: Prove with 2^k rows (default: the daemon's)
+            num_cols: Number of advice columns (default: the daemon's)
+            low_memory: Keep nothing resident after this proof (default: the
+                daemon's)
+        
+        Returns:
+            ProofResult with proof metadata and file paths
+        
+        Raises:
+            FileNotFoundError: If input files not found
+            RuntimeError: If proof generation fails or the server died
+        """
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        if k is None:
+            k = self.k
+        if num_cols is None:
+            num_cols = self.num_cols
+        if cache is not None:
+            key_args = (
+                config_path, input_path, chunk_start, chunk_end, use_merkle,
+                prev_merkle_root, self.binary_path, self.verify, k, num_cols,
+                self.params_dir,
+            )
+            cache_key = cache.key(*key_args)
+            cached = cache.get(cache_key, output_dir) if cache_key is not None else None
+            if cached is not None:
+                return cached
+        
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix="zkml_proof_")
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        response = self._request({
+            "config": os.path.abspath(config_path),
+            "input": os.path.abspath(input_path),
+            "start": chunk_start,
+            "end": chunk_end,
+            "use_merkle": use_merkle,
+            "prev_root": prev_merkle_root,
+            "output_dir": os.path.abspath(output_dir),
+            "k": k,
+            "num_cols": num_cols,
+            "low_memory": low_memory,
+        })
+        
+        if response.get("status") != "ok":
+            raise RuntimeError(f"Proof generation failed: {response.get('error')}")
+        
+        proof_result = _result_from_json(response["result"], output_dir)
+        if cache is not None:
+            # The server creates the master SRS if there was none
+            cache_key = cache_key or cache.key(*key_args)
+            if cache_key is not None:
+                cache.put(cache_key, proof_result)
+        return proof_result
+    
+    def close(self) -> None:
+        """Ask the server to shut down and release its resources."""
+        if self._sock is not None:
+            try:
+                self._sock.sendall(b'{"op": "shutdown"}\n')
+            except OSError:
+                pass
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+        
+        if self._process.poll() is None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        
+        if self._log is not subprocess.DEVNULL:
+            self._log.close()
+            self._log = subprocess.DEVNULL
+        
+        if self._owns_socket_dir:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            try:
+                os.rmdir(os.path.dirname(self.socket_path))
+            except OSError:
+                pass
+            self._owns_socket_dir = False
+    
+    def __enter__(self) -> "ProverDaemon":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class NativeProver:
+    """
+    In-process prover backed by the `zkml_native` extension module.
+    
+    Keeps model configs, KZG params and proving keys resident like
+    ProverDaemon, but runs in the calling process and returns the proof and
+    public values as bytes instead of writing them to a temp directory.
+    Proving releases the GIL.
+    
+    Build the extension with: cd bindings && maturin develop --release
+    """
+    
+    def __init__(
+        self,
+        params_dir: str = "./params_kzg",
+        verify: bool = True,
+        k: Optional[int] = None,
+        num_cols: Optional[int] = None,
+        low_memory: bool = False,
+    ):
+        """
+        Args:
+            params_dir: Directory for KZG params
+            verify: Verify proofs after proving; if False, the verifying key is
+                returned (and written as vk.bin) for deferred verification
+            k: Prove with 2^k rows (default: the smallest k that fits each chunk)
+            num_cols: Number of advice columns (default: the model's)
+            low_memory: Don't keep model configs, params or proving keys
+                resident between proofs (keys are reloaded from the key cache)
+        
+        Raises:
+            ImportError: If the zkml_native extension is not installed
+        """
+        if zkml_native is None:
+            raise ImportError(
+                "zkml_native is not installed. "
+                "Build it with: cd bindings && maturin develop --release"
+            )
+        self.params_dir = params_dir
+        self._prover = zkml_native.ChunkProver(
+            params_dir, verify, k=k, num_cols=num_cols, low_memory=low_memory
+        )
+    
+    def prove_chunk(
+        self,
+        config_path: str,
+        input_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool = False,
+        prev_merkle_root: Optional[str] = None,
+        output_dir: Optional[str] = None,
+    ) -> ProofResult:
+        """
+        Generate a ZK proof for a model chunk in-process.
+        
+        Args:
+            config_path: Path to model config/weights (msgpack)
+            input_path: Path to input data (msgpack)
+            chunk_start: Start layer index (inclusive)
+            chunk_end: End layer index (exclusive)
+            use_merkle: Enable Merkle tree for intermediate values
+            prev_merkle_root: Previous chunk's Merkle root (hex string)
+            output_dir: If set, also write proof.bin, public_vals.bin and
+                result.json here, like the prove_chunk binary
+        
+        Returns:
+            ProofResult with proof and public_vals bytes filled in
+        
+        Raises:
+            FileNotFoundError: If input files not found
+            RuntimeError: If proof generation fails
+        """
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        data = self._prover.prove(
+            config_path,
+            input_path,
+            chunk_start,
+            chunk_end,
+            use_merkle,
+            prev_merkle_root,
+        )
+        
+        if output_dir is not None:
+            self._write_outputs(data, output_dir)
+        
+        return _result_from_json(data, output_dir)
+    
+    def prove_chunk_multi(
+        self,
+        config_path: str,
+        input_paths: List[str],
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool = False,
+        prev_merkle_roots: Optional[List[str]] = None,
+        output_dir: Optional[str] = None,
+    ) -> ProofResult:
+        """
+        Prove several inputs of the same chunk in one proof, in-process.
+        
+        See prove_chunk_multi(); the arguments are the same as prove_chunk()
+        with one input path (and previous Merkle root, if any) per input.
+        
+        Returns:
+            ProofResult with proof and public_vals bytes, num_instances and
+            merkle_roots filled in
+        
+        Raises:
+            FileNotFoundError: If input files not found
+            ValueError: If prev_merkle_roots doesn't match input_paths
+            RuntimeError: If proof generation fails
+        """
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        for input_path in input_paths:
+            if not os.path.exists(input_path):
+                raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        data = self._prover.prove_multi(
+            config_path,
+            input_paths,
+            chunk_start,
+            chunk_end,
+            use_merkle,
+            prev_merkle_roots,
+        )
+        
+        if output_dir is not None:
+            self._write_outputs(data, output_dir)
+        
+        return _result_from_json(data, output_dir)
+    
+    def warmup(
+        self,
+        config_path: str,
+        input_path: str,
+        chunk_start: int,
+        chunk_end: int,
+        use_merkle: bool = False,
+        prev_merkle_root: Optional[str] = None,
+    ) -> dict:
+        """
+        Load the config, params and proving key for a chunk without proving.
+        
+        k is picked from the input's values like in prove_chunk(), so pass a
+        representative input; later proofs with the same k skip all setup.
+        
+        Returns:
+            Dict with k, rows_used and the setup timings (load_time_ms,
+            params_time_ms, keygen_vk_time_ms, keygen_pk_time_ms,
+            key_load_time_ms, witness_time_ms)
+        
+        Raises:
+            FileNotFoundError: If input files not found
+            RuntimeError: If setup fails
+        """
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        return self._prover.warmup(
+            config_path,
+            input_path,
+            chunk_start,
+            chunk_end,
+            use_merkle,
+            prev_merkle_root,
+        )
+    
+    def memory_report(self) -> dict:
+        """
+        What the prover keeps resident and the process's memory use.
+        
+        Returns:
+            Dict with configs and proving_keys (counts held), params_ks (k of
+            each params set held), rss_bytes and peak_rss_bytes
+        """
+        return self._prover.memory_report()
+    
+    @staticmethod
+    def _write_outputs(data: dict, output_dir: str) -> None:
+        """Write the files the prove_chunk binary would write to output_dir."""
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "proof.bin"), "wb") as f:
+            f.write(data["proof"])
+        with open(os.path.join(output_dir, "public_vals.bin"), "wb") as f:
+            f.write(data["public_vals"])
+        if data.get("vk") is not None:
+            with open(os.path.join(output_dir, "vk.bin"), "wb") as f:
+                f.write(data["vk"])
+        boundaries = data["boundaries"]
+        for i, boundary in enumerate(boundaries):
+            name = (
+                "boundary.msgpack" if len(boundaries) == 1
+                else f"boundary_{i}.msgpack"
+            )
+            with open(os.path.join(output_dir, name), "wb") as f:
+                f.write(boundary)
+        metadata = {
+            k: v for k, v in data.items()
+            if k not in ("proof", "public_vals", "vk", "boundary", "boundaries")
+        }
+        with open(os.path.join(output_dir, "result.json"), "w") as f:
+            json.dump(metadata, f, indent=2)
+
+
 if __name__ == "__main__":
     # Simple test
     import sys
@@ -201,6 +2169,14 @@ if __name__ == "__main__":
         print(f"  Verify time: {result.verify_time_ms}ms")
         print(f"  Proof size: {result.proof_size_bytes} bytes")
         print(f"  Public values: {result.public_vals_count}")
+        print(f"  k: {result.k}, rows used: {result.rows_used}")
+        print(
+            f"  Phases (ms): load={result.load_time_ms} params={result.params_time_ms} "
+            f"keygen_vk={result.keygen_vk_time_ms} keygen_pk={result.keygen_pk_time_ms} "
+            f"key_load={result.key_load_time_ms} "
+            f"witness={result.witness_time_ms} serialize={result.serialize_time_ms}"
+        )
+        print(f"  Peak RSS: {result.peak_rss_bytes} bytes")
         print(f"  Output dir: {result.output_dir}")
     except Exception as e:
         print(f"Error: {e}")
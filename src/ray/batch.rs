@@ -1,19 +1,24 @@
 //! Batch inference using Ray for distributed processing
 //!
-//! This module provides functions to run multiple inferences in parallel
-//! across Ray workers.
+//! This module provides functions to run multiple inferences in parallel.
+//! Params and the proving key are set up once per batch and shared by all
+//! proofs, which run on a rayon thread pool.
 
 use std::sync::Arc;
 
+use rayon::prelude::*;
+
 use super::shared::{InferenceInput, ProofResult, SharedResources};
+use super::worker::generate_proof_worker;
 
-/// Run batch inference across Ray workers
+/// Run batch inference on a local thread pool
 ///
 /// # Arguments
 /// * `model_config` - Path to model configuration file
-/// * `input_paths` - List of paths to input files
-/// * `backend` - "kzg" or "ipa"
-/// * `num_workers` - Optional number of Ray workers (None = use all available)
+/// * `input_paths` - List of paths to input files (all with the same shapes)
+/// * `backend` - Proving backend; only "kzg" is supported
+/// * `num_workers` - Number of proving threads (None = one per core). The proofs'
+///   own parallel FFTs and MSMs run on the same pool.
 ///
 /// # Returns
 /// Vector of proof results in the same order as input_paths
@@ -23,39 +28,46 @@ pub fn batch_inference(
     backend: &str,
     num_workers: Option<usize>,
 ) -> Result<Vec<ProofResult>, Box<dyn std::error::Error>> {
-    // Check if Ray is available
-    // Note: This is a placeholder - actual Ray integration would use the Ray Rust API
-    
-    // For now, we'll provide a sequential fallback
-    // In a real implementation, this would:
-    // 1. Initialize Ray cluster
-    // 2. Load shared resources (model config, proving keys)
-    // 3. Distribute inputs across workers
-    // 4. Collect results
-    
-    println!("Running batch inference for {} inputs", input_paths.len());
-    println!("Note: Ray integration is a placeholder - using sequential execution");
-    
-    // Sequential execution (fallback)
-    let mut results = Vec::new();
-    for (i, input_path) in input_paths.iter().enumerate() {
-        println!("Processing input {}: {}", i, input_path);
-        
-        // In real implementation, this would be:
-        // let result = ray::spawn(|| {
-        //     generate_proof_worker(&shared_resources, InferenceInput {
-        //         input_path: input_path.clone(),
-        //         index: i,
-        //     })
-        // }).get()?;
-        
-        // For now, use local execution
-        use super::worker::generate_proof_local;
-        let result = generate_proof_local(model_config, input_path, backend)?;
-        results.push(result);
+    if input_paths.is_empty() {
+        return Ok(vec![]);
+    }
+    if backend != "kzg" {
+        return Err(format!("Unsupported backend {:?}, only \"kzg\" is supported", backend).into());
+    }
+
+    // Params and proving key are set up once and shared by all proofs
+    let shared = initialize_shared_resources(model_config, backend)?;
+
+    let mut pool = rayon::ThreadPoolBuilder::new();
+    if let Some(num_workers) = num_workers {
+        pool = pool.num_threads(num_workers);
     }
-    
-    Ok(results)
+    let pool = pool.build()?;
+
+    println!(
+        "Running batch inference for {} inputs on {} threads",
+        input_paths.len(),
+        pool.current_num_threads()
+    );
+
+    let results: Vec<_> = pool.install(|| {
+        input_paths
+            .par_iter()
+            .enumerate()
+            .map(|(index, input_path)| {
+                generate_proof_worker(
+                    &shared,
+                    InferenceInput {
+                        input_path: input_path.clone(),
+                        index,
+                    },
+                )
+                .map_err(|e| format!("Input {} ({}): {}", index, input_path, e))
+            })
+            .collect()
+    });
+
+    Ok(results.into_iter().collect::<Result<Vec<_>, _>>()?)
 }
 
 /// Initialize shared resources for Ray workers
@@ -66,13 +78,12 @@ pub fn initialize_shared_resources(
     model_config: &str,
     backend: &str,
 ) -> Result<Arc<SharedResources>, Box<dyn std::error::Error>> {
-    let mut shared = SharedResources::from_model_config(model_config)?;
-    
+    let mut shared = SharedResources::from_model_config(model_config, "./params_kzg")?;
+
     // Generate proving key if using KZG
     if backend == "kzg" {
         shared.generate_proving_key()?;
     }
-    
+
     Ok(Arc::new(shared))
 }
-
@@ -2,10 +2,13 @@
 //!
 //! This module manages shared resources like model configurations and proving keys
 //! that can be reused across multiple Ray workers.
+//!
+//! Proving keys go through the on-disk key cache in the params directory, so the
+//! workers on a node that share it run keygen once between them.
 
 use std::sync::Arc;
 use halo2_proofs::{
-    halo2curves::bn256::{Bn256, Fr},
+    halo2curves::bn256::{Bn256, Fr, G1Affine},
     plonk::ProvingKey,
     poly::kzg::commitment::ParamsKZG,
 };
@@ -13,35 +16,51 @@ use serde::{Deserialize, Serialize};
 
 use zkml::{
     model::ModelCircuit,
-    utils::proving_kzg::get_kzg_params,
+    utils::{
+        loader::{attach_input_shapes, load_config_msgpack, ModelMsgpack},
+        proving_kzg::{get_kzg_params, get_or_create_pk},
+    },
 };
 
 /// Shared resources that can be reused across Ray workers
 #[derive(Clone)]
 pub struct SharedResources {
-    /// Model circuit (without witness data)
+    /// Model configuration (without inputs), used to build each input's circuit
+    pub config: Arc<ModelMsgpack>,
+    /// Directory with the KZG params and the proving key cache
+    pub params_dir: String,
+    /// Model circuit the proving key is generated for (without witness data)
     pub circuit: Arc<ModelCircuit<Fr>>,
     /// Proving parameters
     pub params: Arc<ParamsKZG<Bn256>>,
     /// Proving key (if available)
-    pub proving_key: Option<Arc<ProvingKey<Bn256>>>,
+    pub proving_key: Option<Arc<ProvingKey<G1Affine>>>,
     /// Circuit degree
     pub degree: u32,
 }
 
 impl SharedResources {
     /// Create shared resources from model configuration
-    pub fn from_model_config(config_path: &str) -> Result<Self, Box<dyn std::error::Error>> {
-        // Load model circuit (without input data)
-        // Note: This is a placeholder - actual implementation would need to
-        // load the model config separately from input data
-        let circuit = ModelCircuit::<Fr>::generate_from_file(config_path, config_path)?;
+    ///
+    /// No input is needed: the model inputs are zero placeholders with the shapes the
+    /// layers read them with, so inputs proven with these resources must have those shapes.
+    pub fn from_model_config(
+        config_path: &str,
+        params_dir: &str,
+    ) -> Result<Self, Box<dyn std::error::Error>> {
+        let config = load_config_msgpack(config_path);
+        let circuit = ModelCircuit::<Fr>::generate_from_msgpack(
+            attach_input_shapes(config.clone()),
+            false,
+        );
         let degree = circuit.k as u32;
         
         // Load or generate parameters
-        let params = Arc::new(get_kzg_params("./params_kzg", degree));
+        let params = Arc::new(get_kzg_params(params_dir, degree));
         
         Ok(SharedResources {
+            config: Arc::new(config),
+            params_dir: params_dir.to_string(),
             circuit: Arc::new(circuit),
             params,
             proving_key: None,
@@ -49,14 +68,14 @@ impl SharedResources {
         })
     }
     
-    /// Generate and cache the proving key
+    /// Load the proving key from the key cache, or generate and store it
+    ///
+    /// Only the first worker on a node to get here runs keygen; the others wait for it
+    /// and read the stored key (see `get_or_create_pk`).
     pub fn generate_proving_key(&mut self) -> Result<(), Box<dyn std::error::Error>> {
-        use halo2_proofs::plonk::{keygen_pk, keygen_vk};
-        
-        let vk = keygen_vk(&self.params, &*self.circuit)?;
-        let pk = keygen_pk(&self.params, vk, &*self.circuit)?;
+        let loaded = get_or_create_pk(&self.params_dir, &self.params, &self.circuit);
         
-        self.proving_key = Some(Arc::new(pk));
+        self.proving_key = Some(Arc::new(loaded.pk));
         Ok(())
     }
 }
@@ -4,51 +4,69 @@
 
 use std::time::Instant;
 use halo2_proofs::{
-    halo2curves::bn256::Fr,
-    plonk::{create_proof, ProvingKey},
-    poly::kzg::commitment::ParamsKZG,
-    transcript::{Blake2bWrite, Challenge255},
+    halo2curves::bn256::{Bn256, Fr, G1Affine},
+    plonk::create_proof,
+    poly::kzg::{commitment::KZGCommitmentScheme, multiopen::ProverSHPLONK},
+    transcript::{Blake2bWrite, Challenge255, TranscriptWriterBuffer},
 };
 use rand::thread_rng;
 
 use zkml::{
     model::ModelCircuit,
-    utils::helpers::get_public_values,
+    utils::{
+        helpers::get_public_values, loader::attach_input_msgpack, witness::synthesize_witness,
+    },
 };
 
 use super::shared::{InferenceInput, ProofResult, SharedResources};
 
+/// Errors from proving, which can be sent back from worker threads
+pub type WorkerError = Box<dyn std::error::Error + Send + Sync>;
+
 /// Generate a proof for a single input
 ///
-/// This function is designed to be called on Ray workers.
-/// It loads the input, creates a circuit with witness data, and generates a proof.
+/// This function is designed to be called on Ray workers, many times per
+/// `SharedResources`: it only builds the input's circuit and proves it with the shared
+/// params and proving key.
 pub fn generate_proof_worker(
     shared: &SharedResources,
     input: InferenceInput,
-) -> Result<ProofResult, Box<dyn std::error::Error>> {
+) -> Result<ProofResult, WorkerError> {
     let start = Instant::now();
-    
+
     // Load the input data and create circuit with witness
-    let circuit = ModelCircuit::<Fr>::generate_from_file(
-        "model.msgpack", // This would need to be passed or loaded differently
-        &input.input_path,
-    );
-    
+    let config = attach_input_msgpack((*shared.config).clone(), &input.input_path);
+    let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, true);
+
+    // The proving key only fits inputs with the shapes it was generated for
+    for idx in shared.circuit.inp_idxes.iter() {
+        let shape = circuit.tensors.get(idx).map(|tensor| tensor.shape());
+        let expected = shared.circuit.tensors.get(idx).map(|tensor| tensor.shape());
+        if shape != expected {
+            return Err(format!(
+                "{}: input {} has shape {:?}, the model expects {:?}",
+                input.input_path, idx, shape, expected
+            )
+            .into());
+        }
+    }
+
     // Get proving key (should be pre-generated and shared)
     let pk = shared.proving_key.as_ref()
         .ok_or("Proving key not generated")?;
-    
-    // Get public values (this is set during circuit synthesis)
-    let public_vals = get_public_values();
-    
+
+    // Get public values (computed by a witness-only synthesis of this circuit)
+    synthesize_witness(&circuit, shared.degree)?;
+    let public_vals = get_public_values(&circuit);
+
     // Generate proof
-    let mut transcript = Blake2bWrite::<_, _, Challenge255<_>>::init(vec![]);
+    let mut transcript = Blake2bWrite::<_, G1Affine, Challenge255<_>>::init(vec![]);
     create_proof::<
+        KZGCommitmentScheme<Bn256>,
+        ProverSHPLONK<'_, Bn256>,
+        Challenge255<G1Affine>,
         _,
-        _,
-        _,
-        _,
-        Blake2bWrite<Vec<u8>, _, _>,
+        Blake2bWrite<Vec<u8>, G1Affine, Challenge255<G1Affine>>,
         ModelCircuit<Fr>,
     >(
         &shared.params,
@@ -58,17 +76,17 @@ pub fn generate_proof_worker(
         thread_rng(),
         &mut transcript,
     )?;
-    
+
     let proof = transcript.finalize();
-    
+
     // Serialize public values
     let public_vals_bytes: Vec<Vec<u8>> = public_vals
         .iter()
         .map(|v| v.to_bytes().to_vec())
         .collect();
-    
+
     let time_ms = start.elapsed().as_millis() as u64;
-    
+
     Ok(ProofResult {
         proof,
         public_vals: public_vals_bytes,
@@ -77,37 +95,25 @@ pub fn generate_proof_worker(
     })
 }
 
-/// Simplified version that doesn't require Ray (for testing)
+/// Prove a single input without Ray (for testing)
+///
+/// Sets up params and the proving key for this input alone; use `batch_inference` to
+/// share them across inputs.
 pub fn generate_proof_local(
     model_config: &str,
     input_path: &str,
     backend: &str,
 ) -> Result<ProofResult, Box<dyn std::error::Error>> {
-    use zkml::utils::proving_kzg::time_circuit_kzg;
-    use zkml::utils::proving_ipa::time_circuit_ipa;
-    use halo2_proofs::halo2curves::pasta::Fp;
-    
-    let start = Instant::now();
-    
-    // This is a simplified version - in practice you'd want to
-    // separate proof generation from timing
-    if backend == "kzg" {
-        let circuit = ModelCircuit::<Fr>::generate_from_file(model_config, input_path);
-        // Note: time_circuit_kzg prints timing info but doesn't return proof
-        // For actual implementation, we'd need a version that returns the proof
-        time_circuit_kzg(circuit);
-    } else {
-        let circuit = ModelCircuit::<Fp>::generate_from_file(model_config, input_path);
-        time_circuit_ipa(circuit);
+    if backend != "kzg" {
+        return Err(format!("Unsupported backend {:?}, only \"kzg\" is supported", backend).into());
     }
-    
-    // In a real implementation, we'd capture the proof here
-    // For now, this is a placeholder
-    Ok(ProofResult {
-        proof: vec![], // Would contain actual proof
-        public_vals: vec![], // Would contain actual public values
+
+    let mut shared = SharedResources::from_model_config(model_config, "./params_kzg")?;
+    shared.generate_proving_key()?;
+
+    let input = InferenceInput {
+        input_path: input_path.to_string(),
         index: 0,
-        time_ms: start.elapsed().as_millis() as u64,
-    })
+    };
+    generate_proof_worker(&shared, input).map_err(|e| e as Box<dyn std::error::Error>)
 }
-
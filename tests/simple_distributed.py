@@ -16,13 +16,18 @@ Usage:
 """
 
 import ray
+import hashlib
 import json
 import os
+import shutil
+import statistics
 import sys
 import logging
 import tempfile
-from dataclasses import asdict
-from typing import Dict, List, Tuple, Optional
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 
 # Add parent dir to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -33,56 +38,76 @@ logging.getLogger("ray").setLevel(logging.WARNING)
 
 @ray.remote
 class ChunkWorker:
-    """Ray worker for proving a model chunk"""
+    """Ray worker for proving a model chunk
     
-    def __init__(self, chunk_id: int, use_real_prover: bool = False):
+    In real mode it holds a warm python.chunk_worker.ChunkWorker, so params and
+    the proving key are loaded on the first call and reused for later inputs.
+    Proofs and boundaries are returned through the object store, so nothing
+    is read from or left on the worker's disk; with sink_dir they are also
+    written to that (shared) directory.
+    """
+    
+    def __init__(
+        self,
+        chunk_id: int,
+        use_real_prover: bool = False,
+        sink_dir: Optional[str] = None,
+    ):
         self.chunk_id = chunk_id
         self.use_real_prover = use_real_prover
+        self.sink_dir = sink_dir
         self._prover = None
+        self._prover_key = None
         
-    def _get_prover(self):
-        """Lazy load the prover module (only when real proving)"""
-        if self._prover is None and self.use_real_prover:
-            from python.rust_prover import prove_chunk
-            self._prover = prove_chunk
+    def _get_prover(self, model_config: str, layer_start: int, layer_end: int, params_dir: str):
+        """Warm prover for this chunk (created on first use, real proving only)"""
+        key = (model_config, layer_start, layer_end, params_dir)
+        if self._prover_key != key:
+            from python.chunk_worker import ChunkWorker as WarmChunkWorker
+            from python.rust_prover import DirectorySink
+            if self._prover is not None:
+                self._prover.close()
+            sink = DirectorySink(self.sink_dir) if self.sink_dir else None
+            self._prover = WarmChunkWorker(
+                model_config, layer_start, layer_end, params_dir, sink=sink
+            )
+            self._prover_key = key
         return self._prover
         
+    @ray.method(num_returns=2)
     def prove_chunk(
         self,
         model_config: str,
-        input_path: str,
+        chunk_input,
         layer_start: int,
         layer_end: int,
         params_dir: str = "./params_kzg",
-    ) -> Dict:
+    ) -> Tuple[Dict, Optional[bytes]]:
         """
         Prove a chunk of the model.
         
         Args:
             model_config: Path to model config/weights (msgpack)
-            input_path: Path to input data (msgpack)
+            chunk_input: Input data (msgpack bytes or path), or the previous
+                chunk's boundary bytes if layer_start > 0
             layer_start: Start layer index (inclusive)
             layer_end: End layer index (exclusive)
             params_dir: Directory for KZG params
         
         Returns:
-            Dict with proof result metadata
+            (result, boundary): the proof result with the proof bytes and the
+            public values as a (count, 32) uint8 array, and the boundary to
+            pass to the next chunk as its own object (None on failure or in
+            simulation). Returned separately, the boundary goes straight from
+            this worker to the next one.
         """
         print(f"Worker {self.chunk_id}: Proving layers {layer_start}-{layer_end}")
         
         if self.use_real_prover:
-            # Real proof generation using Rust binary
-            prove_chunk = self._get_prover()
-            
+            # Real proof generation; Merkle is off (known issue #12)
             try:
-                result = prove_chunk(
-                    config_path=model_config,
-                    input_path=input_path,
-                    chunk_start=layer_start,
-                    chunk_end=layer_end,
-                    use_merkle=False,  # Merkle has known issue (#12)
-                    params_dir=params_dir,
-                )
+                prover = self._get_prover(model_config, layer_start, layer_end, params_dir)
+                result = prover.prove(chunk_input)
                 
                 return {
                     "chunk_id": self.chunk_id,
@@ -92,11 +117,13 @@ class ChunkWorker:
                     "proving_time_ms": result.proving_time_ms,
                     "verify_time_ms": result.verify_time_ms,
                     "public_vals_count": result.public_vals_count,
-                    "proof_path": result.proof_path,
+                    "proof": result.proof,
+                    "public_vals": result.public_vals_array(),
+                    # Set only when written to the sink
                     "output_dir": result.output_dir,
                     "status": "success",
                     "mode": "real",
-                }
+                }, result.boundary
             except Exception as e:
                 return {
                     "chunk_id": self.chunk_id,
@@ -104,7 +131,7 @@ class ChunkWorker:
                     "status": "error",
                     "error": str(e),
                     "mode": "real",
-                }
+                }, None
         else:
             # Simulation mode (placeholder)
             return {
@@ -114,11 +141,37 @@ class ChunkWorker:
                 "proof_size": 3360,  # Typical size
                 "status": "success",
                 "mode": "simulation",
-            }
+            }, None
 
 
-def partition_model(num_layers: int, num_chunks: int) -> List[Tuple[int, int]]:
-    """Partition model into chunks by layer ranges."""
+def partition_model(
+    num_layers: int,
+    num_chunks: int,
+    model_config: Optional[str] = None,
+    max_k: Optional[int] = None,
+    layer_times: Optional[List[float]] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Partition model into chunks by layer ranges.
+    
+    With a model_config, chunks have roughly equal proving cost (estimated
+    rows, or layer_times if given) and fit in 2**max_k rows, so there may be
+    more chunks than num_chunks. Falls back to equal layer counts if the
+    layer_costs binary is not built.
+    """
+    if model_config is not None:
+        from python.rust_prover import partition_model_by_cost
+        try:
+            return partition_model_by_cost(
+                model_config,
+                num_chunks,
+                max_k=max_k,
+                layer_times=layer_times,
+                num_layers=num_layers,
+            )
+        except FileNotFoundError:
+            print("layer_costs binary not found, partitioning by layer count")
+    
     layers_per_chunk = num_layers // num_chunks
     chunks = []
     for i in range(num_chunks):
@@ -128,6 +181,192 @@ def partition_model(num_layers: int, num_chunks: int) -> List[Tuple[int, int]]:
     return chunks
 
 
+def chunk_worker_options(
+    model_config: str,
+    chunks: List[Tuple[int, int]],
+    use_real_prover: bool,
+    max_cpus: Optional[int] = None,
+    memory_scale: float = 1.0,
+) -> List[Dict]:
+    """
+    Ray options of each chunk's worker, reserving its chunk's estimated
+    memory and CPUs.
+    
+    Ray then only places a worker on a node with room for its chunk, instead
+    of packing a k=20 chunk next to others until it is OOM-killed. Simulated
+    chunks, and models without the layer_costs binary, get Ray's defaults.
+    Raises ValueError if a chunk needs more memory than any node has, since
+    its worker would never be scheduled.
+    """
+    if not use_real_prover:
+        return [{} for _ in chunks]
+    from python.rust_prover import estimate_chunk_resources
+    
+    nodes = [node["Resources"] for node in ray.nodes() if node["Alive"]]
+    node_memory = max((node.get("memory", 0) for node in nodes), default=0)
+    if max_cpus is None:
+        max_cpus = int(max((node.get("CPU", 1) for node in nodes), default=1))
+    try:
+        resources = estimate_chunk_resources(
+            model_config, chunks, max_cpus=max_cpus, memory_scale=memory_scale
+        )
+    except FileNotFoundError:
+        print("layer_costs binary not found, workers get default resources")
+        return [{} for _ in chunks]
+    
+    for r in resources:
+        print(f"  Chunk [{r.start}, {r.end}): ~{r.rows} rows, k={r.k}, "
+              f"{r.memory_bytes / 1024**3:.1f} GiB, {r.num_cpus} CPUs")
+        if node_memory and r.memory_bytes > node_memory:
+            raise ValueError(
+                f"Chunk [{r.start}, {r.end}) needs ~{r.memory_bytes / 1024**3:.1f} GiB, "
+                f"more than any node has ({node_memory / 1024**3:.1f} GiB); "
+                f"use more workers or a smaller --max-k"
+            )
+    return [r.ray_options() for r in resources]
+
+
+def _put_input(input_path: str, use_real_prover: bool):
+    """The input's bytes in the object store, so workers on any node can read
+    it (simulation mode only passes the path)"""
+    if not use_real_prover:
+        return input_path
+    with open(input_path, "rb") as f:
+        return ray.put(f.read())
+
+
+class ChunkCheckpoint:
+    """
+    Completed chunk results on disk, so a restarted job resumes where it stopped.
+    
+    Each chunk result is stored under a key derived from everything the proof
+    depends on: the model config's and the input's contents, the layer range,
+    the KZG setup and the prover options. An entry holds result.json,
+    proof.bin, public_vals.bin and the boundary the next chunk starts from.
+    manifest.json lists the completed entries. Entries and the manifest are
+    published with an atomic rename, so a job killed mid-write leaves no
+    partial entry.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        # File digests, memoized by (path, mtime, size), so the model config
+        # is hashed once rather than for every chunk of every input
+        self._digests = {}
+    
+    def _file_digest(self, path: str) -> str:
+        st = os.stat(path)
+        memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digest = h.hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+    
+    def key(
+        self,
+        model_config: str,
+        input_path: str,
+        start: int,
+        end: int,
+        use_real_prover: bool,
+        params_dir: str = "./params_kzg",
+        k: Optional[int] = None,
+        use_merkle: bool = False,
+        verify: bool = True,
+    ) -> str:
+        """
+        Key of a chunk's result.
+        
+        Real proofs are keyed on the master SRS under params_dir (see
+        ProofCache), so a job restarted against another setup proves again.
+        Before the first proof has created the master the key matches
+        nothing, which is right: no proof against it can be saved yet.
+        """
+        from python.rust_prover import ProofCache
+        h = hashlib.sha256()
+        for part in (
+            self._file_digest(model_config),
+            self._file_digest(input_path),
+            f"{start}-{end}",
+            "real" if use_real_prover else "simulation",
+            str(ProofCache._srs_digest(params_dir) if use_real_prover else None),
+            str(k),
+            str(use_merkle),
+            str(verify),
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[Dict, Optional[bytes]]]:
+        """(result, boundary) of a completed chunk, or None"""
+        if key not in self.manifest:
+            return None
+        entry_dir = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry_dir, "result.json")) as f:
+                result = json.load(f)
+            files = {}
+            for name in ("proof.bin", "public_vals.bin", "boundary.msgpack"):
+                path = os.path.join(entry_dir, name)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        files[name] = f.read()
+        except OSError:
+            return None
+        if "proof.bin" in files:
+            result["proof"] = files["proof.bin"]
+        if "public_vals.bin" in files:
+            import numpy as np
+            result["public_vals"] = np.frombuffer(
+                files["public_vals.bin"], dtype=np.uint8
+            ).reshape(-1, 32)
+        result["resumed"] = True
+        return result, files.get("boundary.msgpack")
+    
+    def put(self, key: str, result: Dict, boundary: Optional[bytes], input_path: str) -> None:
+        entry_dir = os.path.join(self.directory, key)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.directory)
+        try:
+            files = {"boundary.msgpack": boundary, "proof.bin": result.get("proof")}
+            if result.get("public_vals") is not None:
+                files["public_vals.bin"] = result["public_vals"].tobytes()
+            for name, data in files.items():
+                if data is not None:
+                    with open(os.path.join(tmp_dir, name), "wb") as f:
+                        f.write(data)
+            metadata = {k: v for k, v in result.items() if k not in ("proof", "public_vals")}
+            with open(os.path.join(tmp_dir, "result.json"), "w") as f:
+                json.dump(metadata, f, indent=2)
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.rename(tmp_dir, entry_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        self.manifest[key] = {
+            "input": input_path,
+            "layers": result.get("proved_layers"),
+            "completed_at": time.time(),
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
 def distributed_prove(
     model_config: str,
     input_path: str,
@@ -136,6 +375,15 @@ def distributed_prove(
     use_real_prover: bool = False,
     params_dir: str = "./params_kzg",
     sequential: bool = True,
+    max_k: Optional[int] = None,
+    layer_times: Optional[List[float]] = None,
+    sink_dir: Optional[str] = None,
+    max_retries: int = 2,
+    retry_backoff_s: float = 1.0,
+    speculation_factor: Optional[float] = 2.0,
+    checkpoint_dir: Optional[str] = None,
+    max_cpus_per_chunk: Optional[int] = None,
+    memory_scale: float = 1.0,
 ) -> List[Dict]:
     """
     Distributed proof generation with Ray.
@@ -147,64 +395,374 @@ def distributed_prove(
         num_workers: Number of Ray workers (chunks)
         use_real_prover: If True, use Rust prover; otherwise simulation
         params_dir: Directory for KZG params (real mode only)
-        sequential: If True, run chunks sequentially (required for real proofs
-                   since each chunk needs outputs from previous layers)
+        sequential: If True, run chunks one after another, each starting from
+                   the boundary the previous chunk's proof returns. If False,
+                   real chunks start from boundaries computed up front by one
+                   evaluation of the model (chunk_boundaries), and are all
+                   proven at once
+        max_k: Largest k a chunk may need; adds chunks (and workers) if the
+               layers don't fit in num_workers chunks
+        layer_times: Measured proving time per layer, to balance chunks on
+                     instead of the estimated rows
+        sink_dir: Also write every proof to this directory (shared storage)
+        max_retries, retry_backoff_s, speculation_factor, checkpoint_dir:
+            Fault tolerance, see distributed_prove_stream
+        max_cpus_per_chunk: Most CPUs to reserve for one chunk's worker
+                            (default: the largest node's)
+        memory_scale: Factor applied to the estimated memory of each chunk
     
     Returns:
-        List of chunk results
+        List of chunk results; real proofs carry the proof bytes and public
+        values in memory
     """
-    # Partition model into chunks
-    chunks = partition_model(num_layers, num_workers)
+    if sequential and use_real_prover:
+        print("\nNote: Running sequentially (each chunk starts from the previous boundary)")
+    for _, _, results in distributed_prove_stream(
+        model_config,
+        [input_path],
+        num_layers,
+        num_workers,
+        use_real_prover=use_real_prover,
+        params_dir=params_dir,
+        max_k=max_k,
+        layer_times=layer_times,
+        sink_dir=sink_dir,
+        max_retries=max_retries,
+        retry_backoff_s=retry_backoff_s,
+        speculation_factor=speculation_factor,
+        checkpoint_dir=checkpoint_dir,
+        max_cpus_per_chunk=max_cpus_per_chunk,
+        memory_scale=memory_scale,
+        parallel=not sequential,
+    ):
+        return results
+
+
+@dataclass
+class _ChunkTask:
+    """One chunk of one input, across its attempts"""
+    index: int
+    chunk_idx: int
+    chunk_input: object
+    attempts: int = 0
+    # Earliest time of the next attempt (retry backoff)
+    not_before: float = 0.0
+    # Attempts currently running (more than one while speculating)
+    running: int = 0
+    speculated: bool = False
+    done: bool = False
+
+
+def distributed_prove_stream(
+    model_config: str,
+    input_paths: Iterable[str],
+    num_layers: int = 4,
+    num_workers: int = 2,
+    use_real_prover: bool = False,
+    params_dir: str = "./params_kzg",
+    max_k: Optional[int] = None,
+    layer_times: Optional[List[float]] = None,
+    max_in_flight: Optional[int] = None,
+    sink_dir: Optional[str] = None,
+    max_retries: int = 2,
+    retry_backoff_s: float = 1.0,
+    speculation_factor: Optional[float] = 2.0,
+    checkpoint_dir: Optional[str] = None,
+    max_cpus_per_chunk: Optional[int] = None,
+    memory_scale: float = 1.0,
+    parallel: bool = False,
+) -> Iterator[Tuple[int, str, List[Dict]]]:
+    """
+    Pipelined, fault-tolerant proof generation for a stream of inputs.
     
-    # Create workers
-    workers = [
-        ChunkWorker.remote(i, use_real_prover=use_real_prover) 
-        for i in range(num_workers)
-    ]
+    Each chunk has its own worker. As soon as chunk i of an input is proven,
+    chunk i+1 of that input is queued on the next worker, from chunk i's
+    boundary, while worker i moves on to the next input. With steady traffic
+    every worker stays busy and an input completes every slowest-chunk time
+    instead of every total proving time.
     
-    results = []
+    A failed chunk (error result or dead worker) is retried with exponential
+    backoff; dead workers are replaced. A chunk running speculation_factor
+    times longer than the median of its earlier attempts gets a duplicate on
+    a spare worker, and the first result wins. With checkpoint_dir, every
+    completed chunk is saved, and a restarted job skips the chunks it
+    already proved.
     
-    if sequential and use_real_prover:
-        # Sequential execution: each chunk proves from layer 0 to its end
-        # This ensures all intermediate values are computed
-        # Each proof covers [0, chunk_end) but we track which layers each "owns"
-        print("\nNote: Running sequentially (each chunk proves [0, end) range)")
+    With parallel, all chunks of an input are queued at once instead: real
+    chunks start from boundaries computed up front by one evaluation of the
+    model (chunk_boundaries), simulated ones from the model input. Retries,
+    speculation and checkpoints work the same.
+    
+    Args:
+        model_config: Path to model configuration
+        input_paths: Inputs to prove; consumed lazily, so it may be a generator
+        num_layers: Total number of layers in model
+        num_workers: Number of Ray workers (chunks)
+        use_real_prover: If True, use Rust prover; otherwise simulation
+        params_dir: Directory for KZG params (real mode only)
+        max_k: Largest k a chunk may need (see distributed_prove)
+        layer_times: Measured proving time per layer (see distributed_prove)
+        max_in_flight: Most inputs being proven at once (default: twice the
+                       number of chunks), which bounds the queued work
+        sink_dir: Also write every proof to this directory (shared storage)
+        max_retries: Attempts after the first before a chunk is given up
+        retry_backoff_s: Delay before the first retry, doubled for each next one
+        speculation_factor: Straggler threshold relative to the chunk's median
+                            time (None disables speculation)
+        checkpoint_dir: Directory for the checkpoint manifest (None = off)
+        max_cpus_per_chunk: Most CPUs to reserve for one chunk's worker
+                            (default: the largest node's)
+        memory_scale: Factor applied to the estimated memory of each chunk
+        parallel: Prove the chunks of an input at once rather than in order
+    
+    Yields:
+        (index, input_path, chunk results) for each input as it completes,
+        in chunk order. A sequential input whose chunk fails for good stops
+        there; its results end with the failed chunk. A parallel input has a
+        result for every chunk.
+    """
+    from ray.exceptions import RayError
+    
+    chunks = partition_model(
+        num_layers, num_workers, model_config, max_k=max_k, layer_times=layer_times
+    )
+    num_chunks = len(chunks)
+    if max_in_flight is None:
+        max_in_flight = 2 * num_chunks
+    checkpoint = ChunkCheckpoint(checkpoint_dir) if checkpoint_dir else None
+    # Each chunk's workers reserve the memory and CPUs it needs
+    options = chunk_worker_options(
+        model_config, chunks, use_real_prover, max_cpus_per_chunk, memory_scale
+    )
+    
+    def new_worker(chunk_idx: int):
+        return ChunkWorker.options(**options[chunk_idx]).remote(
+            chunk_idx, use_real_prover=use_real_prover, sink_dir=sink_dir
+        )
+    
+    # Worker slots: (chunk index, 0) is the chunk's worker, (chunk index, 1) its
+    # spare for speculative duplicates, created on first use
+    workers = {(i, 0): new_worker(i) for i in range(num_chunks)}
+    # Tasks waiting for each chunk's worker, in order
+    queues = [deque() for _ in range(num_chunks)]
+    # Future -> (task, slot, boundary future, start time)
+    running = {}
+    busy = set()
+    # Wall time of successful attempts, per chunk
+    durations = [[] for _ in range(num_chunks)]
+    
+    inputs = enumerate(input_paths)
+    # Input index -> (input_path, results so far by chunk index)
+    in_flight = {}
+    # Inputs finished while admitting (fully checkpointed)
+    finished = deque()
+    
+    def checkpoint_key(index: int, chunk_idx: int) -> Optional[str]:
+        if checkpoint is None:
+            return None
+        start, end = chunks[chunk_idx]
+        # The workers prove with their default k, without Merkle and verifying
+        return checkpoint.key(
+            model_config,
+            in_flight[index][0],
+            start,
+            end,
+            use_real_prover,
+            params_dir=params_dir,
+            k=None,
+            use_merkle=False,
+            verify=True,
+        )
+    
+    def start(task: _ChunkTask, slot: Tuple[int, int]):
+        if slot not in workers:
+            workers[slot] = new_worker(task.chunk_idx)
+        chunk_start, chunk_end = chunks[task.chunk_idx]
+        future, boundary = workers[slot].prove_chunk.remote(
+            model_config,
+            task.chunk_input,
+            chunk_start,
+            chunk_end,
+            params_dir,
+        )
+        print(f"  Chunk {task.chunk_idx} of input {task.index}: proving layers "
+              f"[{chunk_start}, {chunk_end})")
+        task.attempts += 1
+        task.running += 1
+        busy.add(slot)
+        running[future] = (task, slot, boundary, time.monotonic())
+    
+    def finish(index: int):
+        input_path, results = in_flight.pop(index)
+        finished.append((index, input_path, [results[i] for i in sorted(results)]))
+    
+    def resume(index: int, chunk_idx: int) -> Optional[Tuple[Dict, Optional[bytes]]]:
+        """The checkpointed (result, boundary) of a chunk, or None to prove it."""
+        if checkpoint is None:
+            return None
+        saved = checkpoint.get(checkpoint_key(index, chunk_idx))
+        if saved is None:
+            return None
+        result, boundary = saved
+        if use_real_prover and not parallel and boundary is None and chunk_idx + 1 < num_chunks:
+            # Without its boundary the next chunk can't start from it
+            return None
+        if result.get("wall_time_s") is not None:
+            durations[chunk_idx].append(result["wall_time_s"])
+        return saved
+    
+    def advance(index: int, chunk_idx: int, chunk_input):
+        """Queue chunk_idx of an input, skipping chunks already checkpointed."""
+        _, results = in_flight[index]
+        while chunk_idx < num_chunks:
+            saved = resume(index, chunk_idx)
+            if saved is None:
+                queues[chunk_idx].append(_ChunkTask(index, chunk_idx, chunk_input))
+                return
+            results[chunk_idx], boundary = saved
+            if use_real_prover:
+                chunk_input = ray.put(boundary)
+            chunk_idx += 1
+        finish(index)
+    
+    def queue_all(index: int):
+        """Queue every chunk of an input that is not checkpointed, each from
+        its own input."""
+        input_path, results = in_flight[index]
+        todo = []
+        for chunk_idx in range(num_chunks):
+            saved = resume(index, chunk_idx)
+            if saved is None:
+                todo.append(chunk_idx)
+            else:
+                results[chunk_idx] = saved[0]
+        if not todo:
+            finish(index)
+            return
+        
+        model_input = _put_input(input_path, use_real_prover)
+        starts = [chunks[chunk_idx][0] for chunk_idx in todo if chunk_idx > 0]
+        boundaries = {}
+        if use_real_prover and starts:
+            # Every later chunk starts from its boundary, computed without
+            # proving the chunks before it
+            from python.rust_prover import chunk_boundaries
+            boundaries = chunk_boundaries(model_config, input_path, starts)
+        for chunk_idx in todo:
+            chunk_start = chunks[chunk_idx][0]
+            if chunk_start in boundaries:
+                chunk_input = ray.put(boundaries[chunk_start])
+            else:
+                chunk_input = model_input
+            queues[chunk_idx].append(_ChunkTask(index, chunk_idx, chunk_input))
+    
+    def admit():
+        while len(in_flight) < max_in_flight:
+            try:
+                index, input_path = next(inputs)
+            except StopIteration:
+                return
+            in_flight[index] = (input_path, {})
+            if parallel:
+                queue_all(index)
+            else:
+                advance(index, 0, _put_input(input_path, use_real_prover))
+    
+    admit()
+    while in_flight or finished:
+        while finished:
+            yield finished.popleft()
+            admit()
+        if not in_flight:
+            break
+        now = time.monotonic()
+        
+        # Give every idle chunk worker its next task that is not backing off
+        for chunk_idx, queue in enumerate(queues):
+            if (chunk_idx, 0) in busy:
+                continue
+            for task in queue:
+                if task.not_before <= now:
+                    queue.remove(task)
+                    start(task, (chunk_idx, 0))
+                    break
+        
+        # Duplicate stragglers onto the chunk's spare worker
+        if speculation_factor is not None:
+            for task, slot, _, started in list(running.values()):
+                history = durations[task.chunk_idx]
+                spare = (task.chunk_idx, 1)
+                if (
+                    history
+                    and not task.speculated
+                    and spare not in busy
+                    and now - started > speculation_factor * statistics.median(history)
+                ):
+                    print(f"  Chunk {task.chunk_idx} of input {task.index} is slow, "
+                          f"starting a duplicate")
+                    task.speculated = True
+                    start(task, spare)
         
-        for i, (start, end) in enumerate(chunks):
-            # For real proofs, always start from 0 to ensure intermediate values exist
-            # Each chunk "owns" layers [start, end) but proves [0, end)
-            prove_start = 0
-            prove_end = end
+        if not running:
+            # Everything is backing off
+            time.sleep(0.1)
+            continue
+        ready, _ = ray.wait(list(running), num_returns=1, timeout=0.5)
+        for future in ready:
+            task, slot, boundary, started = running.pop(future)
+            busy.discard(slot)
+            task.running -= 1
+            try:
+                result = ray.get(future)
+            except RayError as e:
+                # The worker died; replace it
+                workers[slot] = new_worker(task.chunk_idx)
+                result = {"chunk_id": task.chunk_idx, "status": "error", "error": str(e)}
+            if task.done:
+                # A duplicate already finished this chunk
+                continue
             
-            print(f"  Chunk {i}: proving layers [0, {end}) (owns layers [{start}, {end}))")
+            chunk_start, chunk_end = chunks[task.chunk_idx]
+            result["proved_layers"] = f"{chunk_start}-{chunk_end}"
+            result["attempts"] = task.attempts
+            input_path, results = in_flight[task.index]
             
-            future = workers[i].prove_chunk.remote(
-                model_config,
-                input_path,
-                prove_start,
-                prove_end,
-                params_dir,
-            )
-            result = ray.get(future)
-            result["owned_layers"] = f"{start}-{end}"
-            result["proved_layers"] = f"{prove_start}-{prove_end}"
-            results.append(result)
-    else:
-        # Parallel execution (simulation mode or when sequential=False)
-        futures = []
-        for i, (start, end) in enumerate(chunks):
-            future = workers[i].prove_chunk.remote(
-                model_config,
-                input_path,
-                start,
-                end,
-                params_dir,
-            )
-            futures.append(future)
-        
-        results = ray.get(futures)
-    
-    return results
+            if result["status"] != "success":
+                if task.running > 0:
+                    # Its duplicate may still succeed
+                    continue
+                if task.attempts <= max_retries:
+                    delay = retry_backoff_s * 2 ** (task.attempts - 1)
+                    print(f"  Chunk {task.chunk_idx} of input {task.index} failed "
+                          f"({result.get('error')}), retrying in {delay:.1f}s")
+                    task.not_before = time.monotonic() + delay
+                    task.speculated = False
+                    queues[task.chunk_idx].appendleft(task)
+                    continue
+                task.done = True
+                results[task.chunk_idx] = result
+                # A sequential input stops here; a parallel one once all its
+                # chunks are done
+                if not parallel or len(results) == num_chunks:
+                    finish(task.index)
+                continue
+            
+            task.done = True
+            result["wall_time_s"] = time.monotonic() - started
+            durations[task.chunk_idx].append(result["wall_time_s"])
+            results[task.chunk_idx] = result
+            if checkpoint is not None:
+                boundary_bytes = ray.get(boundary) if use_real_prover else None
+                checkpoint.put(
+                    checkpoint_key(task.index, task.chunk_idx), result, boundary_bytes, input_path
+                )
+            if parallel:
+                if len(results) == num_chunks:
+                    finish(task.index)
+                continue
+            # Simulated chunks have no boundary; they reuse the model input
+            next_input = boundary if use_real_prover else task.chunk_input
+            advance(task.index, task.chunk_idx + 1, next_input)
 
 
 if __name__ == "__main__":
@@ -219,13 +777,19 @@ Examples:
     python tests/simple_distributed.py --model zkml/examples/mnist/model.msgpack \\
         --input zkml/examples/mnist/inp.msgpack --layers 4 --workers 2
     
+    # Pipelined proving of several inputs
+    python tests/simple_distributed.py --model zkml/examples/mnist/model.msgpack \\
+        --input inp_0.msgpack inp_1.msgpack inp_2.msgpack --layers 4 --workers 2 --real
+    
     # Real proof generation (slow, generates actual ZK proofs)
     python tests/simple_distributed.py --model zkml/examples/mnist/model.msgpack \\
         --input zkml/examples/mnist/inp.msgpack --layers 4 --workers 1 --real
         """
     )
     parser.add_argument("--model", required=True, help="Path to model.msgpack")
-    parser.add_argument("--input", required=True, help="Path to input.msgpack")
+    parser.add_argument("--input", required=True, nargs="+",
+                        help="Path to input.msgpack; several inputs are proven "
+                             "pipelined across the chunk workers")
     parser.add_argument("--layers", type=int, default=4, help="Number of layers")
     parser.add_argument("--workers", type=int, default=2, help="Number of workers")
     parser.add_argument("--real", action="store_true", 
@@ -233,10 +797,45 @@ Examples:
     parser.add_argument("--params-dir", default="./params_kzg",
                         help="Directory for KZG params")
     parser.add_argument("--parallel", action="store_true",
-                        help="Force parallel execution (only works in simulation mode)")
+                        help="Prove all chunks at once; with --real, each starts from "
+                             "its boundary computed by evaluating the model first")
+    parser.add_argument("--max-k", type=int, default=None,
+                        help="Largest k a chunk may need (adds chunks if needed)")
+    parser.add_argument("--sink-dir", default=None,
+                        help="Also write proofs to this (shared) directory")
+    parser.add_argument("--layer-times", default=None,
+                        help="JSON list of measured proving times per layer to "
+                             "balance chunks on (default: estimated rows)")
+    parser.add_argument("--max-retries", type=int, default=2,
+                        help="Retries of a failed chunk before giving up")
+    parser.add_argument("--retry-backoff", type=float, default=1.0,
+                        help="Seconds before the first retry, doubled per retry")
+    parser.add_argument("--speculation-factor", type=float, default=2.0,
+                        help="Duplicate a chunk running this many times its median "
+                             "time (0 disables)")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Save completed chunks here and skip them on restart")
+    parser.add_argument("--max-cpus-per-chunk", type=int, default=None,
+                        help="Most CPUs to reserve for one chunk (default: largest node's)")
+    parser.add_argument("--memory-scale", type=float, default=1.0,
+                        help="Factor applied to the estimated memory of each chunk")
     
     args = parser.parse_args()
     
+    layer_times = None
+    if args.layer_times:
+        with open(args.layer_times) as f:
+            layer_times = json.load(f)
+    
+    scheduling = dict(
+        max_retries=args.max_retries,
+        retry_backoff_s=args.retry_backoff,
+        speculation_factor=args.speculation_factor or None,
+        checkpoint_dir=args.checkpoint_dir,
+        max_cpus_per_chunk=args.max_cpus_per_chunk,
+        memory_scale=args.memory_scale,
+    )
+    
     # Initialize Ray
     ray.init(ignore_reinit_error=True)
     
@@ -249,23 +848,50 @@ Examples:
     
     if args.real:
         print("\nNote: Real proving takes ~2-3 seconds per chunk")
-        if args.parallel:
-            print("WARNING: --parallel with --real may fail for chunks > 0")
-            print("         (chunks need intermediate values from previous layers)")
+    
+    if len(args.input) > 1:
+        print(f"\n=== Pipelined proving of {len(args.input)} inputs ===")
+        stream_start = time.time()
+        for index, input_path, input_results in distributed_prove_stream(
+            args.model,
+            args.input,
+            args.layers,
+            args.workers,
+            use_real_prover=args.real,
+            params_dir=args.params_dir,
+            max_k=args.max_k,
+            layer_times=layer_times,
+            sink_dir=args.sink_dir,
+            parallel=args.parallel,
+            **scheduling,
+        ):
+            ok = all(r.get("status") == "success" for r in input_results)
+            print(f"Input {index} ({input_path}): {len(input_results)} chunks, "
+                  f"{'success' if ok else 'failed'}")
+        elapsed = time.time() - stream_start
+        print(f"\n{len(args.input)} inputs in {elapsed:.1f}s "
+              f"({len(args.input) / elapsed:.2f} inputs/s)")
+        sys.exit(0)
     
     results = distributed_prove(
         args.model,
-        args.input,
+        args.input[0],
         args.layers,
         args.workers,
         use_real_prover=args.real,
         params_dir=args.params_dir,
         sequential=not args.parallel,
+        max_k=args.max_k,
+        layer_times=layer_times,
+        sink_dir=args.sink_dir,
+        **scheduling,
     )
     
     print("\n=== Results ===")
     for result in results:
-        print(json.dumps(result, indent=2))
+        # Proof bytes and public values stay in memory
+        summary = {k: v for k, v in result.items() if k not in ("proof", "public_vals")}
+        print(json.dumps(summary, indent=2))
     
     # Summary
     success_count = sum(1 for r in results if r.get("status") == "success")
@@ -0,0 +1,532 @@
+"""Tests for python.rust_prover that need no Rust build.
+
+The prove_chunk and evaluate_dag binaries are replaced by small Python
+scripts that parse the same arguments and write the same output files.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python import rust_prover
+from python.rust_prover import (
+    MASTER_SRS_FILE,
+    PROVER_BASE_MEMORY,
+    ROWS_PER_CPU,
+    ChunkJob,
+    ProofCache,
+    ProverDaemon,
+    ProverPool,
+    chunk_boundaries,
+    estimate_chunk_resources,
+    partition_layers,
+    prove_chunk,
+    prove_chunks_batch,
+)
+
+
+FAKE_PROVE_CHUNK = """#!{python}
+import json, os, sys
+
+args = sys.argv[1:]
+def value(flag, default=None):
+    return args[args.index(flag) + 1] if flag in args else default
+
+output_dir = value("--output-dir")
+os.makedirs(output_dir, exist_ok=True)
+with open(os.path.join(output_dir, "proof.bin"), "wb") as f:
+    f.write(b"proof")
+with open(os.path.join(output_dir, "public_vals.bin"), "wb") as f:
+    f.write(bytes(32))
+k = value("--k")
+# Like the real prover, create the master SRS if there is none
+params_dir = value("--params-dir")
+master = os.path.join(params_dir, "master.params")
+if not os.path.exists(master):
+    with open(master, "wb") as f:
+        f.write(os.urandom(4 + 256))
+with open(os.path.join(os.path.dirname(sys.argv[0]), "calls"), "a") as f:
+    f.write("call\\n")
+with open(os.path.join(output_dir, "result.json"), "w") as f:
+    json.dump({{
+        "chunk_start": int(value("--start")),
+        "chunk_end": int(value("--end")),
+        "use_merkle": "--use-merkle" in args,
+        "proving_time_ms": 1,
+        "verify_time_ms": 0,
+        "proof_size_bytes": 5,
+        "public_vals_count": 1,
+        "k": int(k) if k is not None else 10,
+        "argv": args,
+    }}, f)
+"""
+
+
+@pytest.fixture
+def fake_prove_chunk(tmp_path):
+    """Path of a fake prove_chunk binary, with a config and input to pass it."""
+    binary = tmp_path / "prove_chunk"
+    binary.write_text(FAKE_PROVE_CHUNK.format(python=sys.executable))
+    binary.chmod(binary.stat().st_mode | stat.S_IXUSR)
+    config = tmp_path / "model.msgpack"
+    config.write_bytes(b"config")
+    inp = tmp_path / "inp.msgpack"
+    inp.write_bytes(b"input")
+    return str(binary), str(config), str(inp)
+
+
+def _argv(result):
+    with open(os.path.join(result.output_dir, "result.json")) as f:
+        return json.load(f)["argv"]
+
+
+def test_prover_pool_passes_prover_options(fake_prove_chunk, tmp_path):
+    binary, config, inp = fake_prove_chunk
+    pool = ProverPool(
+        max_concurrency=2,
+        params_dir=str(tmp_path / "params"),
+        binary_path=binary,
+        verify=False,
+        k=12,
+        num_cols=8,
+        low_memory=True,
+    )
+    
+    async def run():
+        return await asyncio.gather(
+            pool.prove_chunk(config, inp, 0, 2),
+            pool.prove_chunk(config, inp, 2, 4, k=14, num_cols=4, low_memory=False),
+        )
+    
+    first, second = asyncio.run(run())
+    
+    argv = _argv(first)
+    assert argv[argv.index("--k") + 1] == "12"
+    assert argv[argv.index("--num-cols") + 1] == "8"
+    assert "--low-memory" in argv
+    assert "--no-verify" in argv
+    assert first.k == 12
+    assert (first.chunk_start, first.chunk_end) == (0, 2)
+    
+    argv = _argv(second)
+    assert argv[argv.index("--k") + 1] == "14"
+    assert argv[argv.index("--num-cols") + 1] == "4"
+    assert "--low-memory" not in argv
+    assert second.k == 14
+
+
+def test_prover_pool_defaults_leave_prover_choices(fake_prove_chunk, tmp_path):
+    binary, config, inp = fake_prove_chunk
+    pool = ProverPool(
+        max_concurrency=1, params_dir=str(tmp_path / "params"), binary_path=binary
+    )
+    
+    results = asyncio.run(pool.prove_chunks(config, inp, [(0, 1), (1, 3)]))
+    
+    assert [(r.chunk_start, r.chunk_end) for r in results] == [(0, 1), (1, 3)]
+    for result in results:
+        argv = _argv(result)
+        assert "--k" not in argv
+        assert "--num-cols" not in argv
+        assert "--low-memory" not in argv
+
+
+def _calls(binary):
+    path = os.path.join(os.path.dirname(binary), "calls")
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return len(f.readlines())
+
+
+def test_proof_cache_hit_and_miss(fake_prove_chunk, tmp_path):
+    binary, config, inp = fake_prove_chunk
+    cache = ProofCache(str(tmp_path / "cache"))
+    params_dir = str(tmp_path / "params")
+    
+    def prove(start, end):
+        return prove_chunk(
+            config, inp, start, end, params_dir=params_dir, binary_path=binary, cache=cache
+        )
+    
+    first = prove(0, 2)
+    assert not first.cached
+    assert _calls(binary) == 1
+    
+    hit = prove(0, 2)
+    assert hit.cached
+    assert _calls(binary) == 1
+    with open(hit.proof_path, "rb") as f:
+        assert f.read() == b"proof"
+    
+    # Another layer range is another request
+    assert not prove(0, 3).cached
+    assert _calls(binary) == 2
+    
+    # So is a changed input
+    with open(inp, "wb") as f:
+        f.write(b"other input")
+    assert not prove(0, 2).cached
+    assert _calls(binary) == 3
+
+
+def test_proof_cache_key_depends_on_srs(fake_prove_chunk, tmp_path):
+    binary, config, inp = fake_prove_chunk
+    cache = ProofCache(str(tmp_path / "cache"))
+    params_dir = tmp_path / "params"
+    params_dir.mkdir()
+    
+    def key():
+        return cache.key(config, inp, 0, 2, False, None, binary, params_dir=str(params_dir))
+    
+    # Without a master SRS the setup is unknown, so nothing can match
+    assert key() is None
+    
+    master = params_dir / MASTER_SRS_FILE
+    master.write_bytes(b"\x02\0\0\0" + bytes(512) + b"a" * 256)
+    first = key()
+    assert first is not None and key() == first
+    
+    # Only g2 and s_g2 identify the setup
+    master.write_bytes(b"\x02\0\0\0" + bytes(512) + b"b" * 256)
+    assert key() != first
+    
+    # A proof made while the master was created is cached under the new master
+    other_dir = str(tmp_path / "other_params")
+    result = prove_chunk(
+        config, inp, 0, 2, params_dir=other_dir, binary_path=binary, cache=cache
+    )
+    assert not result.cached
+    assert prove_chunk(
+        config, inp, 0, 2, params_dir=other_dir, binary_path=binary, cache=cache
+    ).cached
+    # The same request against a different setup misses
+    assert not prove_chunk(
+        config, inp, 0, 2, params_dir=str(params_dir), binary_path=binary, cache=cache
+    ).cached
+
+
+def test_proof_cache_evicts_least_recently_used(fake_prove_chunk, tmp_path):
+    binary, config, inp = fake_prove_chunk
+    params_dir = str(tmp_path / "params")
+    cache = ProofCache(str(tmp_path / "cache"))
+    
+    results = {}
+    for end in (1, 2, 3):
+        result = prove_chunk(config, inp, 0, end, params_dir=params_dir, binary_path=binary)
+        key = cache.key(config, inp, 0, end, False, None, binary, params_dir=params_dir)
+        cache.put(key, result)
+        # Distinct last-use times, oldest first
+        os.utime(os.path.join(cache.cache_dir, key), (end, end))
+        results[end] = key
+    entry_size = cache.size_bytes() // 3
+    
+    # Using the oldest entry makes the second one the least recently used
+    assert cache.get(results[1]) is not None
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    
+    assert cache.get(results[2]) is None
+    assert cache.get(results[1]) is not None
+    assert cache.get(results[3]) is not None
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+FAKE_PROVE_CHUNK_SERVER = """#!{python}
+import json, os, socket, sys
+
+args = sys.argv[1:]
+def value(flag, default=None):
+    return args[args.index(flag) + 1] if flag in args else default
+
+params_dir = value("--params-dir")
+master = os.path.join(params_dir, "master.params")
+if not os.path.exists(master):
+    with open(master, "wb") as f:
+        f.write(os.urandom(4 + 256))
+
+server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+server.bind(value("--serve"))
+server.listen(1)
+conn, _ = server.accept()
+for line in conn.makefile("r"):
+    request = json.loads(line)
+    if request.get("op") == "shutdown":
+        break
+    output_dir = request["output_dir"]
+    for name in ("proof.bin", "public_vals.bin"):
+        with open(os.path.join(output_dir, name), "wb") as f:
+            f.write(b"proof")
+    result = {{
+        "chunk_start": request["start"],
+        "chunk_end": request["end"],
+        "use_merkle": request["use_merkle"],
+        "proving_time_ms": 1,
+        "verify_time_ms": 0,
+        "proof_size_bytes": 5,
+        "public_vals_count": 1,
+        "k": request["k"],
+        "argv": args,
+        "request": request,
+    }}
+    with open(os.path.join(output_dir, "result.json"), "w") as f:
+        json.dump(result, f)
+    conn.sendall((json.dumps({{"status": "ok", "result": result}}) + "\\n").encode())
+"""
+
+
+def test_prover_daemon_passes_prover_options(tmp_path):
+    binary = tmp_path / "prove_chunk"
+    binary.write_text(FAKE_PROVE_CHUNK_SERVER.format(python=sys.executable))
+    binary.chmod(binary.stat().st_mode | stat.S_IXUSR)
+    config = tmp_path / "model.msgpack"
+    config.write_bytes(b"config")
+    inp = tmp_path / "inp.msgpack"
+    inp.write_bytes(b"input")
+    cache = ProofCache(str(tmp_path / "cache"))
+    
+    with ProverDaemon(
+        params_dir=str(tmp_path / "params"),
+        binary_path=str(binary),
+        verify=False,
+        k=12,
+        num_cols=8,
+        low_memory=True,
+    ) as daemon:
+        first = daemon.prove_chunk(str(config), str(inp), 0, 2)
+        second = daemon.prove_chunk(
+            str(config), str(inp), 2, 4, cache=cache, k=14, num_cols=4, low_memory=False
+        )
+        hit = daemon.prove_chunk(
+            str(config), str(inp), 2, 4, cache=cache, k=14, num_cols=4, low_memory=False
+        )
+    
+    argv = _argv(first)
+    assert argv[argv.index("--k") + 1] == "12"
+    assert argv[argv.index("--num-cols") + 1] == "8"
+    assert "--low-memory" in argv
+    assert "--no-verify" in argv
+    assert first.k == 12
+    
+    with open(os.path.join(second.output_dir, "result.json")) as f:
+        request = json.load(f)["request"]
+    assert (request["k"], request["num_cols"], request["low_memory"]) == (14, 4, False)
+    assert not second.cached
+    assert hit.cached and hit.k == 14
+
+
+FAKE_PROVE_CHUNK_MANIFEST = """#!{python}
+import json, os, sys
+
+args = sys.argv[1:]
+def value(flag, default=None):
+    return args[args.index(flag) + 1] if flag in args else default
+
+with open(value("--manifest")) as f:
+    jobs = json.load(f)
+responses = []
+for job in jobs:
+    for name in ("proof.bin", "public_vals.bin"):
+        with open(os.path.join(job["output_dir"], name), "wb") as f:
+            f.write(b"proof")
+    result = {{
+        "chunk_start": job["start"],
+        "chunk_end": job["end"],
+        "use_merkle": job["use_merkle"],
+        "proving_time_ms": 1,
+        "verify_time_ms": 0,
+        "proof_size_bytes": 5,
+        "public_vals_count": 1,
+        "k": int(value("--k", 10)),
+        "argv": args,
+    }}
+    with open(os.path.join(job["output_dir"], "result.json"), "w") as f:
+        json.dump(result, f)
+    responses.append({{"status": "ok", "result": result}})
+with open(value("--results"), "w") as f:
+    json.dump(responses, f)
+"""
+
+
+def test_prove_chunks_batch_passes_prover_options(fake_prove_chunk, tmp_path):
+    _, config, inp = fake_prove_chunk
+    binary = tmp_path / "prove_chunk_manifest"
+    binary.write_text(FAKE_PROVE_CHUNK_MANIFEST.format(python=sys.executable))
+    binary.chmod(binary.stat().st_mode | stat.S_IXUSR)
+    jobs = [ChunkJob(input_path=inp, chunk_start=0, chunk_end=end) for end in (1, 2)]
+    
+    results = prove_chunks_batch(
+        jobs,
+        config_path=config,
+        params_dir=str(tmp_path / "params"),
+        binary_path=str(binary),
+        verify=False,
+        k=12,
+        num_cols=8,
+        low_memory=True,
+    )
+    
+    assert [(r.chunk_start, r.chunk_end, r.k) for r in results] == [(0, 1, 12), (0, 2, 12)]
+    argv = _argv(results[0])
+    assert argv[argv.index("--num-cols") + 1] == "8"
+    assert "--low-memory" in argv
+    assert "--no-verify" in argv
+    
+    (default,) = prove_chunks_batch(
+        jobs[:1], config_path=config, params_dir=str(tmp_path / "params"), binary_path=str(binary)
+    )
+    argv = _argv(default)
+    assert "--k" not in argv
+    assert "--num-cols" not in argv
+    assert "--low-memory" not in argv
+
+
+FAKE_EVALUATE_DAG = """#!{python}
+import os, sys
+
+args = sys.argv[1:]
+def value(flag):
+    return args[args.index(flag) + 1]
+
+with open(value("--input"), "rb") as f:
+    inp = f.read()
+for end in value("--boundary-at").split(","):
+    with open(os.path.join(value("--boundary-dir"), "boundary_%s.msgpack" % end), "wb") as f:
+        f.write(end.encode() + b":" + inp)
+"""
+
+
+def test_chunk_boundaries_reads_boundary_per_end(fake_prove_chunk, tmp_path):
+    _, config, inp = fake_prove_chunk
+    binary = tmp_path / "evaluate_dag"
+    binary.write_text(FAKE_EVALUATE_DAG.format(python=sys.executable))
+    binary.chmod(binary.stat().st_mode | stat.S_IXUSR)
+    
+    boundaries = chunk_boundaries(config, inp, [2, 5], binary_path=str(binary))
+    
+    assert boundaries == {2: b"2:input", 5: b"5:input"}
+    assert chunk_boundaries(config, inp, [], binary_path=str(binary)) == {}
+
+
+def _check_contiguous(chunks, num_layers):
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == num_layers
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert end == start
+    assert all(start < end for start, end in chunks)
+
+
+def _max_cost(costs, chunks):
+    return max(sum(costs[start:end]) for start, end in chunks)
+
+
+def _brute_force_max_cost(costs, num_chunks):
+    # Best max chunk cost over every split into num_chunks contiguous chunks
+    n = len(costs)
+    best = None
+    for cuts in itertools.combinations(range(1, n), num_chunks - 1):
+        bounds = [0, *cuts, n]
+        cost = _max_cost(costs, list(zip(bounds, bounds[1:])))
+        if best is None or cost < best:
+            best = cost
+    return best
+
+
+def test_partition_layers_is_optimal_on_small_inputs():
+    rng = random.Random(0)
+    for _ in range(200):
+        num_layers = rng.randint(1, 8)
+        costs = [rng.choice([0, 1, 2, 5, 10, 100]) for _ in range(num_layers)]
+        num_chunks = rng.randint(1, num_layers)
+        
+        chunks = partition_layers(costs, num_chunks)
+        
+        _check_contiguous(chunks, num_layers)
+        assert len(chunks) == num_chunks
+        assert _max_cost(costs, chunks) == _brute_force_max_cost(costs, num_chunks), costs
+
+
+def test_partition_layers_more_chunks_than_layers():
+    assert partition_layers([3, 1, 2], 10) == [(0, 1), (1, 2), (2, 3)]
+    assert partition_layers([], 4) == []
+
+
+def test_partition_layers_zero_cost_layers():
+    chunks = partition_layers([0, 0, 0, 0], 2)
+    _check_contiguous(chunks, 4)
+    assert len(chunks) == 2
+    
+    # Free layers don't make a chunk more expensive, wherever they go
+    costs = [0, 5, 0, 0, 5, 0]
+    chunks = partition_layers(costs, 2)
+    _check_contiguous(chunks, len(costs))
+    assert _max_cost(costs, chunks) == 5
+
+
+def test_partition_layers_respects_max_rows():
+    costs = [4, 4, 4, 4, 4]
+    chunks = partition_layers(costs, 1, max_rows=10, base_rows=2)
+    
+    _check_contiguous(chunks, len(costs))
+    assert all(2 + sum(costs[start:end]) <= 10 for start, end in chunks)
+    assert len(chunks) == 3
+    with pytest.raises(ValueError):
+        partition_layers(costs, 1, max_rows=5, base_rows=2)
+
+
+def _fake_layer_costs(layer_rows, k=20):
+    estimate = {
+        "num_cols": 10,
+        "base_rows": 100,
+        "k": k,
+        "extension": 4,
+        "num_polys": 50,
+        "layers": [{"num_rows": rows, "assign_rows": 0} for rows in layer_rows],
+    }
+    return lambda config_path, num_cols=None, binary_path=None: estimate
+
+
+def test_estimate_chunk_resources_grows_with_chunk(monkeypatch):
+    monkeypatch.setattr(rust_prover, "layer_costs", _fake_layer_costs([2**12] * 64))
+    chunks = [(0, end) for end in range(1, 65)]
+    
+    resources = estimate_chunk_resources("model.msgpack", chunks, max_cpus=1024)
+    
+    for r in resources:
+        assert 2**r.k >= r.rows
+        assert r.memory_bytes > PROVER_BASE_MEMORY
+    for smaller, larger in zip(resources, resources[1:]):
+        assert smaller.rows < larger.rows
+        assert smaller.k <= larger.k
+        assert smaller.memory_bytes <= larger.memory_bytes
+        assert smaller.num_cpus <= larger.num_cpus
+    assert resources[-1].num_cpus == 2**resources[-1].k // ROWS_PER_CPU
+
+
+def test_estimate_chunk_resources_is_clamped(monkeypatch):
+    # A chunk with more rows than the model's k holds (the estimate is rough)
+    monkeypatch.setattr(rust_prover, "layer_costs", _fake_layer_costs([2**18] * 8, k=20))
+    
+    resources = estimate_chunk_resources("model.msgpack", [(0, 1), (0, 8)], max_cpus=4)
+    
+    assert [r.k for r in resources] == [19, 20]
+    assert [r.num_cpus for r in resources] == [4, 4]
+    assert resources[1].ray_options()["runtime_env"]["env_vars"]["RAYON_NUM_THREADS"] == "4"
+    # Tiny chunks still get a CPU
+    monkeypatch.setattr(rust_prover, "layer_costs", _fake_layer_costs([1]))
+    (tiny,) = estimate_chunk_resources("model.msgpack", [(0, 1)], max_cpus=4)
+    assert tiny.num_cpus == 1
+    # Measured ks win, scaled memory follows them
+    (known,) = estimate_chunk_resources("model.msgpack", [(0, 1)], ks=[16], memory_scale=2.0)
+    assert known.k == 16
+    assert known.memory_bytes == 2 * rust_prover.chunk_memory_bytes(
+        _fake_layer_costs([1])(None), 16
+    )
@@ -0,0 +1,315 @@
+"""Tests for the scheduling of tests/simple_distributed.py that need no Rust build.
+
+ChunkWorker is replaced by a Ray actor that follows a script: each attempt
+at a chunk of an input succeeds, fails, kills its worker or stalls. Every
+call is logged to a file, since attempts run in separate worker processes.
+Without the layer_costs binary, chunks are split by layer count and
+workers get Ray's default resources.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ray = pytest.importorskip("ray")
+
+from python import rust_prover
+from tests import simple_distributed
+from tests.simple_distributed import ChunkCheckpoint, distributed_prove_stream
+
+
+@pytest.fixture(scope="module", autouse=True)
+def ray_cluster():
+    ray.init(num_cpus=4, include_dashboard=False, ignore_reinit_error=True)
+    yield
+    ray.shutdown()
+
+
+def make_fake_worker(log_path: str, script: dict):
+    """
+    A stand-in for simple_distributed.ChunkWorker.
+    
+    script maps "{input name}:{layer_start}" to the action of each attempt,
+    "ok" (the default), "fail", "die" or "stall".
+    """
+    
+    @ray.remote
+    class FakeChunkWorker:
+        def __init__(self, chunk_id, use_real_prover=False, sink_dir=None):
+            self.chunk_id = chunk_id
+            self.use_real_prover = use_real_prover
+        
+        @ray.method(num_returns=2)
+        def prove_chunk(self, model_config, chunk_input, layer_start, layer_end, params_dir):
+            if isinstance(chunk_input, bytes):
+                name = chunk_input.decode().split(":")[-1]
+            else:
+                name = os.path.basename(chunk_input)
+            task = f"{name}:{layer_start}"
+            with open(log_path) as f:
+                attempt = sum(json.loads(line)["task"] == task for line in f)
+            with open(log_path, "a") as f:
+                f.write(json.dumps({"task": task, "time": time.time()}) + "\n")
+            
+            actions = script.get(task, [])
+            action = actions[attempt] if attempt < len(actions) else "ok"
+            if action == "die":
+                os._exit(1)
+            if action == "stall":
+                time.sleep(60)
+            result = {
+                "chunk_id": self.chunk_id,
+                "layers": f"{layer_start}-{layer_end}",
+                "status": "error" if action == "fail" else "success",
+                "error": "scripted failure" if action == "fail" else None,
+                "mode": "real" if self.use_real_prover else "simulation",
+            }
+            boundary = f"{layer_end}:{name}".encode() if self.use_real_prover else None
+            return result, boundary
+    
+    return FakeChunkWorker
+
+
+def _no_layer_costs(*args, **kwargs):
+    raise FileNotFoundError("layer_costs")
+
+
+@pytest.fixture
+def fake_job(tmp_path, monkeypatch):
+    """(run, calls): run(**kwargs) proves the inputs with a scripted worker and
+    returns {input name: results}; calls() lists the logged tasks in order."""
+    model = tmp_path / "model.msgpack"
+    model.write_bytes(b"model")
+    inputs = []
+    for i in range(3):
+        inp = tmp_path / f"inp_{i}.msgpack"
+        # The contents double as the name the fake worker logs
+        inp.write_bytes(inp.name.encode())
+        inputs.append(str(inp))
+    log_path = tmp_path / "calls.jsonl"
+    log_path.write_text("")
+    # No layer_costs binary: split by layer count
+    monkeypatch.setattr(rust_prover, "layer_costs", _no_layer_costs)
+    
+    def run(script=None, num_inputs=1, **kwargs):
+        monkeypatch.setattr(
+            simple_distributed, "ChunkWorker", make_fake_worker(str(log_path), script or {})
+        )
+        kwargs.setdefault("retry_backoff_s", 0.0)
+        # Only speculate where a test asks for it, so scheduling jitter can't
+        # add attempts
+        kwargs.setdefault("speculation_factor", None)
+        kwargs.setdefault("params_dir", str(tmp_path / "params"))
+        return {
+            os.path.basename(input_path): results
+            for _, input_path, results in distributed_prove_stream(
+                str(model), inputs[:num_inputs], num_layers=4, num_workers=2, **kwargs
+            )
+        }
+    
+    def calls():
+        with open(log_path) as f:
+            return [json.loads(line) for line in f]
+    
+    return run, calls
+
+
+def test_failed_chunk_is_retried_with_backoff(fake_job):
+    run, calls = fake_job
+    
+    results = run({"inp_0.msgpack:0": ["fail", "fail"]}, retry_backoff_s=0.3)
+    
+    chunk0, chunk1 = results["inp_0.msgpack"]
+    assert chunk0["status"] == "success" and chunk0["attempts"] == 3
+    assert chunk1["status"] == "success" and chunk1["attempts"] == 1
+    # The delay doubles with each retry
+    times = [call["time"] for call in calls() if call["task"] == "inp_0.msgpack:0"]
+    assert times[1] - times[0] >= 0.3
+    assert times[2] - times[1] >= 0.6
+
+
+def test_chunk_is_given_up_after_max_retries(fake_job):
+    run, calls = fake_job
+    
+    results = run({"inp_0.msgpack:0": ["fail"] * 3}, max_retries=1)
+    
+    # The input stops at the failed chunk
+    (chunk0,) = results["inp_0.msgpack"]
+    assert chunk0["status"] == "error" and chunk0["attempts"] == 2
+    assert [call["task"] for call in calls()] == ["inp_0.msgpack:0"] * 2
+
+
+def test_dead_worker_is_replaced(fake_job):
+    run, _ = fake_job
+    
+    results = run({"inp_0.msgpack:2": ["die"]})
+    
+    chunk0, chunk1 = results["inp_0.msgpack"]
+    assert chunk0["attempts"] == 1
+    assert chunk1["status"] == "success" and chunk1["attempts"] == 2
+
+
+def test_straggler_gets_a_duplicate(fake_job):
+    run, calls = fake_job
+    started = time.monotonic()
+    
+    # The first input sets the chunk's median time; the second one stalls
+    results = run(
+        {"inp_1.msgpack:0": ["stall"]}, num_inputs=2, speculation_factor=2.0
+    )
+    
+    assert time.monotonic() - started < 30
+    assert all(r["status"] == "success" for rs in results.values() for r in rs)
+    assert results["inp_1.msgpack"][0]["attempts"] == 2
+    assert [call["task"] for call in calls()].count("inp_1.msgpack:0") == 2
+
+
+def test_restart_resumes_from_checkpoint(fake_job, tmp_path):
+    run, calls = fake_job
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    
+    # Chunk 1 fails for good, so only chunk 0 is saved
+    first = run({"inp_0.msgpack:2": ["fail"]}, max_retries=0, checkpoint_dir=checkpoint_dir)
+    assert [r["status"] for r in first["inp_0.msgpack"]] == ["success", "error"]
+    
+    second = run(checkpoint_dir=checkpoint_dir)
+    
+    chunk0, chunk1 = second["inp_0.msgpack"]
+    assert chunk0.get("resumed") and not chunk1.get("resumed")
+    assert [call["task"] for call in calls()] == [
+        "inp_0.msgpack:0", "inp_0.msgpack:2", "inp_0.msgpack:2",
+    ]
+    # Fully checkpointed inputs aren't proven again
+    third = run(checkpoint_dir=checkpoint_dir)
+    assert all(r.get("resumed") for r in third["inp_0.msgpack"])
+    assert len(calls()) == 3
+
+
+def test_checkpoint_without_boundary_is_proven_again(fake_job, tmp_path):
+    run, calls = fake_job
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    run(use_real_prover=True, checkpoint_dir=checkpoint_dir)
+    checkpoint = ChunkCheckpoint(checkpoint_dir)
+    for key in checkpoint.manifest:
+        boundary = os.path.join(checkpoint_dir, key, "boundary.msgpack")
+        if os.path.exists(boundary):
+            os.remove(boundary)
+    
+    results = run(use_real_prover=True, checkpoint_dir=checkpoint_dir)
+    
+    chunk0, chunk1 = results["inp_0.msgpack"]
+    # Chunk 1 needs chunk 0's boundary; the last chunk's isn't needed
+    assert not chunk0.get("resumed") and chunk1.get("resumed")
+    assert [call["task"] for call in calls()] == [
+        "inp_0.msgpack:0", "inp_0.msgpack:2", "inp_0.msgpack:0",
+    ]
+
+
+def test_parallel_chunks_fail_independently(fake_job):
+    run, calls = fake_job
+    
+    results = run(
+        {"inp_0.msgpack:0": ["fail", "fail"], "inp_0.msgpack:2": ["fail"]},
+        parallel=True,
+        max_retries=1,
+    )
+    
+    # Chunk 1 doesn't wait for chunk 0, and is retried on its own
+    chunk0, chunk1 = results["inp_0.msgpack"]
+    assert chunk0["status"] == "error" and chunk0["attempts"] == 2
+    assert chunk1["status"] == "success" and chunk1["attempts"] == 2
+    assert sorted(call["task"] for call in calls()) == [
+        "inp_0.msgpack:0", "inp_0.msgpack:0", "inp_0.msgpack:2", "inp_0.msgpack:2",
+    ]
+
+
+def test_parallel_real_chunks_start_from_boundaries(fake_job, tmp_path, monkeypatch):
+    run, calls = fake_job
+    requested = []
+    
+    def fake_chunk_boundaries(config_path, input_path, ends, binary_path=None):
+        requested.append(list(ends))
+        name = os.path.basename(input_path)
+        return {end: f"{end}:{name}".encode() for end in ends}
+    
+    monkeypatch.setattr(rust_prover, "chunk_boundaries", fake_chunk_boundaries)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+    
+    first = run(
+        {"inp_0.msgpack:2": ["fail"]},
+        use_real_prover=True,
+        parallel=True,
+        max_retries=0,
+        checkpoint_dir=checkpoint_dir,
+    )
+    assert [r["status"] for r in first["inp_0.msgpack"]] == ["success", "error"]
+    
+    # Only the failed chunk is proven again, from a fresh boundary
+    second = run(use_real_prover=True, parallel=True, checkpoint_dir=checkpoint_dir)
+    
+    chunk0, chunk1 = second["inp_0.msgpack"]
+    assert chunk0.get("resumed") and chunk1["status"] == "success"
+    assert requested == [[2], [2]]
+    assert sorted(call["task"] for call in calls()) == [
+        "inp_0.msgpack:0", "inp_0.msgpack:2", "inp_0.msgpack:2",
+    ]
+
+
+def test_checkpoint_key_depends_on_prover_options(tmp_path):
+    model = tmp_path / "model.msgpack"
+    model.write_bytes(b"model")
+    inp = tmp_path / "inp.msgpack"
+    inp.write_bytes(b"input")
+    checkpoint = ChunkCheckpoint(str(tmp_path / "checkpoint"))
+    
+    def key(**kwargs):
+        return checkpoint.key(str(model), str(inp), 0, 2, True, **kwargs)
+    
+    base = key()
+    assert key() == base
+    assert key(k=17) != base
+    assert key(use_merkle=True) != base
+    assert key(verify=False) != base
+    assert checkpoint.key(str(model), str(inp), 0, 2, False) != base
+    # Content, not path: a moved copy of the model shares its entries
+    copy = tmp_path / "copy.msgpack"
+    copy.write_bytes(b"model")
+    assert checkpoint.key(str(copy), str(inp), 0, 2, True) == base
+    model.write_bytes(b"other model")
+    assert key() != base
+
+
+def test_worker_options_respect_node_limits(monkeypatch):
+    estimate = {
+        "base_rows": 0,
+        "k": 20,
+        "extension": 4,
+        "num_polys": 50,
+        "layers": [{"num_rows": 2**19, "assign_rows": 0}] * 2,
+    }
+    monkeypatch.setattr(rust_prover, "layer_costs", lambda *args, **kwargs: estimate)
+    nodes = [
+        {"Alive": True, "Resources": {"CPU": 8.0, "memory": 64 * 1024**3}},
+        {"Alive": True, "Resources": {"CPU": 2.0, "memory": 8 * 1024**3}},
+        {"Alive": False, "Resources": {"CPU": 128.0, "memory": 1024**4}},
+    ]
+    monkeypatch.setattr(simple_distributed.ray, "nodes", lambda: nodes)
+    chunks = [(0, 1), (1, 2), (0, 2)]
+    
+    options = simple_distributed.chunk_worker_options("model.msgpack", chunks, True)
+    
+    # CPUs are capped by the largest live node
+    assert [o["num_cpus"] for o in options] == [8, 8, 8]
+    assert options[0]["memory"] < options[2]["memory"] <= 64 * 1024**3
+    # A chunk no live node can hold is refused up front
+    with pytest.raises(ValueError):
+        simple_distributed.chunk_worker_options(
+            "model.msgpack", chunks, True, memory_scale=1000.0
+        )
+    # Simulated chunks reserve nothing
+    assert simple_distributed.chunk_worker_options("model.msgpack", chunks, False) == [{}] * 3
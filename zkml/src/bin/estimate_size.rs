@@ -33,7 +33,7 @@ use zkml::{
     tanh::TanhChip,
     update::UpdateChip,
   },
-  model::{ModelCircuit, GADGET_CONFIG},
+  model::ModelCircuit,
   utils::loader::load_config_msgpack,
 };
 
@@ -42,7 +42,7 @@ fn main() {
 
   let config = load_config_msgpack(&config_fname);
   let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, false);
-  let num_cols = GADGET_CONFIG.lock().unwrap().num_cols as i64;
+  let num_cols = circuit.gadget_config.num_cols as i64;
 
   let mut num_rows = circuit.num_random;
 
@@ -0,0 +1,77 @@
+//! Compute a model's intermediate activations for an input, without proving.
+//!
+//! Usage:
+//!   evaluate_dag --config <path> --input <path> --output <path>
+//!   evaluate_dag --config <path> --input <path> --boundary-at 4,8 --boundary-dir <dir>
+//!
+//! Writes every layer output as msgpack in the input format (a list of
+//! {idx, shape, data} tensors), so a chunk's inputs can be produced up front instead of
+//! proving every preceding layer. With `--boundary-at`, also writes the boundary a chunk
+//! ending at each of those layers would write, as `{boundary-dir}/boundary_{end}.msgpack`:
+//! the input of the chunk starting there.
+
+use std::{fs::File, io::BufWriter, path::Path, time::Instant};
+
+use clap::Parser;
+use halo2_proofs::halo2curves::bn256::Fr;
+use zkml::{
+  model::ModelCircuit,
+  utils::{
+    loader::{encode_input_msgpack, load_model_msgpack},
+    witness::{activations_to_msgpack, boundary_from_activations, evaluate_dag},
+  },
+};
+
+#[derive(Parser, Debug)]
+#[command(name = "evaluate_dag")]
+#[command(about = "Compute a model's intermediate activations")]
+struct Args {
+  /// Path to model config (msgpack)
+  #[arg(long)]
+  config: String,
+
+  /// Path to input (msgpack)
+  #[arg(long)]
+  input: String,
+
+  /// Where to write the activations (msgpack)
+  #[arg(long)]
+  output: Option<String>,
+
+  /// Write the boundary of a chunk ending at each of these layers (comma-separated)
+  #[arg(long, value_delimiter = ',')]
+  boundary_at: Vec<usize>,
+
+  /// Directory for the boundaries
+  #[arg(long, default_value = ".")]
+  boundary_dir: String,
+}
+
+fn main() {
+  let args = Args::parse();
+
+  let start = Instant::now();
+  let config = load_model_msgpack(&args.config, &args.input);
+  let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, true);
+  let activations = evaluate_dag(&circuit).expect("Failed to evaluate model");
+  let eval_time = start.elapsed();
+
+  if let Some(output) = &args.output {
+    let file = File::create(output).expect("Failed to create output file");
+    let mut writer = BufWriter::new(file);
+    rmp_serde::encode::write_named(&mut writer, &activations_to_msgpack(&activations))
+      .expect("Failed to write activations");
+  }
+  for end in args.boundary_at.iter() {
+    let boundary = boundary_from_activations(&circuit, &activations, *end);
+    let path = Path::new(&args.boundary_dir).join(format!("boundary_{}.msgpack", end));
+    std::fs::write(&path, encode_input_msgpack(&boundary)).expect("Failed to write boundary");
+  }
+
+  println!(
+    "Evaluated {} tensors in {:?}, wrote {} boundaries",
+    activations.len(),
+    eval_time,
+    args.boundary_at.len()
+  );
+}
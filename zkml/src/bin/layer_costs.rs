@@ -0,0 +1,53 @@
+//! Estimate the rows of every layer of a model, for cost-balanced chunking.
+//!
+//! Usage:
+//!   layer_costs --config <path> [--num-cols <n>] [--output <path>]
+//!
+//! Writes JSON with the model's `num_cols` and `k`, the `base_rows` every chunk needs,
+//! the `num_polys` and `extension` that size a prover's memory and, per layer, its
+//! `layer_type`, gadget `num_rows` and `assign_rows` for the loaded tensors it reads. Needs no input file: model inputs are sized from the layers' input shapes.
+
+use std::fs;
+
+use clap::Parser;
+use halo2_proofs::halo2curves::bn256::Fr;
+use zkml::{
+  model::ModelCircuit,
+  utils::{
+    cost::model_cost,
+    loader::{attach_input_shapes, load_config_msgpack},
+  },
+};
+
+#[derive(Parser, Debug)]
+#[command(name = "layer_costs")]
+#[command(about = "Estimate the rows of every layer of a model")]
+struct Args {
+  /// Path to model config (msgpack)
+  #[arg(long)]
+  config: String,
+
+  /// Estimate for this many advice columns instead of the model's own
+  #[arg(long)]
+  num_cols: Option<usize>,
+
+  /// Where to write the estimates (default: stdout)
+  #[arg(long)]
+  output: Option<String>,
+}
+
+fn main() {
+  let args = Args::parse();
+
+  let config = attach_input_shapes(load_config_msgpack(&args.config));
+  let mut circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, false);
+  if let Some(num_cols) = args.num_cols {
+    circuit.set_num_cols(num_cols);
+  }
+
+  let json = serde_json::to_string_pretty(&model_cost(&circuit)).unwrap();
+  match args.output {
+    Some(path) => fs::write(&path, json).expect("Failed to write layer costs"),
+    None => println!("{}", json),
+  }
+}
@@ -5,49 +5,111 @@
 //!               [--use-merkle] [--prev-root <hex>] \
 //!               [--params-dir <path>] [--output-dir <path>]
 //!
+//!   prove_chunk --serve <socket> [--params-dir <path>] [--k <n>] [--num-cols <n>] \
+//!               [--low-memory]
+//!
+//!   prove_chunk --manifest <jobs.json> [--config <path>] [--results <path>]
+//!
 //! Output files written to output-dir:
 //!   - proof.bin: The proof bytes
 //!   - public_vals.bin: Public values as concatenated 32-byte field elements
-//!   - result.json: Metadata including timing and merkle root
+//!   - result.json: Metadata including per-phase timing, peak RSS, k and merkle root
+//!   - vk.bin: The verifying key (only with --no-verify, for checking with verify_chunks)
+//!   - boundary.msgpack: The tensors live after the chunk, in the input format
+//!
+//! Multi-input proofs:
+//!   `--input` can be repeated to prove several inputs of the chunk in one proof, with
+//!   one `--prev-root` per input if any. The inputs share k, params, proving key and the
+//!   opening argument. public_vals.bin then holds each input's public values in order
+//!   (result.json has num_instances and one merkle root per input), and each input's
+//!   boundary is written to boundary_<i>.msgpack.
+//!
+//! Pipelined chunks:
+//!   A chunk with --start > 0 takes the previous chunk's boundary.msgpack as --input.
+//!   It then only assigns the boundary tensors and the weights instead of recomputing
+//!   layers [0, start) from the model input.
+//!
+//! Public values are computed with a witness-only synthesis pass. `--check` additionally
+//! runs MockProver on each circuit and panics with the failing constraints (slow).
+//!
+//! Proving keys are cached under <params-dir>/keys, keyed by a hash of the circuit
+//! shape, so only the first proof of each chunk shape pays for keygen.
+//!
+//! Each chunk is proven with the smallest k (at most the model's) that fits its rows
+//! and whose lookup range holds its activations; result.json reports the k used.
+//! `--k` proves every chunk with a fixed k instead, and `--num-cols` overrides the
+//! model's column count.
+//!
+//! Each circuit only holds the weights of its own layers. `--low-memory` additionally
+//! drops the model config, params and proving key after each proof instead of keeping
+//! them resident (keys are reloaded from the key cache), for packing more provers onto
+//! a node; compare peak_rss_bytes in result.json.
+//!
+//! Server mode:
+//!   With `--serve`, the binary listens on a Unix socket and keeps model configs,
+//!   KZG params and proving keys resident between requests. Each request is one JSON
+//!   object per line:
+//!     {"config": ..., "input": ..., "start": n, "end": n, "use_merkle": bool,
+//!      "prev_root": hex|null, "output_dir": ..., "k": n|null, "num_cols": n|null,
+//!      "low_memory": bool|null}
+//!   and is answered with one JSON line, either
+//!     {"status": "ok", "result": <result.json contents>} or
+//!     {"status": "error", "error": <message>}.
+//!   A request's k, num_cols and low_memory override `--k`, `--num-cols` and
+//!   `--low-memory` for that request only.
+//!   The same output files are written to the request's output_dir.
+//!   Send {"op": "shutdown"} to stop the server.
+//!
+//! Manifest mode:
+//!   prove_chunk --manifest jobs.json [--config <path>] [--results <path>]
+//!   proves a JSON array of jobs in one process. Each job has the same fields as a
+//!   server request; `config` defaults to `--config`. Jobs that share a circuit shape
+//!   reuse the loaded params and proving key. Failed jobs don't stop the batch; the
+//!   per-job responses are written to `--results` and the exit code is 1 if any failed.
 
 use std::fs::{self, File};
-use std::io::Write;
+use std::io::{BufRead, BufReader, Write};
+use std::os::unix::net::{UnixListener, UnixStream};
+use std::panic::{self, AssertUnwindSafe};
 use std::path::Path;
+use std::time::Instant;
 
 use clap::Parser;
 use halo2_proofs::halo2curves::bn256::Fr;
 use halo2_proofs::halo2curves::ff::PrimeField;
-use serde_derive::Serialize;
+use serde_derive::{Deserialize, Serialize};
 
-use zkml::utils::proving_kzg::prove_chunk_kzg;
+use zkml::utils::loader::encode_input_msgpack;
+use zkml::utils::proving_kzg::{ChunkProver, MultiProofResult};
 
 #[derive(Parser, Debug)]
 #[command(name = "prove_chunk")]
 #[command(about = "Generate ZK proof for a model chunk")]
 struct Args {
     /// Path to model config/weights (msgpack)
-    #[arg(long)]
-    config: String,
+    #[arg(long, required_unless_present_any = ["serve", "manifest"])]
+    config: Option<String>,
 
-    /// Path to input data (msgpack)
-    #[arg(long)]
-    input: String,
+    /// Path to input data (msgpack); for --start > 0, the previous chunk's boundary.msgpack.
+    /// Repeat to prove several inputs in one proof
+    #[arg(long, required_unless_present_any = ["serve", "manifest"])]
+    input: Vec<String>,
 
     /// Start layer index (inclusive)
-    #[arg(long)]
-    start: usize,
+    #[arg(long, required_unless_present_any = ["serve", "manifest"])]
+    start: Option<usize>,
 
     /// End layer index (exclusive)
-    #[arg(long)]
-    end: usize,
+    #[arg(long, required_unless_present_any = ["serve", "manifest"])]
+    end: Option<usize>,
 
     /// Enable Merkle tree for intermediate values
     #[arg(long, default_value = "false")]
     use_merkle: bool,
 
-    /// Previous chunk's Merkle root (hex string, 64 chars)
+    /// Previous chunk's Merkle root (hex string, 64 chars); repeat once per input
     #[arg(long)]
-    prev_root: Option<String>,
+    prev_root: Vec<String>,
 
     /// Directory for KZG params (created if needed)
     #[arg(long, default_value = "./params_kzg")]
@@ -56,6 +118,42 @@ struct Args {
     /// Output directory for proof files
     #[arg(long, default_value = "./proof_output")]
     output_dir: String,
+
+    /// Skip verifying the proof; write vk.bin for deferred verification with verify_chunks
+    #[arg(long, default_value = "false")]
+    no_verify: bool,
+
+    /// Don't load or store proving keys in <params-dir>/keys
+    #[arg(long, default_value = "false")]
+    no_key_cache: bool,
+
+    /// Check each circuit with MockProver before proving (slow; for debugging circuits)
+    #[arg(long, default_value = "false")]
+    check: bool,
+
+    /// Prove with 2^k rows instead of the smallest k that fits each chunk
+    #[arg(long)]
+    k: Option<u32>,
+
+    /// Number of advice columns (default: the model's num_cols)
+    #[arg(long)]
+    num_cols: Option<usize>,
+
+    /// Don't keep model configs, params or proving keys resident between proofs
+    #[arg(long, default_value = "false")]
+    low_memory: bool,
+
+    /// Run as a long-lived server listening on this Unix socket path
+    #[arg(long)]
+    serve: Option<String>,
+
+    /// Prove a JSON array of jobs in one process
+    #[arg(long, conflicts_with = "serve")]
+    manifest: Option<String>,
+
+    /// Where to write per-job responses in manifest mode
+    #[arg(long, requires = "manifest")]
+    results: Option<String>,
 }
 
 #[derive(Serialize)]
@@ -69,17 +167,68 @@ struct ProofResult {
     verify_time_ms: u128,
     proof_size_bytes: usize,
     public_vals_count: usize,
+    load_time_ms: u128,
+    params_time_ms: u128,
+    keygen_vk_time_ms: u128,
+    keygen_pk_time_ms: u128,
+    key_load_time_ms: u128,
+    witness_time_ms: u128,
+    serialize_time_ms: u128,
+    k: u32,
+    rows_used: usize,
+    peak_rss_bytes: Option<u64>,
+    num_instances: usize,
+    merkle_roots: Vec<Option<String>>,
+}
+
+/// A single proof request in server mode
+#[derive(Deserialize)]
+struct ProveRequest {
+    #[serde(default)]
+    op: Option<String>,
+    #[serde(default)]
+    config: String,
+    #[serde(default)]
+    input: String,
+    #[serde(default)]
+    start: usize,
+    #[serde(default)]
+    end: usize,
+    #[serde(default)]
+    use_merkle: bool,
+    #[serde(default)]
+    prev_root: Option<String>,
+    #[serde(default)]
+    output_dir: String,
+    /// Overrides --k for this request
+    #[serde(default)]
+    k: Option<u32>,
+    /// Overrides --num-cols for this request
+    #[serde(default)]
+    num_cols: Option<usize>,
+    /// Overrides --low-memory for this request
+    #[serde(default)]
+    low_memory: Option<bool>,
+}
+
+#[derive(Serialize)]
+struct ProveResponse {
+    status: &'static str,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    result: Option<ProofResult>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    error: Option<String>,
 }
 
 fn hex_to_fr(hex: &str) -> Option<Fr> {
     // Remove 0x prefix if present
     let hex = hex.strip_prefix("0x").unwrap_or(hex);
-    
+
     if hex.len() != 64 {
         eprintln!("Error: prev-root must be 64 hex characters (32 bytes)");
         return None;
     }
-    
+
     let bytes = hex::decode(hex).ok()?;
     let arr: [u8; 32] = bytes.try_into().ok()?;
     Fr::from_repr(arr).into()
@@ -90,77 +239,342 @@ fn fr_to_hex(fr: &Fr) -> String {
     format!("0x{}", hex::encode(bytes))
 }
 
-fn main() {
-    let args = Args::parse();
-
-    // Create output directory
-    fs::create_dir_all(&args.output_dir).expect("Failed to create output directory");
-    fs::create_dir_all(&args.params_dir).expect("Failed to create params directory");
-
-    // Parse previous merkle root if provided
-    let prev_merkle_root = args.prev_root.as_ref().and_then(|h| hex_to_fr(h));
-    
-    if args.prev_root.is_some() && prev_merkle_root.is_none() {
-        eprintln!("Error: Invalid prev-root hex string");
-        std::process::exit(1);
-    }
-
-    println!(
-        "Proving chunk [{}, {}) with merkle={}",
-        args.start, args.end, args.use_merkle
-    );
-
-    // Generate proof
-    let result = prove_chunk_kzg(
-        &args.config,
-        &args.input,
-        args.start,
-        args.end,
-        args.use_merkle,
-        prev_merkle_root,
-        &args.params_dir,
-    );
+/// Write proof.bin, public_vals.bin, the boundaries and result.json to `output_dir`
+fn write_outputs(
+    output_dir: &str,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_root: Option<String>,
+    result: &MultiProofResult,
+) -> ProofResult {
+    fs::create_dir_all(output_dir).expect("Failed to create output directory");
+    let serialize_start = Instant::now();
 
     // Write proof to file
-    let proof_path = Path::new(&args.output_dir).join("proof.bin");
+    let proof_path = Path::new(output_dir).join("proof.bin");
     let mut proof_file = File::create(&proof_path).expect("Failed to create proof file");
     proof_file
         .write_all(&result.proof)
         .expect("Failed to write proof");
 
     // Write public values to file (concatenated 32-byte field elements)
-    let public_vals_path = Path::new(&args.output_dir).join("public_vals.bin");
+    let public_vals_path = Path::new(output_dir).join("public_vals.bin");
     let mut pv_file = File::create(&public_vals_path).expect("Failed to create public_vals file");
-    for val in &result.public_vals {
+    for val in result.instances.iter().flat_map(|instance| instance.public_vals.iter()) {
         pv_file
             .write_all(&val.to_repr())
             .expect("Failed to write public val");
     }
 
+    // Write verifying key when verification is deferred
+    if let Some(vk) = &result.vk {
+        let vk_path = Path::new(output_dir).join("vk.bin");
+        fs::write(&vk_path, vk).expect("Failed to write vk.bin");
+    }
+
+    // Write the tensors the next chunk starts from
+    for (i, instance) in result.instances.iter().enumerate() {
+        let boundary_file = if result.instances.len() == 1 {
+            "boundary.msgpack".to_string()
+        } else {
+            format!("boundary_{}.msgpack", i)
+        };
+        fs::write(
+            Path::new(output_dir).join(&boundary_file),
+            encode_input_msgpack(&instance.boundary),
+        )
+        .expect("Failed to write boundary");
+    }
+
+    let merkle_roots: Vec<Option<String>> = result
+        .instances
+        .iter()
+        .map(|instance| instance.merkle_root.as_ref().map(fr_to_hex))
+        .collect();
+
     // Write result metadata as JSON
     let json_result = ProofResult {
-        chunk_start: args.start,
-        chunk_end: args.end,
-        use_merkle: args.use_merkle,
-        prev_merkle_root: args.prev_root.clone(),
-        merkle_root: result.merkle_root.as_ref().map(fr_to_hex),
+        chunk_start,
+        chunk_end,
+        use_merkle,
+        prev_merkle_root: prev_root,
+        merkle_root: merkle_roots[0].clone(),
         proving_time_ms: result.proving_time_ms,
         verify_time_ms: result.verify_time_ms,
         proof_size_bytes: result.proof.len(),
-        public_vals_count: result.public_vals.len(),
+        public_vals_count: result.instances[0].public_vals.len(),
+        load_time_ms: result.load_time_ms,
+        params_time_ms: result.params_time_ms,
+        keygen_vk_time_ms: result.keygen_vk_time_ms,
+        keygen_pk_time_ms: result.keygen_pk_time_ms,
+        key_load_time_ms: result.key_load_time_ms,
+        witness_time_ms: result.witness_time_ms,
+        serialize_time_ms: serialize_start.elapsed().as_millis(),
+        k: result.k,
+        rows_used: result.rows_used,
+        peak_rss_bytes: result.peak_rss_bytes,
+        num_instances: result.instances.len(),
+        merkle_roots,
     };
 
-    let result_path = Path::new(&args.output_dir).join("result.json");
+    let result_path = Path::new(output_dir).join("result.json");
     let result_json = serde_json::to_string_pretty(&json_result).expect("Failed to serialize result");
     fs::write(&result_path, result_json).expect("Failed to write result.json");
 
+    json_result
+}
+
+fn panic_message(err: Box<dyn std::any::Any + Send>) -> String {
+    if let Some(msg) = err.downcast_ref::<&str>() {
+        msg.to_string()
+    } else if let Some(msg) = err.downcast_ref::<String>() {
+        msg.clone()
+    } else {
+        "prover panicked".to_string()
+    }
+}
+
+/// Handle one server request. Panics inside the prover are reported as errors so a
+/// bad request does not take down the warm state of the server.
+fn handle_request(
+    prover: &mut ChunkProver,
+    args: &Args,
+    request: ProveRequest,
+) -> ProveResponse {
+    let prev_merkle_root = match request.prev_root.as_ref() {
+        Some(h) => match hex_to_fr(h) {
+            Some(root) => Some(root),
+            None => {
+                return ProveResponse {
+                    status: "error",
+                    result: None,
+                    error: Some("Invalid prev-root hex string".to_string()),
+                }
+            }
+        },
+        None => None,
+    };
+
+    // Keys are held per k and column count, so these can change between requests
+    prover.set_k(request.k.or(args.k));
+    prover.set_num_cols(request.num_cols.or(args.num_cols));
+    prover.set_low_memory(request.low_memory.unwrap_or(args.low_memory));
+
+    println!(
+        "Proving chunk [{}, {}) with merkle={}",
+        request.start, request.end, request.use_merkle
+    );
+
+    let outcome = panic::catch_unwind(AssertUnwindSafe(|| {
+        let result = prover.prove_multi(
+            &request.config,
+            &[(&request.input, prev_merkle_root)],
+            request.start,
+            request.end,
+            request.use_merkle,
+        );
+        write_outputs(
+            &request.output_dir,
+            request.start,
+            request.end,
+            request.use_merkle,
+            request.prev_root.clone(),
+            &result,
+        )
+    }));
+
+    match outcome {
+        Ok(result) => ProveResponse {
+            status: "ok",
+            result: Some(result),
+            error: None,
+        },
+        Err(err) => ProveResponse {
+            status: "error",
+            result: None,
+            error: Some(panic_message(err)),
+        },
+    }
+}
+
+/// Serve requests from one client connection. Returns true if shutdown was requested.
+fn serve_connection(prover: &mut ChunkProver, args: &Args, stream: UnixStream) -> bool {
+    let mut writer = stream.try_clone().expect("Failed to clone socket");
+    let reader = BufReader::new(stream);
+
+    for line in reader.lines() {
+        let line = match line {
+            Ok(line) => line,
+            Err(_) => break,
+        };
+        if line.trim().is_empty() {
+            continue;
+        }
+
+        let response = match serde_json::from_str::<ProveRequest>(&line) {
+            Ok(request) if request.op.as_deref() == Some("shutdown") => return true,
+            Ok(request) => handle_request(prover, args, request),
+            Err(e) => ProveResponse {
+                status: "error",
+                result: None,
+                error: Some(format!("Invalid request: {}", e)),
+            },
+        };
+
+        let mut response_json = serde_json::to_string(&response).expect("Failed to serialize response");
+        response_json.push('\n');
+        if writer.write_all(response_json.as_bytes()).is_err() {
+            break;
+        }
+    }
+
+    false
+}
+
+fn new_prover(args: &Args) -> ChunkProver {
+    let mut prover = ChunkProver::new(&args.params_dir);
+    prover.set_verify(!args.no_verify);
+    prover.set_key_cache(!args.no_key_cache);
+    prover.set_check(args.check);
+    prover.set_k(args.k);
+    prover.set_num_cols(args.num_cols);
+    prover.set_low_memory(args.low_memory);
+    prover
+}
+
+fn serve(socket_path: &str, args: &Args) {
+    let mut prover = new_prover(args);
+    // Remove a stale socket left behind by a previous server
+    if Path::new(socket_path).exists() {
+        fs::remove_file(socket_path).expect("Failed to remove stale socket");
+    }
+    let listener = UnixListener::bind(socket_path).expect("Failed to bind socket");
+    println!("Serving on {}", socket_path);
+
+    for stream in listener.incoming() {
+        match stream {
+            Ok(stream) => {
+                if serve_connection(&mut prover, args, stream) {
+                    break;
+                }
+            }
+            Err(e) => eprintln!("Error: failed to accept connection: {}", e),
+        }
+    }
+
+    fs::remove_file(socket_path).ok();
+}
+
+/// Prove every job in a manifest, sharing params and keys. Returns true if all succeeded.
+fn run_manifest(args: &Args, manifest_path: &str) -> bool {
+    let manifest = fs::read_to_string(manifest_path).expect("Failed to read manifest");
+    let jobs: Vec<ProveRequest> = serde_json::from_str(&manifest).expect("Invalid manifest");
+    println!("Proving {} jobs from {}", jobs.len(), manifest_path);
+
+    let mut prover = new_prover(args);
+    let mut responses = Vec::with_capacity(jobs.len());
+    for mut job in jobs {
+        if job.config.is_empty() {
+            job.config = args.config.clone().unwrap_or_default();
+        }
+        let response = handle_request(&mut prover, args, job);
+        if let Some(err) = &response.error {
+            eprintln!("Error: {}", err);
+        }
+        responses.push(response);
+    }
+
+    let num_failed = responses.iter().filter(|r| r.status != "ok").count();
+    println!(
+        "Manifest done: {} succeeded, {} failed",
+        responses.len() - num_failed,
+        num_failed
+    );
+
+    if let Some(results_path) = &args.results {
+        let results_json =
+            serde_json::to_string_pretty(&responses).expect("Failed to serialize results");
+        fs::write(results_path, results_json).expect("Failed to write results");
+    }
+
+    num_failed == 0
+}
+
+fn main() {
+    let args = Args::parse();
+
+    fs::create_dir_all(&args.params_dir).expect("Failed to create params directory");
+
+    if let Some(socket_path) = &args.serve {
+        serve(socket_path, &args);
+        return;
+    }
+
+    if let Some(manifest_path) = &args.manifest {
+        if !run_manifest(&args, manifest_path) {
+            std::process::exit(1);
+        }
+        return;
+    }
+
+    let config = args.config.as_deref().unwrap();
+    let start = args.start.unwrap();
+    let end = args.end.unwrap();
+
+    // Parse previous merkle roots if provided (none, or one per input)
+    if !args.prev_root.is_empty() && args.prev_root.len() != args.input.len() {
+        eprintln!("Error: Give one prev-root per input");
+        std::process::exit(1);
+    }
+    let mut prev_merkle_roots = vec![None; args.input.len()];
+    for (prev_merkle_root, h) in prev_merkle_roots.iter_mut().zip(args.prev_root.iter()) {
+        *prev_merkle_root = hex_to_fr(h);
+        if prev_merkle_root.is_none() {
+            eprintln!("Error: Invalid prev-root hex string");
+            std::process::exit(1);
+        }
+    }
+    let inputs: Vec<(&str, Option<Fr>)> = args
+        .input
+        .iter()
+        .map(|input| input.as_str())
+        .zip(prev_merkle_roots)
+        .collect();
+
+    println!(
+        "Proving chunk [{}, {}) for {} input(s) with merkle={}",
+        start,
+        end,
+        inputs.len(),
+        args.use_merkle
+    );
+
+    // Generate proof
+    let mut prover = new_prover(&args);
+    let result = prover.prove_multi(config, &inputs, start, end, args.use_merkle);
+
+    let json_result = write_outputs(
+        &args.output_dir,
+        start,
+        end,
+        args.use_merkle,
+        args.prev_root.first().cloned(),
+        &result,
+    );
+
     println!("Output written to {}/", args.output_dir);
     println!("  proof.bin: {} bytes", result.proof.len());
-    println!("  public_vals.bin: {} values", result.public_vals.len());
+    println!(
+        "  public_vals.bin: {} values for {} input(s)",
+        json_result.public_vals_count, json_result.num_instances
+    );
     println!("  result.json: metadata");
-    
+    if result.vk.is_some() {
+        println!("  vk.bin: verifying key (proof not verified)");
+    }
+
     if let Some(root) = &json_result.merkle_root {
         println!("  merkle_root: {}", root);
     }
 }
-
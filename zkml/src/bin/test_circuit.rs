@@ -16,7 +16,7 @@ fn main() {
   let circuit = ModelCircuit::<Fr>::generate_from_file(&config_fname, &inp_fname);
 
   let _prover = MockProver::run(config.k.try_into().unwrap(), &circuit, vec![vec![]]).unwrap();
-  let public_vals = get_public_values();
+  let public_vals = get_public_values(&circuit);
 
   let prover = MockProver::run(config.k.try_into().unwrap(), &circuit, vec![public_vals]).unwrap();
   assert_eq!(prover.verify(), Ok(()));
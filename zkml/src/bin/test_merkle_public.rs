@@ -54,7 +54,7 @@ fn main() {
     
     // Get public values
     println!("2. Getting public values...");
-    let public_vals = get_public_values();
+    let public_vals = get_public_values(&circuit);
     println!("   Number of public values: {}", public_vals.len());
     
     if !public_vals.is_empty() {
@@ -0,0 +1,289 @@
+//! Batch verification of chunk proofs produced by `prove_chunk --no-verify`.
+//!
+//! Usage:
+//!   verify_chunks --config <path> [--params-dir <path>] [--batch-size <n>] \
+//!                 [--num-cols <n>] [--results <path>] <proof_dir>...
+//!
+//! Each proof dir must contain proof.bin, public_vals.bin, vk.bin and result.json, which
+//! gives the chunk's layer range, Merkle settings and k, and the number of instances whose
+//! public values public_vals.bin concatenates. A dir with a missing or malformed file is
+//! an error (exit code 2), since its proof can't be checked against the right circuit.
+//!
+//! Proofs are checked against verifying keys rebuilt from the model config, one per chunk
+//! shape, never against the vk.bin the prover wrote: that would accept a proof of any
+//! circuit with the same gates, e.g. of another chunk. A vk.bin that differs from the
+//! rebuilt key makes its proof invalid. Proofs are grouped by k, split into batches that
+//! are verified in parallel with one accumulated pairing check each, and batches that
+//! fail are re-checked proof by proof to report which proofs are invalid.
+
+use std::{
+  collections::BTreeMap,
+  fs,
+  path::Path,
+};
+
+use clap::Parser;
+use halo2_proofs::{
+  halo2curves::bn256::{Fr, G1Affine},
+  plonk::VerifyingKey,
+  SerdeFormat,
+};
+use serde_derive::Serialize;
+use zkml::{
+  model::ModelCircuit,
+  utils::{
+    loader::load_config_msgpack,
+    proving_kzg::{chunk_vk, get_kzg_params, verify_batches_kzg, PendingChunkProof},
+  },
+};
+
+#[derive(Parser, Debug)]
+#[command(name = "verify_chunks")]
+#[command(about = "Batch-verify chunk proofs")]
+struct Args {
+  /// Path to model config (msgpack), used to rebuild the chunks' verifying keys
+  #[arg(long)]
+  config: String,
+
+  /// Directory with the KZG params used for proving
+  #[arg(long, default_value = "./params_kzg")]
+  params_dir: String,
+
+  /// Number of proofs per accumulated pairing check
+  #[arg(long, default_value = "16")]
+  batch_size: usize,
+
+  /// Number of advice columns the proofs were made with (default: the model's)
+  #[arg(long)]
+  num_cols: Option<usize>,
+
+  /// Where to write per-proof results as JSON
+  #[arg(long)]
+  results: Option<String>,
+
+  /// Proof output directories
+  #[arg(required = true)]
+  proof_dirs: Vec<String>,
+}
+
+#[derive(Serialize)]
+struct VerifyResult {
+  proof_dir: String,
+  valid: bool,
+}
+
+/// What determines a chunk proof's verifying key, besides the model
+#[derive(Clone, PartialEq, Eq, PartialOrd, Ord)]
+struct ChunkShape {
+  chunk_start: usize,
+  chunk_end: usize,
+  use_merkle: bool,
+  has_prev_root: bool,
+}
+
+/// The files of one proof dir
+struct ProofFiles {
+  k: u32,
+  shape: ChunkShape,
+  vk: Vec<u8>,
+  proof: Vec<u8>,
+  /// Public values of each instance
+  instances: Vec<Vec<Fr>>,
+}
+
+fn read_file(dir: &Path, name: &str) -> Result<Vec<u8>, String> {
+  fs::read(dir.join(name)).map_err(|e| format!("{}: {}", name, e))
+}
+
+fn read_proof_dir(dir: &Path, num_layers: usize) -> Result<ProofFiles, String> {
+  let result_json: serde_json::Value = serde_json::from_slice(&read_file(dir, "result.json")?)
+    .map_err(|e| format!("result.json: {}", e))?;
+  let k = result_json["k"].as_u64().ok_or("result.json: missing k")? as u32;
+  let shape = ChunkShape {
+    chunk_start: result_json["chunk_start"]
+      .as_u64()
+      .ok_or("result.json: missing chunk_start")? as usize,
+    chunk_end: result_json["chunk_end"]
+      .as_u64()
+      .ok_or("result.json: missing chunk_end")? as usize,
+    use_merkle: result_json["use_merkle"]
+      .as_bool()
+      .ok_or("result.json: missing use_merkle")?,
+    has_prev_root: !result_json["prev_merkle_root"].is_null(),
+  };
+  if shape.chunk_start >= shape.chunk_end || shape.chunk_end > num_layers {
+    return Err(format!(
+      "result.json: chunk [{}, {}) is not a layer range of the model",
+      shape.chunk_start, shape.chunk_end
+    ));
+  }
+  let num_instances = result_json["num_instances"]
+    .as_u64()
+    .filter(|n| *n > 0)
+    .ok_or("result.json: missing num_instances")? as usize;
+
+  let public_vals_u8 = read_file(dir, "public_vals.bin")?;
+  if public_vals_u8.len() % 32 != 0 {
+    return Err(format!(
+      "public_vals.bin: {} bytes is not a whole number of field elements",
+      public_vals_u8.len()
+    ));
+  }
+  let public_vals = public_vals_u8
+    .chunks(32)
+    .map(|chunk| Option::from(Fr::from_bytes(chunk.try_into().unwrap())))
+    .collect::<Option<Vec<Fr>>>()
+    .ok_or("public_vals.bin: value out of field range")?;
+  if public_vals.len() % num_instances != 0 {
+    return Err(format!(
+      "public_vals.bin: {} values do not split evenly into {} instances",
+      public_vals.len(),
+      num_instances
+    ));
+  }
+  let per_instance = public_vals.len() / num_instances;
+  let instances = (0..num_instances)
+    .map(|i| public_vals[i * per_instance..(i + 1) * per_instance].to_vec())
+    .collect();
+
+  Ok(ProofFiles {
+    k,
+    shape,
+    vk: read_file(dir, "vk.bin")?,
+    proof: read_file(dir, "proof.bin")?,
+    instances,
+  })
+}
+
+fn main() {
+  let args = Args::parse();
+
+  // The whole model gives each chunk's input tensors (its boundary_idxes)
+  let config = load_config_msgpack(&args.config);
+  let full_circuit = ModelCircuit::<Fr>::generate_from_msgpack(config.clone(), false);
+  let num_layers = config.layers.len();
+
+  let mut proof_files = vec![];
+  let mut num_errors = 0;
+  for proof_dir in args.proof_dirs.iter() {
+    match read_proof_dir(Path::new(proof_dir), num_layers) {
+      Ok(files) => proof_files.push(files),
+      Err(e) => {
+        eprintln!("Error: {}: {}", proof_dir, e);
+        num_errors += 1;
+      }
+    }
+  }
+  if num_errors > 0 {
+    std::process::exit(2);
+  }
+
+  // Group proofs by k, then by chunk shape, which share one verifying key
+  let mut by_k: BTreeMap<u32, BTreeMap<ChunkShape, Vec<(usize, ProofFiles)>>> = BTreeMap::new();
+  for (idx, files) in proof_files.into_iter().enumerate() {
+    by_k
+      .entry(files.k)
+      .or_default()
+      .entry(files.shape.clone())
+      .or_default()
+      .push((idx, files));
+  }
+
+  let mut valid = vec![false; args.proof_dirs.len()];
+  for (k, shapes) in by_k {
+    let params = get_kzg_params(&args.params_dir, k);
+
+    let mut vks: Vec<VerifyingKey<G1Affine>> = vec![];
+    let mut group = vec![];
+    for (shape, proofs) in shapes {
+      let input_idxes: Vec<i64> = full_circuit
+        .boundary_idxes(shape.chunk_start)
+        .into_iter()
+        .map(|idx| idx as i64)
+        .collect();
+      let vk = match chunk_vk(
+        &params,
+        &config,
+        &input_idxes,
+        shape.chunk_start,
+        shape.chunk_end,
+        shape.use_merkle,
+        shape.has_prev_root,
+        args.num_cols,
+      ) {
+        Ok(vk) => vk,
+        Err(e) => {
+          eprintln!(
+            "Error: chunk [{}, {}) with k={}: keygen_vk: {:?}",
+            shape.chunk_start, shape.chunk_end, k, e
+          );
+          std::process::exit(2);
+        }
+      };
+      let vk_bytes = vk.to_bytes(SerdeFormat::RawBytes);
+      vks.push(vk);
+      for (idx, files) in proofs {
+        // Proven against another circuit (or a tampered key); invalid whatever the proof
+        if files.vk != vk_bytes {
+          eprintln!(
+            "{}: vk.bin is not the verifying key of chunk [{}, {}) with k={}",
+            args.proof_dirs[idx], shape.chunk_start, shape.chunk_end, k
+          );
+          continue;
+        }
+        group.push((idx, vks.len() - 1, files.proof, files.instances));
+      }
+    }
+
+    let (idxes, pending): (Vec<usize>, Vec<PendingChunkProof>) = group
+      .into_iter()
+      .map(|(idx, vk_id, proof, instances)| {
+        (
+          idx,
+          PendingChunkProof {
+            vk: &vks[vk_id],
+            proof,
+            instances,
+          },
+        )
+      })
+      .unzip();
+
+    for (idx, ok) in idxes
+      .into_iter()
+      .zip(verify_batches_kzg(&params, &pending, args.batch_size))
+    {
+      valid[idx] = ok;
+    }
+  }
+
+  let results: Vec<VerifyResult> = args
+    .proof_dirs
+    .iter()
+    .zip(valid.iter())
+    .map(|(proof_dir, ok)| VerifyResult {
+      proof_dir: proof_dir.clone(),
+      valid: *ok,
+    })
+    .collect();
+
+  let num_invalid = results.iter().filter(|r| !r.valid).count();
+  for result in results.iter().filter(|r| !r.valid) {
+    eprintln!("Invalid proof: {}", result.proof_dir);
+  }
+  println!(
+    "Verified {} proofs: {} valid, {} invalid",
+    results.len(),
+    results.len() - num_invalid,
+    num_invalid
+  );
+
+  if let Some(results_path) = &args.results {
+    let results_json = serde_json::to_string_pretty(&results).expect("Failed to serialize results");
+    fs::write(results_path, results_json).expect("Failed to write results");
+  }
+
+  if num_invalid > 0 {
+    std::process::exit(1);
+  }
+}
@@ -41,6 +41,6 @@ fn main() {
   let circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, false);
 
   let _prover = MockProver::run(k.try_into().unwrap(), &circuit, vec![vec![]]).unwrap();
-  let public_vals: Vec<Fr> = get_public_values();
+  let public_vals: Vec<Fr> = get_public_values(&circuit);
   println!("Public values: {:?}", public_vals);
 }
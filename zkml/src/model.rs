@@ -1,4 +1,5 @@
 use std::{
+  borrow::Borrow,
   collections::{BTreeMap, BTreeSet, HashMap},
   marker::PhantomData,
   rc::Rc,
@@ -10,7 +11,6 @@ use halo2_proofs::{
   halo2curves::ff::{FromUniformBytes, PrimeField},
   plonk::{Advice, Circuit, Column, ConstraintSystem, Error, Instance},
 };
-use lazy_static::lazy_static;
 use ndarray::{Array, IxDyn};
 use num_bigint::BigUint;
 
@@ -75,21 +75,64 @@ use crate::{
     update::UpdateChip,
   },
   utils::{
-    helpers::{convert_to_bigint, RAND_START_IDX},
-    loader::{load_model_msgpack, ModelMsgpack},
+    helpers::{assigned_tensor_values, convert_pos_int, convert_to_bigint, RAND_START_IDX},
+    loader::{load_model_msgpack, ModelMsgpack, TensorMsgpack},
   },
 };
 
-lazy_static! {
-  pub static ref GADGET_CONFIG: Mutex<GadgetConfig> = Mutex::new(GadgetConfig::default());
-  pub static ref PUBLIC_VALS: Mutex<Vec<BigUint>> = Mutex::new(vec![]);
+/// Public values computed by the most recent `synthesize` of a circuit.
+///
+/// `synthesize` only gets `&self`, so they are written through a lock. Each circuit (and
+/// each clone of one) has its own, so circuits can be synthesized on different threads.
+#[derive(Debug, Default)]
+pub struct PublicVals(Mutex<Vec<BigUint>>);
+
+impl PublicVals {
+  pub fn get(&self) -> Vec<BigUint> {
+    self.0.lock().unwrap().clone()
+  }
+
+  fn set(&self, vals: Vec<BigUint>) {
+    *self.0.lock().unwrap() = vals;
+  }
+}
+
+impl Clone for PublicVals {
+  fn clone(&self) -> Self {
+    PublicVals(Mutex::new(self.get()))
+  }
+}
+
+/// Tensors a chunk hands on to the next chunk, recorded by the most recent `synthesize`.
+///
+/// They are in the input msgpack format, so the next chunk can load them in place of the
+/// model input (see `ModelCircuit::boundary_idxes`). Written through a lock like
+/// `PublicVals`.
+#[derive(Debug, Default)]
+pub struct ChunkBoundary(Mutex<Vec<TensorMsgpack>>);
+
+impl ChunkBoundary {
+  pub fn get(&self) -> Vec<TensorMsgpack> {
+    self.0.lock().unwrap().clone()
+  }
+
+  fn set(&self, tensors: Vec<TensorMsgpack>) {
+    *self.0.lock().unwrap() = tensors;
+  }
+}
+
+impl Clone for ChunkBoundary {
+  fn clone(&self) -> Self {
+    ChunkBoundary(Mutex::new(self.get()))
+  }
 }
 
 #[derive(Clone, Debug, Default)]
 pub struct ModelCircuit<F: PrimeField> {
   pub used_gadgets: Arc<BTreeSet<GadgetType>>,
   pub dag_config: DAGLayerConfig,
-  pub tensors: BTreeMap<i64, Array<F, IxDyn>>,
+  /// Weights and inputs, shared between clones of the circuit
+  pub tensors: Arc<BTreeMap<i64, Array<F, IxDyn>>>,
   pub commit_before: Vec<Vec<i64>>,
   pub commit_after: Vec<Vec<i64>>,
   pub k: usize,
@@ -102,6 +145,12 @@ pub struct ModelCircuit<F: PrimeField> {
   pub use_merkle: bool,
   /// Expected Merkle root from previous chunk (for chained verification)
   pub prev_merkle_root: Option<F>,
+  /// Gadget settings the circuit is configured with (the circuit's `Params`)
+  pub gadget_config: GadgetConfig,
+  /// Output of `synthesize`, read with `get_public_values`
+  pub public_vals: PublicVals,
+  /// Outputs handed to the next chunk, set when synthesizing a chunk
+  pub boundary: ChunkBoundary,
 }
 
 #[derive(Clone, Debug)]
@@ -113,11 +162,11 @@ pub struct ModelConfig<F: PrimeField + Ord + FromUniformBytes<64>> {
 }
 
 impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
-  pub fn assign_tensors_map(
+  pub fn assign_tensors_map<T: Borrow<Array<F, IxDyn>>>(
     &self,
     mut layouter: impl Layouter<F>,
     columns: &Vec<Column<Advice>>,
-    tensors: &BTreeMap<i64, Array<F, IxDyn>>,
+    tensors: &BTreeMap<i64, T>,
   ) -> Result<BTreeMap<i64, AssignedTensor<F>>, Error> {
     let tensors = layouter.assign_region(
       || "asssignment",
@@ -126,6 +175,7 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
         let mut assigned_tensors = BTreeMap::new();
 
         for (tensor_idx, tensor) in tensors.iter() {
+          let tensor = tensor.borrow();
           let mut flat = vec![];
           for val in tensor.iter() {
             let row_idx = cell_idx / columns.len();
@@ -176,11 +226,11 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
     Ok(tensors)
   }
 
-  pub fn assign_tensors_vec(
+  pub fn assign_tensors_vec<T: Borrow<Array<F, IxDyn>>>(
     &self,
     mut layouter: impl Layouter<F>,
     columns: &Vec<Column<Advice>>,
-    tensors: &BTreeMap<i64, Array<F, IxDyn>>,
+    tensors: &BTreeMap<i64, T>,
   ) -> Result<Vec<AssignedTensor<F>>, Error> {
     let tensor_map = self
       .assign_tensors_map(
@@ -335,6 +385,75 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
     self
   }
 
+  /// Resize the circuit to 2^k rows
+  ///
+  /// The lookup tables fill the rows, so the range of values they accept,
+  /// [-2^(k-1), 2^(k-1) - 10), changes with k.
+  pub fn set_k(&mut self, k: usize) -> &mut Self {
+    self.k = k;
+    self.gadget_config.k = k;
+    self.gadget_config.div_outp_min_val = -(1 << (k - 1));
+    self.gadget_config.min_val = -(1 << (k - 1));
+    self.gadget_config.max_val = (1 << (k - 1)) - 10;
+    self.gadget_config.num_rows = (1 << k) - 10 + 1;
+    self
+  }
+
+  /// Set the number of advice columns the layers are laid out over
+  pub fn set_num_cols(&mut self, num_cols: usize) -> &mut Self {
+    self.gadget_config.num_cols = num_cols;
+    self
+  }
+
+  /// Tensors that are live between layer `end - 1` and layer `end`.
+  ///
+  /// These are the model inputs and layer outputs of layers before `end` that a later
+  /// layer reads or that are model outputs. Proving `[end, ..)` needs only these and the
+  /// weights, so a chunk's boundary can stand in for the model input of the next chunk.
+  pub fn boundary_idxes(&self, end: usize) -> Vec<usize> {
+    let dag_config = &self.dag_config;
+    let available: BTreeSet<usize> = self
+      .inp_idxes
+      .iter()
+      .map(|idx| *idx as usize)
+      .chain(dag_config.out_idxes[..end].iter().flatten().cloned())
+      .collect();
+    let needed: BTreeSet<usize> = dag_config.inp_idxes[end..]
+      .iter()
+      .flatten()
+      .chain(dag_config.final_out_idxes.iter())
+      .cloned()
+      .collect();
+    available.intersection(&needed).cloned().collect()
+  }
+
+  /// The tensors the circuit assigns before running the DAG.
+  ///
+  /// For a chunk, only the tensors read by layers in `[chunk_start, chunk_end)`: their
+  /// weights and the model inputs or boundary tensors they start from. Other weights
+  /// would only cost rows, so a chunk's size (and k) follows its own layers rather than
+  /// the whole model.
+  pub fn assigned_tensors(&self) -> BTreeMap<i64, &Array<F, IxDyn>> {
+    let num_layers = self.dag_config.inp_idxes.len();
+    let read: Option<BTreeSet<i64>> = match (self.chunk_start, self.chunk_end) {
+      (Some(start), Some(end)) if start < end && end <= num_layers => Some(
+        self.dag_config.inp_idxes[start..end]
+          .iter()
+          .flatten()
+          .map(|idx| *idx as i64)
+          .collect(),
+      ),
+      // Full model, or an invalid range that forward_chunk rejects
+      _ => None,
+    };
+    self
+      .tensors
+      .iter()
+      .filter(|(idx, _)| read.as_ref().map_or(true, |read| read.contains(idx)))
+      .map(|(idx, tensor)| (*idx, tensor))
+      .collect()
+  }
+
   pub fn generate_from_msgpack(config: ModelMsgpack, panic_empty_tensor: bool) -> ModelCircuit<F> {
     let to_field = |x: i64| {
       let bias = 1 << 31;
@@ -496,27 +615,21 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
     // The input lookup is always used
     used_gadgets.insert(GadgetType::InputLookup);
     let used_gadgets = Arc::new(used_gadgets);
-    let gadget = &GADGET_CONFIG;
-    let cloned_gadget = gadget.lock().unwrap().clone();
-    *gadget.lock().unwrap() = GadgetConfig {
+    // The k-dependent fields are set by set_k below
+    let gadget_config = GadgetConfig {
       scale_factor: config.global_sf as u64,
       shift_min_val: -(config.global_sf * config.global_sf * (1 << 17)),
-      div_outp_min_val: -(1 << (config.k - 1)),
-      min_val: -(1 << (config.k - 1)),
-      max_val: (1 << (config.k - 1)) - 10,
-      k: config.k as usize,
-      num_rows: (1 << config.k) - 10 + 1,
       num_cols: config.num_cols as usize,
       used_gadgets: used_gadgets.clone(),
       commit_before: config.commit_before.clone().unwrap_or(vec![]),
       commit_after: config.commit_after.clone().unwrap_or(vec![]),
       use_selectors: config.use_selectors.unwrap_or(true),
       num_bits_per_elem: config.bits_per_elem.unwrap_or(config.k),
-      ..cloned_gadget
+      ..Default::default()
     };
 
-    ModelCircuit {
-      tensors,
+    let mut circuit = ModelCircuit {
+      tensors: Arc::new(tensors),
       dag_config,
       used_gadgets,
       k: config.k as usize,
@@ -529,7 +642,12 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
       chunk_end: None,
       use_merkle: false,
       prev_merkle_root: None,
-    }
+      gadget_config,
+      public_vals: PublicVals::default(),
+      boundary: ChunkBoundary::default(),
+    };
+    circuit.set_k(config.k as usize);
+    circuit
   }
 
   pub fn assign_and_commit(
@@ -612,14 +730,36 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> ModelCircuit<F> {
 impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F> {
   type Config = ModelConfig<F>;
   type FloorPlanner = SimpleFloorPlanner;
-  type Params = ();
+  type Params = GadgetConfig;
 
   fn without_witnesses(&self) -> Self {
-    todo!()
+    // The model inputs are the only witness; the weights are part of the circuit
+    let mut tensors = (*self.tensors).clone();
+    for idx in self.inp_idxes.iter() {
+      if let Some(tensor) = tensors.get_mut(idx) {
+        tensor.fill(F::ZERO);
+      }
+    }
+    ModelCircuit {
+      tensors: Arc::new(tensors),
+      public_vals: PublicVals::default(),
+      boundary: ChunkBoundary::default(),
+      ..self.clone()
+    }
+  }
+
+  fn params(&self) -> Self::Params {
+    self.gadget_config.clone()
+  }
+
+  fn configure(_meta: &mut ConstraintSystem<F>) -> Self::Config {
+    panic!("ModelCircuit must be configured with its GadgetConfig (configure_with_params)")
   }
 
-  fn configure(meta: &mut ConstraintSystem<F>) -> Self::Config {
-    let mut gadget_config = crate::model::GADGET_CONFIG.lock().unwrap().clone();
+  fn configure_with_params(
+    meta: &mut ConstraintSystem<F>,
+    mut gadget_config: Self::Params,
+  ) -> Self::Config {
     let columns = (0..gadget_config.num_cols)
       .map(|_| meta.advice_column())
       .collect::<Vec<_>>();
@@ -824,11 +964,11 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F>
 
       // Assign the remainder of the tensors
       let mut assign_map = BTreeMap::new();
-      for (idx, tensor) in self.tensors.iter() {
-        if ignore_idxes.contains(idx) {
+      for (idx, tensor) in self.assigned_tensors() {
+        if ignore_idxes.contains(&idx) {
           continue;
         }
-        assign_map.insert(*idx, tensor.clone());
+        assign_map.insert(idx, tensor);
       }
       let mut remainder_tensor_map = self
         .assign_tensors_map(
@@ -848,7 +988,7 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F>
         .assign_tensors_vec(
           layouter.namespace(|| "assignment"),
           &config.gadget_config.columns,
-          &self.tensors,
+          &self.assigned_tensors(),
         )
         .unwrap()
     };
@@ -898,6 +1038,34 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F>
       (tensor_map, result, None)
     };
 
+    if let (Some(chunk_start), Some(chunk_end)) = (self.chunk_start, self.chunk_end) {
+      // Tensors live across the chunk that it doesn't read were not assigned; they are
+      // handed on from the chunk's input as is
+      let produced: BTreeSet<usize> = self.dag_config.out_idxes[chunk_start..chunk_end]
+        .iter()
+        .flatten()
+        .cloned()
+        .collect();
+      let boundary = self
+        .boundary_idxes(chunk_end)
+        .into_iter()
+        .filter_map(|idx| {
+          let values = if produced.contains(&idx) {
+            assigned_tensor_values(final_tensor_map.get(&idx)?)
+          } else {
+            let tensor = self.tensors.get(&(idx as i64))?;
+            tensor.map(|x| convert_pos_int(Value::known(*x)) as i64)
+          };
+          Some(TensorMsgpack {
+            idx: idx as i64,
+            shape: values.shape().iter().map(|dim| *dim as i64).collect(),
+            data: values.iter().cloned().collect(),
+          })
+        })
+        .collect();
+      self.boundary.set(boundary);
+    }
+
     if self.commit_after.len() > 0 {
       for commit_idxes in self.commit_after.iter() {
         let to_commit = BTreeMap::from_iter(commit_idxes.iter().map(|idx| {
@@ -920,8 +1088,9 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F>
     let mut total_idx = 0;
     let mut new_public_vals = vec![];
     
-    // If prev_merkle_root is set, add it as the first public input for chain verification
-    // This allows the verifier to check that Chunk N's input matches Chunk N-1's output
+    // If prev_merkle_root is set, add it as the first public input. It is only exposed,
+    // not checked against the chunk's input, so it does not link the chunk to the
+    // previous one's output
     if let Some(prev_root) = self.prev_merkle_root {
       let prev_root_cell = pub_layouter.assign_region(
         || "prev merkle root",
@@ -969,7 +1138,7 @@ impl<F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for ModelCircuit<F>
         total_idx += 1;
       }
     }
-    *PUBLIC_VALS.lock().unwrap() = new_public_vals;
+    self.public_vals.set(new_public_vals);
 
     Ok(())
   }
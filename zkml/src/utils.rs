@@ -1,4 +1,7 @@
+pub mod cost;
 pub mod helpers;
 pub mod loader;
 pub mod proving_ipa;
 pub mod proving_kzg;
+pub mod srs;
+pub mod witness;
@@ -0,0 +1,223 @@
+//! Per-layer row estimates, for splitting a model into chunks of similar proving cost.
+//!
+//! Uses the `Layer::num_rows` estimates (shared with the `estimate_cost` binary through
+//! `layer_num_rows`), without synthesizing the circuit. A chunk's circuit needs roughly `base_rows` plus the
+//! `num_rows` and `assign_rows` of its layers, and proving time grows with the rows
+//! (through k), so the row counts are a proxy for cost that needs no input data.
+//!
+//! The polynomial counts (as in `estimate_cost`) size the prover's memory: it holds
+//! `num_polys` polynomials of 2^k values, in evaluation and coefficient form and on the
+//! `extension` times larger coset.
+
+use std::marker::PhantomData;
+
+use halo2_proofs::{
+  halo2curves::bn256::Fr,
+  plonk::{Circuit, ConstraintSystem},
+};
+use serde_derive::Serialize;
+
+use crate::{
+  layers::{
+    arithmetic::{add::AddChip, div_var::DivVarChip, mul::MulChip, sub::SubChip},
+    avg_pool_2d::AvgPool2DChip,
+    batch_mat_mul::BatchMatMulChip,
+    conv2d::Conv2DChip,
+    cos::CosChip,
+    div_fixed::DivFixedChip,
+    fc::fully_connected::{FullyConnectedChip, FullyConnectedConfig},
+    layer::{Layer, LayerConfig, LayerType},
+    logistic::LogisticChip,
+    max_pool_2d::MaxPool2DChip,
+    mean::MeanChip,
+    noop::NoopChip,
+    pow::PowChip,
+    rsqrt::RsqrtChip,
+    shape::{
+      broadcast::BroadcastChip, concatenation::ConcatenationChip, mask_neg_inf::MaskNegInfChip,
+      pack::PackChip, pad::PadChip, permute::PermuteChip, reshape::ReshapeChip,
+      resize_nn::ResizeNNChip, rotate::RotateChip, slice::SliceChip, split::SplitChip,
+      transpose::TransposeChip,
+    },
+    sin::SinChip,
+    softmax::SoftmaxChip,
+    sqrt::SqrtChip,
+    square::SquareChip,
+    squared_diff::SquaredDiffChip,
+    tanh::TanhChip,
+    update::UpdateChip,
+  },
+  model::ModelCircuit,
+};
+
+/// Estimated rows of one layer
+#[derive(Clone, Debug, Serialize)]
+pub struct LayerCost {
+  pub layer_type: String,
+  /// Rows used by the layer's gadgets
+  pub num_rows: i64,
+  /// Rows for assigning the loaded tensors (weights, model inputs) the layer reads
+  pub assign_rows: i64,
+}
+
+/// Estimated rows of a model, by layer
+#[derive(Clone, Debug, Serialize)]
+pub struct ModelCost {
+  pub num_cols: i64,
+  /// The model's k, the largest a chunk is proven with
+  pub k: i64,
+  /// Polynomials of 2^k values held while proving: instance, advice, lookup (permuted
+  /// input, permuted table, product) and permutation product columns, plus the fixed,
+  /// selector and permutation columns of the proving key
+  pub num_polys: i64,
+  /// Size of the extended domain relative to 2^k
+  pub extension: i64,
+  /// Rows every chunk needs regardless of its layers: constants and blinding rows
+  pub base_rows: i64,
+  pub layers: Vec<LayerCost>,
+}
+
+/// Rows used by a layer's gadgets, per the layer's `Layer::num_rows`
+pub fn layer_num_rows(layer_config: &LayerConfig, num_cols: i64) -> i64 {
+  match layer_config.layer_type {
+    LayerType::Add => <AddChip as Layer<Fr>>::num_rows(&AddChip {}, layer_config, num_cols),
+    LayerType::AvgPool2D => {
+      <AvgPool2DChip as Layer<Fr>>::num_rows(&AvgPool2DChip {}, layer_config, num_cols)
+    }
+    LayerType::BatchMatMul => {
+      <BatchMatMulChip as Layer<Fr>>::num_rows(&BatchMatMulChip {}, layer_config, num_cols)
+    }
+    LayerType::Broadcast => {
+      <BroadcastChip as Layer<Fr>>::num_rows(&BroadcastChip {}, layer_config, num_cols)
+    }
+    LayerType::Concatenation => {
+      <ConcatenationChip as Layer<Fr>>::num_rows(&ConcatenationChip {}, layer_config, num_cols)
+    }
+    LayerType::Conv2D => {
+      let chip = Conv2DChip {
+        config: layer_config.clone(),
+        _marker: PhantomData,
+      };
+      <Conv2DChip<Fr> as Layer<Fr>>::num_rows(&chip, layer_config, num_cols)
+    }
+    LayerType::Cos => <CosChip as Layer<Fr>>::num_rows(&CosChip {}, layer_config, num_cols),
+    LayerType::DivFixed => {
+      <DivFixedChip as Layer<Fr>>::num_rows(&DivFixedChip {}, layer_config, num_cols)
+    }
+    LayerType::DivVar => {
+      <DivVarChip as Layer<Fr>>::num_rows(&DivVarChip {}, layer_config, num_cols)
+    }
+    LayerType::FullyConnected => {
+      let chip = FullyConnectedChip {
+        _marker: PhantomData,
+        config: FullyConnectedConfig::construct(true),
+      };
+      <FullyConnectedChip<Fr> as Layer<Fr>>::num_rows(&chip, layer_config, num_cols)
+    }
+    LayerType::Logistic => {
+      <LogisticChip as Layer<Fr>>::num_rows(&LogisticChip {}, layer_config, num_cols)
+    }
+    LayerType::MaskNegInf => {
+      <MaskNegInfChip as Layer<Fr>>::num_rows(&MaskNegInfChip {}, layer_config, num_cols)
+    }
+    LayerType::MaxPool2D => {
+      let chip = MaxPool2DChip {
+        marker: PhantomData,
+      };
+      <MaxPool2DChip<Fr> as Layer<Fr>>::num_rows(&chip, layer_config, num_cols)
+    }
+    LayerType::Mean => <MeanChip as Layer<Fr>>::num_rows(&MeanChip {}, layer_config, num_cols),
+    LayerType::Mul => <MulChip as Layer<Fr>>::num_rows(&MulChip {}, layer_config, num_cols),
+    LayerType::Noop => <NoopChip as Layer<Fr>>::num_rows(&NoopChip {}, layer_config, num_cols),
+    LayerType::Pack => <PackChip as Layer<Fr>>::num_rows(&PackChip {}, layer_config, num_cols),
+    LayerType::Pad => <PadChip as Layer<Fr>>::num_rows(&PadChip {}, layer_config, num_cols),
+    LayerType::Permute => {
+      <PermuteChip as Layer<Fr>>::num_rows(&PermuteChip {}, layer_config, num_cols)
+    }
+    LayerType::Pow => <PowChip as Layer<Fr>>::num_rows(&PowChip {}, layer_config, num_cols),
+    LayerType::Reshape => {
+      <ReshapeChip as Layer<Fr>>::num_rows(&ReshapeChip {}, layer_config, num_cols)
+    }
+    LayerType::ResizeNN => {
+      <ResizeNNChip as Layer<Fr>>::num_rows(&ResizeNNChip {}, layer_config, num_cols)
+    }
+    LayerType::Rotate => {
+      <RotateChip as Layer<Fr>>::num_rows(&RotateChip {}, layer_config, num_cols)
+    }
+    LayerType::Rsqrt => <RsqrtChip as Layer<Fr>>::num_rows(&RsqrtChip {}, layer_config, num_cols),
+    LayerType::Sin => <SinChip as Layer<Fr>>::num_rows(&SinChip {}, layer_config, num_cols),
+    LayerType::Slice => <SliceChip as Layer<Fr>>::num_rows(&SliceChip {}, layer_config, num_cols),
+    LayerType::Softmax => {
+      <SoftmaxChip as Layer<Fr>>::num_rows(&SoftmaxChip {}, layer_config, num_cols)
+    }
+    LayerType::Split => <SplitChip as Layer<Fr>>::num_rows(&SplitChip {}, layer_config, num_cols),
+    LayerType::Sqrt => <SqrtChip as Layer<Fr>>::num_rows(&SqrtChip {}, layer_config, num_cols),
+    LayerType::Square => {
+      <SquareChip as Layer<Fr>>::num_rows(&SquareChip {}, layer_config, num_cols)
+    }
+    LayerType::SquaredDifference => {
+      <SquaredDiffChip as Layer<Fr>>::num_rows(&SquaredDiffChip {}, layer_config, num_cols)
+    }
+    LayerType::Sub => <SubChip as Layer<Fr>>::num_rows(&SubChip {}, layer_config, num_cols),
+    LayerType::Tanh => <TanhChip as Layer<Fr>>::num_rows(&TanhChip {}, layer_config, num_cols),
+    LayerType::Transpose => {
+      <TransposeChip as Layer<Fr>>::num_rows(&TransposeChip {}, layer_config, num_cols)
+    }
+    LayerType::Update => {
+      <UpdateChip as Layer<Fr>>::num_rows(&UpdateChip {}, layer_config, num_cols)
+    }
+  }
+}
+
+/// Estimate the rows of every layer of `circuit`
+///
+/// The circuit must hold every tensor the model loads (weights and model inputs, with
+/// or without data), e.g. from `load_config_msgpack` and `attach_input_shapes`.
+pub fn model_cost(circuit: &ModelCircuit<Fr>) -> ModelCost {
+  let num_cols = circuit.gadget_config.num_cols as i64;
+
+  let mut cs = ConstraintSystem::<Fr>::default();
+  ModelCircuit::<Fr>::configure_with_params(&mut cs, circuit.params());
+  // num_random + [0, 1, sf, min_val, max_val]
+  let num_constants = circuit.num_random + 5;
+  let base_rows = num_constants.div_ceil(num_cols) + cs.minimum_rows() as i64;
+
+  let num_perm_cols = cs.permutation().get_columns().len();
+  let num_perm_products = num_perm_cols.div_ceil(cs.degree() - 2);
+  let num_polys = cs.num_instance_columns()
+    + cs.num_advice_columns()
+    + 3 * cs.lookups().len()
+    + num_perm_products
+    + cs.num_fixed_columns()
+    + cs.num_selectors()
+    + num_perm_cols;
+  let extension = (cs.degree() - 1).next_power_of_two();
+
+  let dag_config = &circuit.dag_config;
+  let layers = dag_config
+    .ops
+    .iter()
+    .zip(dag_config.inp_idxes.iter())
+    .map(|(layer_config, inp_idxes)| {
+      let assign_elems: usize = inp_idxes
+        .iter()
+        .filter_map(|idx| circuit.tensors.get(&(*idx as i64)))
+        .map(|tensor| tensor.len())
+        .sum();
+      LayerCost {
+        layer_type: format!("{:?}", layer_config.layer_type),
+        num_rows: layer_num_rows(layer_config, num_cols),
+        assign_rows: (assign_elems as i64).div_ceil(num_cols),
+      }
+    })
+    .collect();
+
+  ModelCost {
+    num_cols,
+    k: circuit.k as i64,
+    num_polys: num_polys as i64,
+    extension: extension as i64,
+    base_rows,
+    layers,
+  }
+}
@@ -1,3 +1,5 @@
+use std::sync::atomic::{AtomicU64, AtomicUsize, Ordering};
+
 use halo2_proofs::{
   circuit::{AssignedCell, Value},
   halo2curves::ff::PrimeField,
@@ -5,7 +7,9 @@ use halo2_proofs::{
 use ndarray::{Array, IxDyn};
 use num_bigint::BigUint;
 
-use crate::{gadgets::gadget::convert_to_u128, model::PUBLIC_VALS};
+use crate::{
+  gadgets::gadget::convert_to_u128, layers::layer::AssignedTensor, model::ModelCircuit,
+};
 
 // TODO: this is very bad
 pub const RAND_START_IDX: i64 = i64::MIN;
@@ -32,6 +36,11 @@ pub fn convert_pos_int<F: PrimeField>(x: Value<F>) -> i128 {
   return outp;
 }
 
+/// Integer values of an assigned tensor (zeros if its values are unknown)
+pub fn assigned_tensor_values<F: PrimeField>(tensor: &AssignedTensor<F>) -> Array<i64, IxDyn> {
+  tensor.map(|cell| convert_pos_int(cell.value().map(|x| x.to_owned())) as i64)
+}
+
 pub fn print_pos_int<F: PrimeField>(prefix: &str, x: Value<F>, scale_factor: u64) {
   let tmp = convert_pos_int(x);
   let tmp_float = tmp as f64 / scale_factor as f64;
@@ -52,10 +61,10 @@ pub fn print_assigned_arr<F: PrimeField>(
   }
 }
 
-// Get the public values
-pub fn get_public_values<F: PrimeField>() -> Vec<F> {
+// Get the public values computed by the last synthesis of the circuit
+pub fn get_public_values<F: PrimeField>(circuit: &ModelCircuit<F>) -> Vec<F> {
   let mut public_vals = vec![];
-  for val in PUBLIC_VALS.lock().unwrap().iter() {
+  for val in circuit.public_vals.get().iter() {
     let val = F::from_str_vartime(&val.to_str_radix(10));
     public_vals.push(val.unwrap());
   }
@@ -138,3 +147,71 @@ pub fn broadcast<G: Clone>(
     return (tmp2, tmp1);
   }
 }
+
+// Peak resident set size of this process in bytes (Linux only)
+pub fn peak_rss_bytes() -> Option<u64> {
+  let status = std::fs::read_to_string("/proc/self/status").ok()?;
+  let line = status.lines().find(|line| line.starts_with("VmHWM:"))?;
+  let kb: u64 = line.split_whitespace().nth(1)?.parse().ok()?;
+  Some(kb * 1024)
+}
+
+// Current resident set size of this process in bytes (Linux only)
+pub fn rss_bytes() -> Option<u64> {
+  let status = std::fs::read_to_string("/proc/self/status").ok()?;
+  let line = status.lines().find(|line| line.starts_with("VmRSS:"))?;
+  let kb: u64 = line.split_whitespace().nth(1)?.parse().ok()?;
+  Some(kb * 1024)
+}
+
+// Reset the peak RSS counter of the whole process. No-op where unsupported.
+fn reset_peak_rss() {
+  let _ = std::fs::write("/proc/self/clear_refs", "5");
+}
+
+// Proofs measured by a `PeakRssScope` right now, and how many of them ever started
+// while another was running
+static PROOFS_IN_FLIGHT: AtomicUsize = AtomicUsize::new(0);
+static PROOF_OVERLAPS: AtomicU64 = AtomicU64::new(0);
+
+/// Measures the peak RSS of one proof, from `start` until it is dropped.
+///
+/// The peak counter (VmHWM) and its reset belong to the whole process, so a peak can
+/// only be attributed to a proof that ran alone: the counter is reset when a proof
+/// starts with no other in flight, and `peak_rss_bytes` is None if any other proof in
+/// the process overlapped this one (e.g. concurrent proofs of a `ChunkProver` shared
+/// through the Python bindings, or of a `--serve` daemon).
+pub struct PeakRssScope {
+  alone: bool,
+  overlaps: u64,
+}
+
+impl PeakRssScope {
+  pub fn start() -> Self {
+    let overlaps = PROOF_OVERLAPS.load(Ordering::SeqCst);
+    let alone = PROOFS_IN_FLIGHT.fetch_add(1, Ordering::SeqCst) == 0;
+    if alone {
+      reset_peak_rss();
+    } else {
+      // Invalidates the measurement of every proof in flight
+      PROOF_OVERLAPS.fetch_add(1, Ordering::SeqCst);
+    }
+    Self { alone, overlaps }
+  }
+
+  /// Peak RSS since `start` in bytes, or None if another proof overlapped this one (or
+  /// the platform has no peak counter)
+  pub fn peak_rss_bytes(&self) -> Option<u64> {
+    if self.alone && PROOF_OVERLAPS.load(Ordering::SeqCst) == self.overlaps {
+      peak_rss_bytes()
+    } else {
+      None
+    }
+  }
+}
+
+impl Drop for PeakRssScope {
+  fn drop(&mut self) {
+    PROOFS_IN_FLIGHT.fetch_sub(1, Ordering::SeqCst);
+  }
+}
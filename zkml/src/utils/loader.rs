@@ -1,4 +1,4 @@
-use std::{fs::File, io::BufReader};
+use std::{collections::BTreeSet, fs::File, io::BufReader};
 
 use serde_derive::{Deserialize, Serialize};
 
@@ -46,16 +46,82 @@ pub fn load_config_msgpack(config_path: &str) -> ModelMsgpack {
   model
 }
 
-pub fn load_model_msgpack(config_path: &str, inp_path: &str) -> ModelMsgpack {
-  let mut model = load_config_msgpack(config_path);
-  let inp: Vec<TensorMsgpack> = {
-    let file = File::open(inp_path).unwrap();
-    let mut reader = BufReader::new(file);
-    rmp_serde::from_read(&mut reader).unwrap()
-  };
-  for tensor in inp {
-    model.tensors.push(tensor);
+pub fn load_input_msgpack(inp_path: &str) -> Vec<TensorMsgpack> {
+  let file = File::open(inp_path).unwrap();
+  let mut reader = BufReader::new(file);
+  rmp_serde::from_read(&mut reader).unwrap()
+}
+
+// Copy of a model config with only the tensors read by layers [start, end) or committed
+// before the DAG, so a chunk's circuit doesn't hold (or convert) the whole model's weights
+pub fn chunk_model_msgpack(model: &ModelMsgpack, start: usize, end: usize) -> ModelMsgpack {
+  let read: BTreeSet<i64> = model
+    .layers
+    .get(start..end)
+    .unwrap_or(&[])
+    .iter()
+    .flat_map(|layer| layer.inp_idxes.iter().cloned())
+    .chain(model.commit_before.iter().flatten().flatten().cloned())
+    .collect();
+  ModelMsgpack {
+    global_sf: model.global_sf,
+    k: model.k,
+    num_cols: model.num_cols,
+    inp_idxes: model.inp_idxes.clone(),
+    out_idxes: model.out_idxes.clone(),
+    tensors: model
+      .tensors
+      .iter()
+      .filter(|tensor| read.contains(&tensor.idx))
+      .cloned()
+      .collect(),
+    layers: model.layers.clone(),
+    use_selectors: model.use_selectors,
+    commit_before: model.commit_before.clone(),
+    commit_after: model.commit_after.clone(),
+    bits_per_elem: model.bits_per_elem,
+    num_random: model.num_random,
   }
+}
+
+// Combines an already loaded model config with the tensors of an input file, so that
+// callers proving many inputs against the same model only parse the config once
+pub fn attach_input_msgpack(model: ModelMsgpack, inp_path: &str) -> ModelMsgpack {
+  attach_input_tensors(model, load_input_msgpack(inp_path))
+}
+
+// Witness-free stand-ins for the tensors `idxes`: their shapes (from the layers that read
+// or write them) without data, which `generate_from_msgpack(_, false)` fills with zeros
+pub fn placeholder_tensors(model: &ModelMsgpack, idxes: &[i64]) -> Vec<TensorMsgpack> {
+  idxes
+    .iter()
+    .filter_map(|idx| {
+      model.layers.iter().find_map(|layer| {
+        let mut shapes = layer
+          .inp_idxes
+          .iter()
+          .zip(layer.inp_shapes.iter())
+          .chain(layer.out_idxes.iter().zip(layer.out_shapes.iter()));
+        let (_, shape) = shapes.find(|(tensor_idx, _)| *tensor_idx == idx)?;
+        Some(TensorMsgpack {
+          idx: *idx,
+          shape: shape.clone(),
+          data: vec![],
+        })
+      })
+    })
+    .collect()
+}
+
+// Witness-free stand-ins for the model inputs (see `placeholder_tensors`). Gives the
+// circuit layout, e.g. for keygen, without an input file.
+pub fn attach_input_shapes(model: ModelMsgpack) -> ModelMsgpack {
+  let placeholders = placeholder_tensors(&model, &model.inp_idxes);
+  attach_input_tensors(model, placeholders)
+}
+
+pub fn attach_input_tensors(mut model: ModelMsgpack, tensors: Vec<TensorMsgpack>) -> ModelMsgpack {
+  model.tensors.extend(tensors);
 
   // Default to using selectors, commit if use_selectors is not specified
   if model.use_selectors.is_none() {
@@ -76,3 +142,12 @@ pub fn load_model_msgpack(config_path: &str, inp_path: &str) -> ModelMsgpack {
 
   model
 }
+
+pub fn load_model_msgpack(config_path: &str, inp_path: &str) -> ModelMsgpack {
+  attach_input_msgpack(load_config_msgpack(config_path), inp_path)
+}
+
+// Encodes tensors in the input file format, e.g. a chunk boundary for the next chunk
+pub fn encode_input_msgpack(tensors: &Vec<TensorMsgpack>) -> Vec<u8> {
+  rmp_serde::encode::to_vec_named(tensors).unwrap()
+}
@@ -6,7 +6,6 @@ use std::{
 };
 
 use halo2_proofs::{
-  dev::MockProver,
   halo2curves::pasta::{EqAffine, Fp},
   plonk::{create_proof, keygen_pk, keygen_vk, verify_proof},
   poly::{
@@ -23,7 +22,10 @@ use halo2_proofs::{
   },
 };
 
-use crate::{model::ModelCircuit, utils::helpers::get_public_values};
+use crate::{
+  model::ModelCircuit,
+  utils::{helpers::get_public_values, witness::synthesize_witness},
+};
 
 pub fn get_ipa_params(params_dir: &str, degree: u32) -> ParamsIPA<EqAffine> {
   let path = format!("{}/{}.params", params_dir, degree);
@@ -77,8 +79,8 @@ pub fn time_circuit_ipa(circuit: ModelCircuit<Fp>) {
   drop(empty_circuit);
 
   let fill_duration = start.elapsed();
-  let _prover = MockProver::run(degree, &proof_circuit, vec![vec![]]).unwrap();
-  let public_vals = get_public_values();
+  synthesize_witness(&proof_circuit, degree).unwrap();
+  let public_vals = get_public_values(&proof_circuit);
   println!(
     "Time elapsed in filling circuit: {:?}",
     fill_duration - pk_duration
@@ -1,48 +1,412 @@
 use std::{
-  fs::File,
-  io::{BufReader, Write},
-  path::Path,
-  time::Instant,
+  collections::HashMap,
+  fs::{self, File, OpenOptions},
+  io::{self, BufReader, BufWriter, Write},
+  path::{Path, PathBuf},
+  sync::mpsc,
+  thread,
+  time::{Duration, Instant, SystemTime, UNIX_EPOCH},
 };
 
 use halo2_proofs::{
   dev::MockProver,
-  halo2curves::bn256::{Bn256, Fr, G1Affine},
-  plonk::{create_proof, keygen_pk, keygen_vk, verify_proof, VerifyingKey},
+  halo2curves::{
+    bn256::{Bn256, Fr, G1Affine},
+    ff::Field,
+  },
+  plonk::{
+    create_proof, keygen_pk, keygen_vk, verify_proof, Circuit, Error, ProvingKey, VerifyingKey,
+  },
   poly::{
     commitment::Params,
     kzg::{
       commitment::{KZGCommitmentScheme, ParamsKZG},
       multiopen::{ProverSHPLONK, VerifierSHPLONK},
-      strategy::SingleStrategy,
+      strategy::{AccumulatorStrategy, SingleStrategy},
     },
+    VerificationStrategy,
   },
   transcript::{
     Blake2bRead, Blake2bWrite, Challenge255, TranscriptReadBuffer, TranscriptWriterBuffer,
   },
   SerdeFormat,
 };
+use memmap2::Mmap;
+use rayon::prelude::*;
 
-use crate::{model::ModelCircuit, utils::helpers::get_public_values};
+use crate::{
+  model::ModelCircuit,
+  utils::{
+    helpers::{get_public_values, peak_rss_bytes, rss_bytes, PeakRssScope},
+    loader::{
+      attach_input_tensors, chunk_model_msgpack, load_config_msgpack, load_input_msgpack,
+      placeholder_tensors, ModelMsgpack, TensorMsgpack,
+    },
+    srs::{load_params, open_or_create_master},
+    witness::{min_k_for_rows, synthesize_witness, synthesize_witness_checked},
+  },
+};
 
+/// KZG params for `degree`, derived from the node's master SRS (see `utils::srs`)
 pub fn get_kzg_params(params_dir: &str, degree: u32) -> ParamsKZG<Bn256> {
-  let rng = rand::thread_rng();
-  let path = format!("{}/{}.params", params_dir, degree);
-  let params_path = Path::new(&path);
-  if File::open(&params_path).is_err() {
-    let params = ParamsKZG::<Bn256>::setup(degree, rng);
-    let mut buf = Vec::new();
-
-    params.write(&mut buf).expect("Failed to write params");
-    let mut file = File::create(&params_path).expect("Failed to create params file");
-    file
-      .write_all(&buf[..])
-      .expect("Failed to write params to file");
+  load_params(params_dir, degree).expect("Failed to load KZG params")
+}
+
+/// Hash of everything that determines a chunk circuit's proving and verifying keys.
+///
+/// Covers the layer configs, tensor layout (indices and shapes, not values), the chunk
+/// range, Merkle settings, k, the gadget configuration and the KZG setup, so keys are
+/// never reused across circuits or params that would produce different keys.
+pub fn circuit_shape_hash(circuit: &ModelCircuit<Fr>, params: &ParamsKZG<Bn256>) -> String {
+  let gadget_config = &circuit.gadget_config;
+  let tensor_shapes: Vec<(i64, &[usize])> = circuit
+    .tensors
+    .iter()
+    .map(|(idx, tensor)| (*idx, tensor.shape()))
+    .collect();
+
+  let shape = format!(
+    "v1|{:?}|{:?}|{:?}|{:?}|{:?}|{}|{}|{:?}|{}|{:?}|{:?}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{:?}",
+    circuit.dag_config,
+    tensor_shapes,
+    circuit.used_gadgets,
+    circuit.commit_before,
+    circuit.commit_after,
+    circuit.k,
+    circuit.bits_per_elem,
+    circuit.inp_idxes,
+    circuit.num_random,
+    circuit.chunk_start,
+    circuit.chunk_end,
+    circuit.use_merkle,
+    circuit.prev_merkle_root.is_some(),
+    gadget_config.num_cols,
+    gadget_config.scale_factor,
+    gadget_config.shift_min_val,
+    gadget_config.min_val,
+    gadget_config.max_val,
+    gadget_config.div_outp_min_val,
+    gadget_config.num_rows,
+    gadget_config.eta,
+    gadget_config.use_selectors,
+    gadget_config.num_bits_per_elem,
+    params.s_g2(),
+  );
+
+  blake2b_simd::Params::new()
+    .hash_length(32)
+    .hash(shape.as_bytes())
+    .to_hex()
+    .to_string()
+}
+
+/// Circuit of chunk `[chunk_start, chunk_end)` of `model` for the input `tensors` (the
+/// model inputs, or the previous chunk's boundary), over `num_cols` advice columns
+/// (default: the model's)
+///
+/// The circuit only holds the weights of the chunk's own layers. With
+/// `panic_empty_tensor` off, tensors without data (see `placeholder_tensors`) are zeros.
+pub fn chunk_circuit(
+  model: &ModelMsgpack,
+  tensors: Vec<TensorMsgpack>,
+  chunk_start: usize,
+  chunk_end: usize,
+  use_merkle: bool,
+  prev_merkle_root: Option<Fr>,
+  num_cols: Option<usize>,
+  panic_empty_tensor: bool,
+) -> ModelCircuit<Fr> {
+  let config = chunk_model_msgpack(model, chunk_start, chunk_end);
+  let commit_out_idxes = config
+    .layers
+    .get(chunk_end.saturating_sub(1))
+    .map(|layer| layer.out_idxes.clone())
+    .unwrap_or_default();
+
+  let config = attach_input_tensors(config, tensors);
+  let mut circuit = ModelCircuit::<Fr>::generate_from_msgpack(config, panic_empty_tensor);
+
+  // If using Merkle, ensure Poseidon hasher is configured
+  if use_merkle && circuit.commit_after.is_empty() && circuit.commit_before.is_empty() {
+    // Set commit_after to enable Poseidon hasher
+    if !commit_out_idxes.is_empty() {
+      circuit.commit_after = vec![commit_out_idxes];
+    }
   }
 
-  let mut params_fs = File::open(&params_path).expect("couldn't load params");
-  let params = ParamsKZG::<Bn256>::read(&mut params_fs).expect("Failed to read params");
-  params
+  // Configure for chunk execution
+  circuit.set_chunk_config(chunk_start, chunk_end, use_merkle);
+  if let Some(num_cols) = num_cols {
+    circuit.set_num_cols(num_cols);
+  }
+
+  // Set previous Merkle root for chained verification (if provided)
+  if let Some(prev_root) = prev_merkle_root {
+    circuit.set_prev_merkle_root(prev_root);
+  }
+
+  circuit
+}
+
+/// The verifying key of every proof of chunk `[chunk_start, chunk_end)` made with
+/// `params`, rebuilt from the model config
+///
+/// The key depends on the chunk's layers, the shapes of its tensors, k and the prover
+/// options, but not on any tensor values: inputs and weights are advice. So it is
+/// generated with zeros in place of the chunk's input, whose tensors are the model's
+/// `boundary_idxes(chunk_start)`. A proof checked against this key, rather than a key
+/// shipped with the proof, is a proof of this chunk of this model.
+pub fn chunk_vk(
+  params: &ParamsKZG<Bn256>,
+  model: &ModelMsgpack,
+  input_idxes: &[i64],
+  chunk_start: usize,
+  chunk_end: usize,
+  use_merkle: bool,
+  has_prev_root: bool,
+  num_cols: Option<usize>,
+) -> Result<VerifyingKey<G1Affine>, Error> {
+  let mut circuit = chunk_circuit(
+    model,
+    placeholder_tensors(model, input_idxes),
+    chunk_start,
+    chunk_end,
+    use_merkle,
+    has_prev_root.then_some(Fr::ZERO),
+    num_cols,
+    false,
+  );
+  circuit.set_k(params.k() as usize);
+  keygen_vk(params, &circuit)
+}
+
+/// Path of the cached proving key for `circuit` under `params_dir`
+pub fn key_cache_path(
+  params_dir: &str,
+  circuit: &ModelCircuit<Fr>,
+  params: &ParamsKZG<Bn256>,
+) -> PathBuf {
+  Path::new(params_dir)
+    .join("keys")
+    .join(format!("{}.pk", circuit_shape_hash(circuit, params)))
+}
+
+/// A proving key and how long it took to obtain
+pub struct LoadedKey {
+  pub pk: ProvingKey<G1Affine>,
+  /// Time spent in keygen_vk (0 if loaded from the key cache)
+  pub keygen_vk_time_ms: u128,
+  /// Time spent in keygen_pk (0 if loaded from the key cache)
+  pub keygen_pk_time_ms: u128,
+  /// Time spent reading the key from the key cache (0 if generated)
+  pub key_load_time_ms: u128,
+}
+
+/// Load the proving key for `circuit` from the on-disk key cache under `params_dir`, or
+/// generate it and store it there for later runs.
+///
+/// Processes sharing `params_dir` (e.g. all actors on a node) generate each key once:
+/// keygen holds the lock file `{key}.lock`, and processes waiting on it load the key the
+/// holder stored. The verifying key is stored next to it as `{key}.vk`.
+pub fn get_or_create_pk(
+  params_dir: &str,
+  params: &ParamsKZG<Bn256>,
+  circuit: &ModelCircuit<Fr>,
+) -> LoadedKey {
+  let key_path = key_cache_path(params_dir, circuit, params);
+
+  let load_start = Instant::now();
+  if let Some(pk) = read_cached_pk(&key_path, circuit) {
+    return LoadedKey {
+      pk,
+      keygen_vk_time_ms: 0,
+      keygen_pk_time_ms: 0,
+      key_load_time_ms: load_start.elapsed().as_millis(),
+    };
+  }
+
+  // Held until the key is stored; without a lock, keygen still works, just not once
+  let _lock = lock_key(&key_path);
+  if let Some(pk) = read_cached_pk(&key_path, circuit) {
+    return LoadedKey {
+      pk,
+      keygen_vk_time_ms: 0,
+      keygen_pk_time_ms: 0,
+      key_load_time_ms: load_start.elapsed().as_millis(),
+    };
+  }
+
+  let vk_start = Instant::now();
+  let vk = keygen_vk(params, circuit).unwrap();
+  let keygen_vk_time_ms = vk_start.elapsed().as_millis();
+  let pk_start = Instant::now();
+  let pk = keygen_pk(params, vk, circuit).unwrap();
+  let keygen_pk_time_ms = pk_start.elapsed().as_millis();
+
+  // Write to a temp file and rename, so concurrent provers never read a partial key
+  if let Err(e) = store_pk(&key_path, &pk) {
+    eprintln!("Failed to cache proving key at {:?}: {}", key_path, e);
+  }
+
+  LoadedKey {
+    pk,
+    keygen_vk_time_ms,
+    keygen_pk_time_ms,
+    key_load_time_ms: 0,
+  }
+}
+
+fn read_cached_pk(key_path: &Path, circuit: &ModelCircuit<Fr>) -> Option<ProvingKey<G1Affine>> {
+  let file = File::open(key_path).ok()?;
+  // Keys are only renamed into place once fully written and never modified, so the
+  // mapping can't change under us. Reading from the page cache shares the file's pages
+  // between the processes loading it.
+  let mmap = unsafe { Mmap::map(&file) }.ok()?;
+  match ProvingKey::read::<_, ModelCircuit<Fr>>(
+    &mut &mmap[..],
+    SerdeFormat::RawBytes,
+    circuit.params(),
+  ) {
+    Ok(pk) => Some(pk),
+    Err(e) => {
+      eprintln!("Ignoring unreadable cached key {:?}: {}", key_path, e);
+      None
+    }
+  }
+}
+
+// A key lock not refreshed for this long is stale: its holder died (or hangs) during
+// keygen. Holders refresh their lock every KEY_LOCK_HEARTBEAT.
+const KEY_LOCK_STALE_AFTER: Duration = Duration::from_secs(60);
+const KEY_LOCK_HEARTBEAT: Duration = Duration::from_secs(10);
+
+// "<hostname> <pid>", identifying a lock holder across the nodes sharing a key cache
+fn lock_owner() -> String {
+  let hostname = fs::read_to_string("/proc/sys/kernel/hostname")
+    .ok()
+    .or_else(|| std::env::var("HOSTNAME").ok())
+    .unwrap_or_else(|| "unknown".to_string());
+  format!("{} {}", hostname.trim(), std::process::id())
+}
+
+fn unix_time_secs() -> u64 {
+  SystemTime::now()
+    .duration_since(UNIX_EPOCH)
+    .map_or(0, |time| time.as_secs())
+}
+
+// Write "<hostname> <pid> <unix time>" to the lock file
+fn write_lock(lock_path: &Path, owner: &str) -> io::Result<()> {
+  fs::write(lock_path, format!("{} {}", owner, unix_time_secs()))
+}
+
+// How long ago the lock at `lock_path` was last refreshed, by the timestamp its holder
+// wrote, or its mtime while the holder is still writing it
+fn lock_age(lock_path: &Path) -> Option<Duration> {
+  let written = fs::read_to_string(lock_path)
+    .ok()
+    .and_then(|lock| lock.split_whitespace().nth(2)?.parse::<u64>().ok());
+  match written {
+    Some(secs) => Some(Duration::from_secs(unix_time_secs().saturating_sub(secs))),
+    None => fs::metadata(lock_path).ok()?.modified().ok()?.elapsed().ok(),
+  }
+}
+
+// Keygen lock for one key across the processes sharing a key cache. A heartbeat thread
+// refreshes its timestamp while it is held; removed on drop.
+struct KeyLock {
+  path: PathBuf,
+  owner: String,
+  // Dropping it stops the heartbeat
+  stop: Option<mpsc::Sender<()>>,
+  heartbeat: Option<thread::JoinHandle<()>>,
+}
+
+impl KeyLock {
+  fn new(path: PathBuf, owner: String) -> Self {
+    let (stop, stopped) = mpsc::channel::<()>();
+    let heartbeat = {
+      let (path, owner) = (path.clone(), owner.clone());
+      thread::spawn(move || {
+        while let Err(mpsc::RecvTimeoutError::Timeout) = stopped.recv_timeout(KEY_LOCK_HEARTBEAT) {
+          write_lock(&path, &owner).ok();
+        }
+      })
+    };
+    Self {
+      path,
+      owner,
+      stop: Some(stop),
+      heartbeat: Some(heartbeat),
+    }
+  }
+}
+
+impl Drop for KeyLock {
+  fn drop(&mut self) {
+    drop(self.stop.take());
+    if let Some(heartbeat) = self.heartbeat.take() {
+      heartbeat.join().ok();
+    }
+    // Unless a waiter took the lock over in the meantime
+    let owner = format!("{} ", self.owner);
+    let held = fs::read_to_string(&self.path).map_or(false, |lock| lock.starts_with(&owner));
+    if held {
+      fs::remove_file(&self.path).ok();
+    }
+  }
+}
+
+// Take the keygen lock for `key_path`, waiting while another process holds it. The lock
+// records its holder's hostname, pid and a timestamp the holder refreshes, so a lock
+// that has not been refreshed for KEY_LOCK_STALE_AFTER is taken over whichever node or
+// PID namespace it came from. Returns None once the key has been stored by someone else
+// (or if locking fails).
+fn lock_key(key_path: &Path) -> Option<KeyLock> {
+  let lock_path = key_path.with_extension("lock");
+  fs::create_dir_all(key_path.parent()?).ok()?;
+  let owner = lock_owner();
+  loop {
+    match OpenOptions::new().write(true).create_new(true).open(&lock_path) {
+      Ok(mut file) => {
+        write!(file, "{} {}", owner, unix_time_secs()).ok();
+        return Some(KeyLock::new(lock_path, owner));
+      }
+      Err(e) if e.kind() == io::ErrorKind::AlreadyExists => {
+        if key_path.exists() {
+          return None;
+        }
+        // At worst two processes then generate the same key, which is stored atomically
+        // either way
+        if lock_age(&lock_path).map_or(false, |age| age > KEY_LOCK_STALE_AFTER) {
+          eprintln!(
+            "Taking over stale key lock {:?} ({})",
+            lock_path,
+            fs::read_to_string(&lock_path).unwrap_or_default().trim()
+          );
+          fs::remove_file(&lock_path).ok();
+          continue;
+        }
+        thread::sleep(Duration::from_millis(200));
+      }
+      Err(_) => return None,
+    }
+  }
+}
+
+fn store_pk(key_path: &Path, pk: &ProvingKey<G1Affine>) -> std::io::Result<()> {
+  fs::create_dir_all(key_path.parent().unwrap())?;
+  let vk_path = key_path.with_extension("vk");
+  let tmp_path = vk_path.with_extension(format!("vk.tmp{}", std::process::id()));
+  fs::write(&tmp_path, pk.get_vk().to_bytes(SerdeFormat::RawBytes))?;
+  fs::rename(&tmp_path, &vk_path)?;
+
+  let tmp_path = key_path.with_extension(format!("pk.tmp{}", std::process::id()));
+  let mut writer = BufWriter::new(File::create(&tmp_path)?);
+  pk.write(&mut writer, SerdeFormat::RawBytes)?;
+  writer.flush()?;
+  drop(writer);
+  fs::rename(&tmp_path, key_path)
 }
 
 pub fn serialize(data: &Vec<u8>, path: &str) -> u64 {
@@ -84,34 +448,29 @@ pub fn time_circuit_kzg(circuit: ModelCircuit<Fr>) {
     circuit_duration
   );
 
-  let vk_circuit = circuit.clone();
-  let vk = keygen_vk(&params, &vk_circuit).unwrap();
-  drop(vk_circuit);
-  let vk_duration = start.elapsed();
-  println!(
-    "Time elapsed in generating vkey: {:?}",
-    vk_duration - circuit_duration
-  );
+  let loaded = get_or_create_pk("./params_kzg", &params, &circuit);
+  let pk = loaded.pk;
+  let pk_duration = start.elapsed();
+  if loaded.key_load_time_ms > 0 {
+    println!(
+      "Time elapsed in loading cached keys: {:?}",
+      pk_duration - circuit_duration
+    );
+  } else {
+    println!("Time elapsed in generating vkey: {}ms", loaded.keygen_vk_time_ms);
+    println!("Time elapsed in generating pkey: {}ms", loaded.keygen_pk_time_ms);
+  }
 
-  let vkey_size = serialize(&vk.to_bytes(SerdeFormat::RawBytes), "vkey");
+  let vkey_size = serialize(&pk.get_vk().to_bytes(SerdeFormat::RawBytes), "vkey");
   println!("vkey size: {} bytes", vkey_size);
 
-  let pk_circuit = circuit.clone();
-  let pk = keygen_pk(&params, vk, &pk_circuit).unwrap();
-  let pk_duration = start.elapsed();
-  println!(
-    "Time elapsed in generating pkey: {:?}",
-    pk_duration - vk_duration
-  );
-  drop(pk_circuit);
-
   let pkey_size = serialize(&pk.to_bytes(SerdeFormat::RawBytes), "pkey");
   println!("pkey size: {} bytes", pkey_size);
 
   let fill_duration = start.elapsed();
   let proof_circuit = circuit.clone();
-  let _prover = MockProver::run(degree, &proof_circuit, vec![vec![]]).unwrap();
-  let public_vals = get_public_values();
+  synthesize_witness(&proof_circuit, degree).unwrap();
+  let public_vals = get_public_values(&proof_circuit);
   println!(
     "Time elapsed in filling circuit: {:?}",
     fill_duration - pk_duration
@@ -180,13 +539,629 @@ pub struct ChunkProofResult {
   pub proving_time_ms: u128,
   /// Verification time in milliseconds
   pub verify_time_ms: u128,
+  /// Config/input loading and circuit construction time in milliseconds
+  pub load_time_ms: u128,
+  /// KZG params loading (or generation) time in milliseconds
+  pub params_time_ms: u128,
+  /// Verifying key generation time in milliseconds (0 if the key was cached)
+  pub keygen_vk_time_ms: u128,
+  /// Proving key generation time in milliseconds (0 if the key was cached)
+  pub keygen_pk_time_ms: u128,
+  /// Time reading keys from the on-disk key cache in milliseconds (0 if not read)
+  pub key_load_time_ms: u128,
+  /// Witness passes that pick k and compute the public values, in milliseconds
+  pub witness_time_ms: u128,
+  /// Circuit degree (the circuit has 2^k rows)
+  pub k: u32,
+  /// Rows assigned in the circuit's advice columns
+  pub rows_used: usize,
+  /// Peak resident set size while proving, in bytes (None if unavailable, or if another
+  /// proof ran in the same process meanwhile; see `PeakRssScope`)
+  pub peak_rss_bytes: Option<u64>,
+  /// Serialized verifying key, set when verification is deferred (see `set_verify`)
+  pub vk: Option<Vec<u8>>,
+  /// Tensors live after the chunk (see `ModelCircuit::boundary_idxes`). Passed as the
+  /// input of the chunk starting at `chunk_end`, they replace the model input.
+  pub boundary: Vec<TensorMsgpack>,
+}
+
+/// Public values and boundary of one input of a multi-input proof
+pub struct InstanceResult {
+  /// Public values including Merkle root (if use_merkle=true)
+  pub public_vals: Vec<Fr>,
+  /// The Merkle root (last public value if use_merkle=true)
+  pub merkle_root: Option<Fr>,
+  /// Tensors live after the chunk, see `ChunkProofResult::boundary`
+  pub boundary: Vec<TensorMsgpack>,
+}
+
+/// Result of proving several inputs of a chunk in one proof (see `prove_multi`)
+///
+/// Timings, k and rows cover the whole proof; `rows_used` is the largest of the inputs.
+pub struct MultiProofResult {
+  /// The serialized proof bytes, covering one instance per input
+  pub proof: Vec<u8>,
+  /// One entry per input, in input order
+  pub instances: Vec<InstanceResult>,
+  pub proving_time_ms: u128,
+  pub verify_time_ms: u128,
+  pub load_time_ms: u128,
+  pub params_time_ms: u128,
+  pub keygen_vk_time_ms: u128,
+  pub keygen_pk_time_ms: u128,
+  pub key_load_time_ms: u128,
+  pub witness_time_ms: u128,
+  pub k: u32,
+  pub rows_used: usize,
+  pub peak_rss_bytes: Option<u64>,
+  pub vk: Option<Vec<u8>>,
+}
+
+impl MultiProofResult {
+  /// The result of a proof for a single input
+  pub fn into_single(mut self) -> ChunkProofResult {
+    assert_eq!(self.instances.len(), 1, "proof covers more than one input");
+    let instance = self.instances.pop().unwrap();
+    ChunkProofResult {
+      proof: self.proof,
+      public_vals: instance.public_vals,
+      merkle_root: instance.merkle_root,
+      proving_time_ms: self.proving_time_ms,
+      verify_time_ms: self.verify_time_ms,
+      load_time_ms: self.load_time_ms,
+      params_time_ms: self.params_time_ms,
+      keygen_vk_time_ms: self.keygen_vk_time_ms,
+      keygen_pk_time_ms: self.keygen_pk_time_ms,
+      key_load_time_ms: self.key_load_time_ms,
+      witness_time_ms: self.witness_time_ms,
+      k: self.k,
+      rows_used: self.rows_used,
+      peak_rss_bytes: self.peak_rss_bytes,
+      vk: self.vk,
+      boundary: instance.boundary,
+    }
+  }
+}
+
+/// Time spent setting up a chunk's proof, in milliseconds (see `MultiProofResult`)
+#[derive(Clone, Debug, Default)]
+pub struct SetupTimings {
+  pub load_time_ms: u128,
+  pub params_time_ms: u128,
+  pub keygen_vk_time_ms: u128,
+  pub keygen_pk_time_ms: u128,
+  pub key_load_time_ms: u128,
+  pub witness_time_ms: u128,
+}
+
+/// Result of `ChunkProver::warmup`
+pub struct WarmupResult {
+  /// Circuit degree picked for the warmup input
+  pub k: u32,
+  pub rows_used: usize,
+  pub timings: SetupTimings,
+}
+
+/// What a `ChunkProver` keeps resident (see `ChunkProver::memory_report`)
+pub struct ProverMemory {
+  /// Number of model configs held
+  pub configs: usize,
+  /// k of every params set held
+  pub params_ks: Vec<u32>,
+  /// Number of proving keys held
+  pub proving_keys: usize,
+  /// Resident set size of the process in bytes (None if unavailable)
+  pub rss_bytes: Option<u64>,
+  /// Peak resident set size of the process, in bytes, since the last proof that started
+  /// with no other proof in flight
+  pub peak_rss_bytes: Option<u64>,
+}
+
+// Circuits of one proof, with the params and proving key for their k loaded
+struct PreparedChunk {
+  circuits: Vec<ModelCircuit<Fr>>,
+  key_id: ChunkKeyId,
+  public_vals: Vec<Vec<Fr>>,
+  boundaries: Vec<Vec<TensorMsgpack>>,
+  rows_used: usize,
+  timings: SetupTimings,
+}
+
+/// Identifies a chunk circuit whose proving key can be reused across inputs.
+///
+/// The key depends on the circuit structure only: the model config, the layer range,
+/// whether the Merkle root is computed, whether a previous root is bound as a public
+/// input, the column count and k. Input values only affect advice values, but which tensors are given does
+/// change the circuit: a chunk proven from a boundary file assigns different tensors
+/// than one proven from the model input.
+#[derive(Clone, Debug, Hash, PartialEq, Eq)]
+struct ChunkKeyId {
+  config_path: String,
+  chunk_start: usize,
+  chunk_end: usize,
+  use_merkle: bool,
+  has_prev_root: bool,
+  tensor_idxes: Vec<i64>,
+  num_cols: Option<usize>,
+  k: u32,
+}
+
+/// Chunk prover that keeps model configs, KZG params and proving keys resident
+/// between proofs.
+///
+/// `prove_chunk_kzg` pays for loading the config, reading the params and running
+/// `keygen_vk`/`keygen_pk` on every call. A long-lived `ChunkProver` (e.g. the
+/// `prove_chunk --serve` daemon) only pays for them the first time a chunk shape is seen.
+pub struct ChunkProver {
+  params_dir: String,
+  configs: HashMap<String, ModelMsgpack>,
+  params: HashMap<u32, ParamsKZG<Bn256>>,
+  proving_keys: HashMap<ChunkKeyId, ProvingKey<G1Affine>>,
+  // Smallest k that fits each chunk shape's rows, by its key at the model's k
+  row_ks: HashMap<ChunkKeyId, u32>,
+  verify: bool,
+  key_cache: bool,
+  check: bool,
+  k: Option<u32>,
+  num_cols: Option<usize>,
+  low_memory: bool,
+}
+
+impl ChunkProver {
+  pub fn new(params_dir: &str) -> Self {
+    Self {
+      params_dir: params_dir.to_string(),
+      configs: HashMap::new(),
+      params: HashMap::new(),
+      proving_keys: HashMap::new(),
+      row_ks: HashMap::new(),
+      verify: true,
+      key_cache: true,
+      check: false,
+      k: None,
+      num_cols: None,
+      low_memory: false,
+    }
+  }
+
+  /// Keep nothing resident between proofs (default: false).
+  ///
+  /// The model config is read for every proof and dropped once the circuit is built,
+  /// and params and proving keys are dropped after each proof (keys are still read from
+  /// the on-disk key cache). Trades warm-start time for a smaller footprint, so more
+  /// provers fit on a node.
+  pub fn set_low_memory(&mut self, low_memory: bool) {
+    self.low_memory = low_memory;
+  }
+
+  /// Prove every chunk with 2^k rows instead of picking k per chunk (default: None).
+  ///
+  /// By default each chunk gets the smallest k, up to the model's k, that has room for
+  /// its rows and whose lookup tables hold every value its lookups read, including
+  /// values inside a layer such as the pre-activations of a fused ReLU (see
+  /// `synthesize_witness_checked`).
+  pub fn set_k(&mut self, k: Option<u32>) {
+    self.k = k;
+  }
+
+  /// Lay chunks out over this many advice columns instead of the model's `num_cols`.
+  ///
+  /// More columns mean fewer rows, so possibly a smaller k, but a wider circuit.
+  pub fn set_num_cols(&mut self, num_cols: Option<usize>) {
+    self.num_cols = num_cols;
+  }
+
+  /// Whether to load/store proving keys in `{params_dir}/keys` (default: true).
+  ///
+  /// Keys are cached in memory either way; the on-disk cache lets later processes skip
+  /// keygen for circuit shapes that were seen before.
+  pub fn set_key_cache(&mut self, key_cache: bool) {
+    self.key_cache = key_cache;
+  }
+
+  /// Whether to verify each proof right after creating it (default: true).
+  ///
+  /// With verification off, the serialized verifying key is returned with every proof
+  /// so the proofs can be checked later, e.g. in batches with `batch_verify_kzg`.
+  pub fn set_verify(&mut self, verify: bool) {
+    self.verify = verify;
+  }
+
+  /// Whether to check every circuit with `MockProver` before proving (default: false).
+  ///
+  /// Debug aid: reports which constraint fails instead of producing a proof that does
+  /// not verify, at the cost of building the full constraint tables in memory.
+  pub fn set_check(&mut self, check: bool) {
+    self.check = check;
+  }
+
+  fn config(&mut self, config_path: &str) -> &ModelMsgpack {
+    self
+      .configs
+      .entry(config_path.to_string())
+      .or_insert_with(|| load_config_msgpack(config_path))
+  }
+
+  /// Build the circuit for one input of a chunk, reusing the cached model config
+  ///
+  /// The circuit only holds the weights of the chunk's own layers.
+  ///
+  /// For `chunk_start > 0`, `input_path` is the previous chunk's boundary (the tensors
+  /// of its `ChunkProofResult::boundary`), so earlier layers are not recomputed.
+  pub fn build_circuit(
+    &mut self,
+    config_path: &str,
+    input_path: &str,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_merkle_root: Option<Fr>,
+  ) -> ModelCircuit<Fr> {
+    let tensors = load_input_msgpack(input_path);
+    let num_cols = self.num_cols;
+    let loaded;
+    let model = if self.low_memory {
+      loaded = load_config_msgpack(config_path);
+      &loaded
+    } else {
+      self.config(config_path)
+    };
+    chunk_circuit(
+      model,
+      tensors,
+      chunk_start,
+      chunk_end,
+      use_merkle,
+      prev_merkle_root,
+      num_cols,
+      true,
+    )
+  }
+
+  /// Generate a KZG proof for a chunk of the model
+  ///
+  /// Same as `prove_chunk_kzg`, but the model config, params and proving key are kept
+  /// for subsequent calls.
+  pub fn prove(
+    &mut self,
+    config_path: &str,
+    input_path: &str,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_merkle_root: Option<Fr>,
+  ) -> ChunkProofResult {
+    self
+      .prove_multi(
+        config_path,
+        &[(input_path, prev_merkle_root)],
+        chunk_start,
+        chunk_end,
+        use_merkle,
+      )
+      .into_single()
+  }
+
+  /// Load everything a chunk's proofs need, without proving
+  ///
+  /// Reads the model config, picks k for `input_path` and loads (or generates) the
+  /// params and proving key, so the first `prove` of this chunk shape only pays for the
+  /// proof itself. k depends on the input's values (see `set_k`), so use a
+  /// representative input. A no-op for the params and key with `set_low_memory`,
+  /// except that the key is written to the on-disk key cache.
+  pub fn warmup(
+    &mut self,
+    config_path: &str,
+    input_path: &str,
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+    prev_merkle_root: Option<Fr>,
+  ) -> WarmupResult {
+    let prepared = self.prepare(
+      config_path,
+      &[(input_path, prev_merkle_root)],
+      chunk_start,
+      chunk_end,
+      use_merkle,
+    );
+    if self.low_memory {
+      self.params.clear();
+      self.proving_keys.clear();
+    }
+    WarmupResult {
+      k: prepared.key_id.k,
+      rows_used: prepared.rows_used,
+      timings: prepared.timings,
+    }
+  }
+
+  /// What the prover keeps resident, and the process's memory use
+  pub fn memory_report(&self) -> ProverMemory {
+    let mut params_ks: Vec<u32> = self.params.keys().cloned().collect();
+    params_ks.sort();
+    ProverMemory {
+      configs: self.configs.len(),
+      params_ks,
+      proving_keys: self.proving_keys.len(),
+      rss_bytes: rss_bytes(),
+      peak_rss_bytes: peak_rss_bytes(),
+    }
+  }
+
+  // Build the circuits of `inputs`, pick k and make sure the params and proving key for
+  // it are loaded
+  fn prepare(
+    &mut self,
+    config_path: &str,
+    inputs: &[(&str, Option<Fr>)],
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+  ) -> PreparedChunk {
+    let load_start = Instant::now();
+    let mut circuits: Vec<ModelCircuit<Fr>> = inputs
+      .iter()
+      .map(|(input_path, prev_merkle_root)| {
+        self.build_circuit(
+          config_path,
+          input_path,
+          chunk_start,
+          chunk_end,
+          use_merkle,
+          *prev_merkle_root,
+        )
+      })
+      .collect();
+    let load_time_ms = load_start.elapsed().as_millis();
+
+    let mut key_id = ChunkKeyId {
+      config_path: config_path.to_string(),
+      chunk_start,
+      chunk_end,
+      use_merkle,
+      has_prev_root: inputs[0].1.is_some(),
+      tensor_idxes: circuits[0].tensors.keys().cloned().collect(),
+      num_cols: self.num_cols,
+      k: circuits[0].k as u32,
+    };
+    for (circuit, (input_path, prev_merkle_root)) in circuits.iter().zip(inputs) {
+      assert!(
+        circuit.tensors.keys().eq(key_id.tensor_idxes.iter())
+          && prev_merkle_root.is_some() == key_id.has_prev_root,
+        "Input {} does not share the circuit of the other inputs",
+        input_path
+      );
+    }
+
+    // Pick k, then run the witness-only pass that computes the public values
+    let witness_start = Instant::now();
+    let model_k = key_id.k;
+    let mut degree = match self.k {
+      Some(k) => k,
+      None => {
+        let rows_k = *self
+          .row_ks
+          .entry(key_id.clone())
+          .or_insert_with(|| min_k_for_rows(&circuits[0]).unwrap());
+        rows_k.min(model_k)
+      }
+    };
+    for circuit in circuits.iter_mut() {
+      circuit.set_k(degree as usize);
+    }
+    let rows_used = loop {
+      // Below the model's k the lookup tables are smaller than the model was built for,
+      // so check that they still hold every lookup input; raise k until they do
+      let check = self.k.is_none() && degree < model_k;
+      let rows = circuits
+        .iter()
+        .map(|circuit| {
+          if check {
+            synthesize_witness_checked(circuit, degree)
+          } else {
+            synthesize_witness(circuit, degree)
+          }
+        })
+        .collect::<Result<Vec<_>, _>>();
+      match rows {
+        Ok(rows) => break rows.into_iter().max().unwrap(),
+        Err(Error::NotEnoughRowsAvailable { .. } | Error::ConstraintSystemFailure) if check => {
+          degree += 1;
+          for circuit in circuits.iter_mut() {
+            circuit.set_k(degree as usize);
+          }
+        }
+        Err(e) => panic!("Witness synthesis failed with k={}: {:?}", degree, e),
+      }
+    };
+    let public_vals: Vec<Vec<Fr>> = circuits.iter().map(get_public_values).collect();
+    let boundaries: Vec<Vec<TensorMsgpack>> =
+      circuits.iter().map(|circuit| circuit.boundary.get()).collect();
+    let witness_time_ms = witness_start.elapsed().as_millis();
+    key_id.k = degree;
+
+    let params_start = Instant::now();
+    let params_dir = &self.params_dir;
+    let params: &ParamsKZG<Bn256> = self.params.entry(degree).or_insert_with(|| {
+      // A new master SRS must cover every chunk of the model, not just this one
+      open_or_create_master(params_dir, model_k.max(degree)).expect("Failed to open master SRS");
+      get_kzg_params(params_dir, degree)
+    });
+    let params_time_ms = params_start.elapsed().as_millis();
+
+    // Generate keys (only the first time this chunk shape is proven)
+    let mut keygen_vk_time_ms = 0;
+    let mut keygen_pk_time_ms = 0;
+    let mut key_load_time_ms = 0;
+    let key_cache = self.key_cache;
+    self.proving_keys.entry(key_id.clone()).or_insert_with(|| {
+      let circuit = &circuits[0];
+      if key_cache {
+        let loaded = get_or_create_pk(params_dir, params, circuit);
+        keygen_vk_time_ms = loaded.keygen_vk_time_ms;
+        keygen_pk_time_ms = loaded.keygen_pk_time_ms;
+        key_load_time_ms = loaded.key_load_time_ms;
+        return loaded.pk;
+      }
+      let vk_start = Instant::now();
+      let vk = keygen_vk(params, circuit).unwrap();
+      keygen_vk_time_ms = vk_start.elapsed().as_millis();
+      let pk_start = Instant::now();
+      let pk = keygen_pk(params, vk, circuit).unwrap();
+      keygen_pk_time_ms = pk_start.elapsed().as_millis();
+      pk
+    });
+
+    PreparedChunk {
+      circuits,
+      key_id,
+      public_vals,
+      boundaries,
+      rows_used,
+      timings: SetupTimings {
+        load_time_ms,
+        params_time_ms,
+        keygen_vk_time_ms,
+        keygen_pk_time_ms,
+        key_load_time_ms,
+        witness_time_ms,
+      },
+    }
+  }
+
+  /// Prove several inputs of the same chunk with one `create_proof` call
+  ///
+  /// Each input is `(input_path, prev_merkle_root)`. All circuits share the chunk's
+  /// k, params and proving key, and the proof covers one instance per input, so the
+  /// per-proof fixed costs (params, keys, transcript, opening) are paid once. Inputs
+  /// must give the same tensors, and either all or none have a previous Merkle root.
+  pub fn prove_multi(
+    &mut self,
+    config_path: &str,
+    inputs: &[(&str, Option<Fr>)],
+    chunk_start: usize,
+    chunk_end: usize,
+    use_merkle: bool,
+  ) -> MultiProofResult {
+    assert!(!inputs.is_empty(), "prove_multi needs at least one input");
+    let peak_rss = PeakRssScope::start();
+
+    let PreparedChunk {
+      circuits,
+      key_id,
+      public_vals,
+      boundaries,
+      rows_used,
+      timings,
+    } = self.prepare(config_path, inputs, chunk_start, chunk_end, use_merkle);
+    let degree = key_id.k;
+    let params = &self.params[&degree];
+    let pk = &self.proving_keys[&key_id];
+
+    if self.check {
+      for (circuit, public_vals) in circuits.iter().zip(public_vals.iter()) {
+        MockProver::run(degree, circuit, vec![public_vals.clone()])
+          .unwrap()
+          .assert_satisfied();
+      }
+    }
+
+    // One instance column per circuit
+    let instance_columns: Vec<[&[Fr]; 1]> = public_vals.iter().map(|vals| [&vals[..]]).collect();
+    let instances: Vec<&[&[Fr]]> = instance_columns.iter().map(|columns| &columns[..]).collect();
+
+    // Generate proof
+    let rng = rand::thread_rng();
+    let prove_start = Instant::now();
+    let mut transcript = Blake2bWrite::<_, G1Affine, Challenge255<_>>::init(vec![]);
+    create_proof::<
+      KZGCommitmentScheme<Bn256>,
+      ProverSHPLONK<'_, Bn256>,
+      Challenge255<G1Affine>,
+      _,
+      Blake2bWrite<Vec<u8>, G1Affine, Challenge255<G1Affine>>,
+      ModelCircuit<Fr>,
+    >(params, pk, &circuits, &instances, rng, &mut transcript)
+    .unwrap();
+    let proof = transcript.finalize();
+    let proving_time_ms = prove_start.elapsed().as_millis();
+    drop(circuits);
+
+    // Verify the proof, or hand out the vkey so it can be verified later
+    let verify_start = Instant::now();
+    let vk = if self.verify {
+      let pending = PendingChunkProof {
+        vk: pk.get_vk(),
+        proof: proof.clone(),
+        instances: public_vals.clone(),
+      };
+      assert!(verify_single_kzg(params, &pending), "proof did not verify");
+      None
+    } else {
+      Some(pk.get_vk().to_bytes(SerdeFormat::RawBytes))
+    };
+    let verify_time_ms = verify_start.elapsed().as_millis();
+
+    println!(
+      "Chunk [{}, {}): proof for {} input(s) generated in {}ms, verified in {}ms, {} public vals each{}",
+      chunk_start,
+      chunk_end,
+      inputs.len(),
+      proving_time_ms,
+      verify_time_ms,
+      public_vals[0].len(),
+      if use_merkle { ", includes Merkle root" } else { "" }
+    );
+
+    if self.low_memory {
+      self.params.clear();
+      self.proving_keys.clear();
+    }
+
+    let instances = public_vals
+      .into_iter()
+      .zip(boundaries)
+      .map(|(public_vals, boundary)| {
+        // Extract Merkle root (last public value if use_merkle)
+        let merkle_root = if use_merkle {
+          public_vals.last().cloned()
+        } else {
+          None
+        };
+        InstanceResult {
+          public_vals,
+          merkle_root,
+          boundary,
+        }
+      })
+      .collect();
+
+    MultiProofResult {
+      proof,
+      instances,
+      proving_time_ms,
+      verify_time_ms,
+      load_time_ms: timings.load_time_ms,
+      params_time_ms: timings.params_time_ms,
+      keygen_vk_time_ms: timings.keygen_vk_time_ms,
+      keygen_pk_time_ms: timings.keygen_pk_time_ms,
+      key_load_time_ms: timings.key_load_time_ms,
+      witness_time_ms: timings.witness_time_ms,
+      k: degree,
+      rows_used,
+      peak_rss_bytes: peak_rss.peak_rss_bytes(),
+      vk,
+    }
+  }
 }
 
 /// Generate a KZG proof for a chunk of the model
 /// 
 /// # Arguments
 /// * `config_path` - Path to model config msgpack file
-/// * `input_path` - Path to input msgpack file
+/// * `input_path` - Path to input msgpack file, or for `chunk_start > 0` the boundary
+///   written by the chunk ending at `chunk_start`
 /// * `chunk_start` - Starting layer index (inclusive)
 /// * `chunk_end` - Ending layer index (exclusive)
 /// * `use_merkle` - Whether to compute and include Merkle root in public values
@@ -204,97 +1179,108 @@ pub fn prove_chunk_kzg(
   prev_merkle_root: Option<Fr>,
   params_dir: &str,
 ) -> ChunkProofResult {
-  use crate::utils::loader::load_model_msgpack;
-  
-  let _start = Instant::now();
-  
-  // Load and configure circuit for chunk execution
-  let config = load_model_msgpack(config_path, input_path);
-  let mut circuit = ModelCircuit::<Fr>::generate_from_file(config_path, input_path);
-  
-  // If using Merkle, ensure Poseidon hasher is configured
-  if use_merkle && circuit.commit_after.is_empty() && circuit.commit_before.is_empty() {
-    // Set commit_after to enable Poseidon hasher
-    if let Some(layer) = config.layers.get(chunk_end.saturating_sub(1)) {
-      if !layer.out_idxes.is_empty() {
-        circuit.commit_after = vec![layer.out_idxes.clone()];
-      }
-    }
-  }
-  
-  // Configure for chunk execution
-  circuit.set_chunk_config(chunk_start, chunk_end, use_merkle);
-  
-  // Set previous Merkle root for chained verification (if provided)
-  if let Some(prev_root) = prev_merkle_root {
-    circuit.set_prev_merkle_root(prev_root);
-  }
-  
-  let degree = circuit.k as u32;
-  let params = get_kzg_params(params_dir, degree);
-  
-  // Generate keys
-  let vk = keygen_vk(&params, &circuit).unwrap();
-  let pk = keygen_pk(&params, vk, &circuit).unwrap();
-  
-  // First run to get public values
-  let _mock = MockProver::run(degree, &circuit, vec![vec![]]).unwrap();
-  let public_vals = get_public_values();
-  
-  // Extract Merkle root (last public value if use_merkle)
-  let merkle_root = if use_merkle && !public_vals.is_empty() {
-    Some(public_vals[public_vals.len() - 1])
-  } else {
-    None
-  };
-  
-  // Generate proof
-  let rng = rand::thread_rng();
-  let prove_start = Instant::now();
-  let mut transcript = Blake2bWrite::<_, G1Affine, Challenge255<_>>::init(vec![]);
-  create_proof::<
-    KZGCommitmentScheme<Bn256>,
-    ProverSHPLONK<'_, Bn256>,
-    Challenge255<G1Affine>,
-    _,
-    Blake2bWrite<Vec<u8>, G1Affine, Challenge255<G1Affine>>,
-    ModelCircuit<Fr>,
-  >(
-    &params,
-    &pk,
-    &[circuit],
-    &[&[&public_vals]],
-    rng,
-    &mut transcript,
-  )
-  .unwrap();
-  let proof = transcript.finalize();
-  let proving_time_ms = prove_start.elapsed().as_millis();
-  
-  // Verify the proof
-  let verify_start = Instant::now();
-  let strategy = SingleStrategy::new(&params);
-  let transcript_read = Blake2bRead::<_, _, Challenge255<_>>::init(&proof[..]);
-  verify_kzg(&params, pk.get_vk(), strategy, &public_vals, transcript_read);
-  let verify_time_ms = verify_start.elapsed().as_millis();
-  
-  println!(
-    "Chunk [{}, {}): proof generated in {}ms, verified in {}ms, {} public vals{}",
+  // Nothing is reused, so don't keep the whole model config around while proving
+  let mut prover = ChunkProver::new(params_dir);
+  prover.set_low_memory(true);
+  prover.prove(
+    config_path,
+    input_path,
     chunk_start,
     chunk_end,
-    proving_time_ms,
-    verify_time_ms,
-    public_vals.len(),
-    if use_merkle { ", includes Merkle root" } else { "" }
-  );
-  
-  ChunkProofResult {
-    proof,
-    public_vals,
-    merkle_root,
-    proving_time_ms,
-    verify_time_ms,
+    use_merkle,
+    prev_merkle_root,
+  )
+}
+
+/// Generate one KZG proof for several inputs of a chunk of the model
+///
+/// Like `prove_chunk_kzg`, with `(input_path, prev_merkle_root)` per input; see
+/// `ChunkProver::prove_multi`.
+pub fn prove_chunk_multi_kzg(
+  config_path: &str,
+  inputs: &[(&str, Option<Fr>)],
+  chunk_start: usize,
+  chunk_end: usize,
+  use_merkle: bool,
+  params_dir: &str,
+) -> MultiProofResult {
+  let mut prover = ChunkProver::new(params_dir);
+  prover.set_low_memory(true);
+  prover.prove_multi(config_path, inputs, chunk_start, chunk_end, use_merkle)
+}
+
+/// A chunk proof whose verification was deferred
+pub struct PendingChunkProof<'a> {
+  pub vk: &'a VerifyingKey<G1Affine>,
+  pub proof: Vec<u8>,
+  /// Public values of each circuit in the proof (one unless proven with `prove_multi`)
+  pub instances: Vec<Vec<Fr>>,
+}
+
+impl PendingChunkProof<'_> {
+  fn verify<'params, S>(
+    &self,
+    params: &'params ParamsKZG<Bn256>,
+    strategy: S,
+  ) -> Result<S::Output, Error>
+  where
+    S: VerificationStrategy<'params, KZGCommitmentScheme<Bn256>, VerifierSHPLONK<'params, Bn256>>,
+  {
+    let instance_columns: Vec<[&[Fr]; 1]> =
+      self.instances.iter().map(|vals| [&vals[..]]).collect();
+    let instances: Vec<&[&[Fr]]> = instance_columns.iter().map(|columns| &columns[..]).collect();
+    let mut transcript = Blake2bRead::<_, _, Challenge255<_>>::init(&self.proof[..]);
+    verify_proof::<
+      KZGCommitmentScheme<Bn256>,
+      VerifierSHPLONK<'_, Bn256>,
+      Challenge255<G1Affine>,
+      Blake2bRead<&[u8], G1Affine, Challenge255<G1Affine>>,
+      S,
+    >(params, self.vk, strategy, &instances, &mut transcript)
+  }
+}
+
+/// Verify a single proof, returning false instead of panicking if it is invalid
+pub fn verify_single_kzg(params: &ParamsKZG<Bn256>, pending: &PendingChunkProof) -> bool {
+  pending.verify(params, SingleStrategy::new(params)).is_ok()
+}
+
+/// Verify a batch of proofs over the same params with one accumulated pairing check.
+///
+/// Each proof's MSMs are folded into an `AccumulatorStrategy` and the final pairing is
+/// checked once, so N proofs cost much less than N single verifications. Returns false
+/// if *some* proof is invalid; use `verify_single_kzg` to find which.
+pub fn batch_verify_kzg(params: &ParamsKZG<Bn256>, proofs: &[&PendingChunkProof]) -> bool {
+  let mut strategy = AccumulatorStrategy::new(params);
+  for pending in proofs {
+    strategy = match pending.verify(params, strategy) {
+      Ok(strategy) => strategy,
+      Err(_) => return false,
+    };
   }
+  VerificationStrategy::<_, VerifierSHPLONK<'_, Bn256>>::finalize(strategy)
+}
+
+/// Verify many proofs over the same params, `batch_size` per accumulated pairing check.
+///
+/// Batches are verified in parallel; a batch that fails is re-checked proof by proof, so
+/// only the invalid proofs are reported. Returns whether each proof is valid, in order.
+pub fn verify_batches_kzg(
+  params: &ParamsKZG<Bn256>,
+  proofs: &[PendingChunkProof],
+  batch_size: usize,
+) -> Vec<bool> {
+  proofs
+    .par_chunks(batch_size.max(1))
+    .flat_map_iter(|batch| {
+      let refs: Vec<&PendingChunkProof> = batch.iter().collect();
+      if batch_verify_kzg(params, &refs) {
+        vec![true; batch.len()]
+      } else {
+        batch.iter().map(|p| verify_single_kzg(params, p)).collect()
+      }
+    })
+    .collect()
 }
 
 // Standalone verification
@@ -311,7 +1297,7 @@ pub fn verify_circuit_kzg(
   let vk = VerifyingKey::read::<BufReader<File>, ModelCircuit<Fr>>(
     &mut BufReader::new(File::open(vkey_fname).unwrap()),
     SerdeFormat::RawBytes,
-    (),
+    circuit.params(),
   )
   .unwrap();
   println!("Loaded vkey");
@@ -0,0 +1,192 @@
+//! KZG structured reference string shared by all chunk provers on a node.
+//!
+//! Params for every k are derived from one master file, `{params_dir}/master.params`
+//! (the `ParamsKZG::write` format), so all chunks are proven against the same setup no
+//! matter which k they need. The master is memory-mapped read-only: deriving params for
+//! a small k only touches the first 2^k points of g, and the pages are shared between
+//! all processes on the node through the page cache.
+//!
+//! Derived params are written next to the master as `{params_dir}/{k}.params`, so each k
+//! is derived (and its Lagrange basis computed) once per node. A `{k}.params` that was not
+//! derived from the current master (e.g. one left over from an older setup) is replaced.
+
+use std::{
+  fs::{self, File},
+  io::{self, BufWriter, Read, Write},
+  path::{Path, PathBuf},
+};
+
+use halo2_proofs::{
+  halo2curves::bn256::Bn256,
+  poly::{commitment::Params, kzg::commitment::ParamsKZG},
+  SerdeFormat,
+};
+use memmap2::Mmap;
+
+pub const MASTER_SRS_FILE: &str = "master.params";
+
+/// Environment variable with the k of a newly generated master SRS (default: the first k
+/// requested). Set it to the largest k any chunk will need.
+pub const MASTER_SRS_K_ENV: &str = "ZKML_MASTER_SRS_K";
+
+// Sizes of the uncompressed (RawBytes) bn256 point encodings
+const G1_BYTES: usize = 64;
+const G2_BYTES: usize = 128;
+
+pub fn master_srs_path(params_dir: &str) -> PathBuf {
+  Path::new(params_dir).join(MASTER_SRS_FILE)
+}
+
+/// A memory-mapped master SRS
+pub struct MasterSrs {
+  mmap: Mmap,
+  k: u32,
+}
+
+impl MasterSrs {
+  pub fn open(path: &Path) -> io::Result<Self> {
+    let file = File::open(path)?;
+    // The master is only ever created by linking a fully written file into place and
+    // is never modified afterwards, so the mapping can't change under us
+    let mmap = unsafe { Mmap::map(&file)? };
+    if mmap.len() < 4 {
+      return Err(io::Error::new(io::ErrorKind::InvalidData, "truncated master SRS"));
+    }
+    let k = u32::from_le_bytes(mmap[..4].try_into().unwrap());
+    let expected_len = 4 + 2 * (1usize << k) * G1_BYTES + 2 * G2_BYTES;
+    if mmap.len() != expected_len {
+      return Err(io::Error::new(
+        io::ErrorKind::InvalidData,
+        format!(
+          "master SRS {:?} has {} bytes, expected {} for k={}",
+          path,
+          mmap.len(),
+          expected_len,
+          k
+        ),
+      ));
+    }
+    Ok(Self { mmap, k })
+  }
+
+  pub fn k(&self) -> u32 {
+    self.k
+  }
+
+  /// Params for `k <= self.k()`
+  ///
+  /// The first 2^k powers of tau in g are a valid SRS for 2^k rows; `downsize` then
+  /// recomputes the Lagrange basis for the smaller domain.
+  pub fn derive(&self, k: u32) -> io::Result<ParamsKZG<Bn256>> {
+    if k > self.k {
+      return Err(io::Error::new(
+        io::ErrorKind::InvalidInput,
+        format!(
+          "master SRS has k={}, circuit needs k={}; regenerate it with {}={}",
+          self.k, k, MASTER_SRS_K_ENV, k
+        ),
+      ));
+    }
+
+    // The master was checked when it was written, so skip the per-point curve checks
+    let format = SerdeFormat::RawBytesUnchecked;
+    if k == self.k {
+      return ParamsKZG::read_custom(&mut &self.mmap[..], format);
+    }
+
+    let n_master = 1usize << self.k;
+    let g_start = 4;
+    let g2_start = g_start + 2 * n_master * G1_BYTES;
+    let g_prefix = &self.mmap[g_start..g_start + (1usize << k) * G1_BYTES];
+
+    // read_custom expects a Lagrange basis of the same length after g. The prefix of g
+    // stands in for it; downsize replaces it with the real basis.
+    let k_bytes = k.to_le_bytes();
+    let mut reader = (&k_bytes[..])
+      .chain(g_prefix)
+      .chain(g_prefix)
+      .chain(&self.mmap[g2_start..]);
+    let mut params = ParamsKZG::<Bn256>::read_custom(&mut reader, format)?;
+    params.downsize(k);
+    Ok(params)
+  }
+
+  /// Whether `bytes` (in the `ParamsKZG::write` format) are params for `k` derived from
+  /// this master: the same first 2^k points of g and the same g2 and s_g2
+  pub fn derived(&self, k: u32, bytes: &[u8]) -> bool {
+    if k > self.k {
+      return false;
+    }
+    let n = 1usize << k;
+    if bytes.len() != 4 + 2 * n * G1_BYTES + 2 * G2_BYTES || bytes[..4] != k.to_le_bytes() {
+      return false;
+    }
+
+    let g_start = 4;
+    let g2_start = g_start + 2 * (1usize << self.k) * G1_BYTES;
+    bytes[g_start..g_start + n * G1_BYTES] == self.mmap[g_start..g_start + n * G1_BYTES]
+      && bytes[bytes.len() - 2 * G2_BYTES..] == self.mmap[g2_start..]
+  }
+}
+
+/// Open the master SRS under `params_dir`, generating it if there is none yet
+///
+/// A new master has k = max(`k`, $ZKML_MASTER_SRS_K). Generation draws the toxic
+/// waste from `thread_rng`; for production, place a master converted from a trusted
+/// setup ceremony in `params_dir` instead.
+pub fn open_or_create_master(params_dir: &str, k: u32) -> io::Result<MasterSrs> {
+  let path = master_srs_path(params_dir);
+  if !path.exists() {
+    let master_k = std::env::var(MASTER_SRS_K_ENV)
+      .ok()
+      .and_then(|k| k.parse::<u32>().ok())
+      .map_or(k, |master_k| master_k.max(k));
+    println!("Generating master SRS with k={} at {:?}", master_k, path);
+    let params = ParamsKZG::<Bn256>::setup(master_k, rand::thread_rng());
+
+    fs::create_dir_all(params_dir)?;
+    let tmp_path = path.with_extension(format!("params.tmp{}", std::process::id()));
+    write_params(&tmp_path, &params)?;
+    // Linking fails if another process created a master first; theirs wins, so every
+    // prover on the node uses the same setup
+    let linked = fs::hard_link(&tmp_path, &path);
+    fs::remove_file(&tmp_path).ok();
+    if let Err(e) = linked {
+      if e.kind() != io::ErrorKind::AlreadyExists {
+        return Err(e);
+      }
+    }
+  }
+  MasterSrs::open(&path)
+}
+
+/// Load `{params_dir}/{k}.params`, deriving it from the master SRS if it doesn't exist or
+/// was derived from a different setup
+pub fn load_params(params_dir: &str, k: u32) -> io::Result<ParamsKZG<Bn256>> {
+  let master = open_or_create_master(params_dir, k)?;
+  let path = Path::new(params_dir).join(format!("{}.params", k));
+  if let Ok(bytes) = fs::read(&path) {
+    if master.derived(k, &bytes) {
+      return ParamsKZG::<Bn256>::read(&mut &bytes[..]);
+    }
+    eprintln!(
+      "{:?} was not derived from {:?}, deriving it again",
+      path,
+      master_srs_path(params_dir)
+    );
+  }
+
+  let params = master.derive(k)?;
+  let tmp_path = path.with_extension(format!("params.tmp{}", std::process::id()));
+  if let Err(e) = write_params(&tmp_path, &params).and_then(|_| fs::rename(&tmp_path, &path)) {
+    eprintln!("Failed to cache params at {:?}: {}", path, e);
+    fs::remove_file(&tmp_path).ok();
+  }
+  Ok(params)
+}
+
+fn write_params(path: &Path, params: &ParamsKZG<Bn256>) -> io::Result<()> {
+  let mut writer = BufWriter::new(File::create(path)?);
+  params.write(&mut writer)?;
+  writer.flush()
+}
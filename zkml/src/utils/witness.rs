@@ -0,0 +1,504 @@
+//! Witness-only synthesis of a model circuit.
+//!
+//! Proving needs the circuit's public values before `create_proof` is called. Running
+//! `MockProver` to get them allocates and fills every column of the 2^k-row table and
+//! keeps the copy constraints and lookups around, only to throw them away. The
+//! `WitnessCollector` here runs the same synthesis but keeps nothing: advice closures
+//! are evaluated (so the layouter's cell values, and with them the public values, are
+//! computed), everything else is only bounds-checked. `synthesize_witness_checked` also
+//! keeps the cells that lookups read, to check that a smaller k still fits the values.
+//!
+//! `evaluate_dag` uses the same backend to compute a model's activations: it runs the
+//! layer chips on assigned inputs but skips lookup tables, commitments and public
+//! values, and reads every intermediate tensor back as integers. One evaluation of the
+//! whole model gives the boundary of every chunk (`boundary_from_activations`), so
+//! chunks can be proven in parallel instead of each waiting for the one before it.
+
+use std::{
+  cell::RefCell,
+  collections::{BTreeMap, BTreeSet},
+  ops::Range,
+};
+
+use halo2_proofs::{
+  circuit::{Layouter, SimpleFloorPlanner, Value},
+  halo2curves::ff::{Field, FromUniformBytes, PrimeField},
+  plonk::{
+    Advice, Any, Assigned, Assignment, Challenge, Circuit, Column, ConstraintSystem, Error,
+    Expression, Fixed, FloorPlanner, Instance, Selector,
+  },
+  poly::Rotation,
+};
+use ndarray::{Array, IxDyn};
+
+use crate::{
+  gadgets::gadget::GadgetConfig,
+  layers::{dag::DAGLayerChip, layer::LayerConfig},
+  model::{ModelCircuit, ModelConfig},
+  utils::{
+    helpers::{assigned_tensor_values, convert_pos_int},
+    loader::TensorMsgpack,
+  },
+};
+
+// Values of the cells that lookup arguments read, by column (or selector) index
+struct LookupCells<F> {
+  advice: Vec<Option<Vec<F>>>,
+  fixed: Vec<Option<Vec<F>>>,
+  selectors: Vec<Option<Vec<bool>>>,
+}
+
+impl<F: Field> LookupCells<F> {
+  fn new(cs: &ConstraintSystem<F>, n: usize) -> Self {
+    let mut cells = Self {
+      advice: vec![None; cs.num_advice_columns()],
+      fixed: vec![None; cs.num_fixed_columns()],
+      selectors: vec![None; cs.num_selectors()],
+    };
+    for lookup in cs.lookups() {
+      for expr in lookup.input_expressions().iter().chain(lookup.table_expressions()) {
+        cells.track(expr, n);
+      }
+    }
+    cells
+  }
+
+  fn track(&mut self, expr: &Expression<F>, n: usize) {
+    match expr {
+      Expression::Selector(selector) => {
+        self.selectors[selector.index()].get_or_insert_with(|| vec![false; n]);
+      }
+      Expression::Fixed(query) => {
+        self.fixed[query.column_index()].get_or_insert_with(|| vec![F::ZERO; n]);
+      }
+      Expression::Advice(query) => {
+        self.advice[query.column_index()].get_or_insert_with(|| vec![F::ZERO; n]);
+      }
+      Expression::Negated(a) | Expression::Scaled(a, _) => self.track(a, n),
+      Expression::Sum(a, b) | Expression::Product(a, b) => {
+        self.track(a, n);
+        self.track(b, n);
+      }
+      Expression::Constant(_) | Expression::Instance(_) | Expression::Challenge(_) => {}
+    }
+  }
+
+  // Unassigned cells (and instance cells, which this pass doesn't compute) read as zero
+  fn evaluate(&self, expr: &Expression<F>, row: usize, n: usize) -> F {
+    let at = |rotation: Rotation| (row as i32 + rotation.0).rem_euclid(n as i32) as usize;
+    let cell = |column: &Option<Vec<F>>, row: usize| column.as_ref().map_or(F::ZERO, |c| c[row]);
+    expr.evaluate(
+      &|scalar| scalar,
+      &|selector| match &self.selectors[selector.index()] {
+        Some(rows) if rows[row] => F::ONE,
+        _ => F::ZERO,
+      },
+      &|query| cell(&self.fixed[query.column_index()], at(query.rotation())),
+      &|query| cell(&self.advice[query.column_index()], at(query.rotation())),
+      &|_| F::ZERO,
+      &|_| F::ZERO,
+      &|a| -a,
+      &|a, b| a + b,
+      &|a, b| a * b,
+      &|a, scalar| a * scalar,
+    )
+  }
+}
+
+/// Backend for `FloorPlanner::synthesize` that evaluates the witness without storing it
+pub struct WitnessCollector<F: Field> {
+  k: u32,
+  usable_rows: Range<usize>,
+  max_row: Option<usize>,
+  lookup_cells: Option<LookupCells<F>>,
+}
+
+impl<F: Field> WitnessCollector<F> {
+  pub fn new(k: u32, blinding_factors: usize) -> Self {
+    let n = 1usize << k;
+    Self {
+      k,
+      usable_rows: 0..n - (blinding_factors + 1),
+      max_row: None,
+      lookup_cells: None,
+    }
+  }
+
+  /// Also keep the cells read by the lookups of `cs`, for `failed_lookup`
+  pub fn track_lookups(mut self, cs: &ConstraintSystem<F>) -> Self {
+    self.lookup_cells = Some(LookupCells::new(cs, 1 << self.k));
+    self
+  }
+
+  /// Name of the first lookup of `cs` with an input (on any usable row, as `MockProver`
+  /// checks them) that is not in its table. Needs `track_lookups(cs)`.
+  pub fn failed_lookup(&self, cs: &ConstraintSystem<F>) -> Option<String>
+  where
+    F: Ord,
+  {
+    let cells = self.lookup_cells.as_ref().expect("lookups are not tracked");
+    let n = 1usize << self.k;
+    let rows = |exprs: &[Expression<F>]| -> BTreeSet<Vec<F>> {
+      self
+        .usable_rows
+        .clone()
+        .map(|row| exprs.iter().map(|expr| cells.evaluate(expr, row, n)).collect())
+        .collect()
+    };
+
+    // Lookups into the same table share its rows
+    let mut tables: BTreeMap<String, BTreeSet<Vec<F>>> = BTreeMap::new();
+    for lookup in cs.lookups() {
+      let table = tables
+        .entry(format!("{:?}", lookup.table_expressions()))
+        .or_insert_with(|| rows(&lookup.table_expressions()[..]));
+      if !rows(&lookup.input_expressions()[..]).is_subset(table) {
+        return Some(lookup.name().to_string());
+      }
+    }
+    None
+  }
+
+  /// Number of rows assigned in the advice columns
+  pub fn rows_used(&self) -> usize {
+    self.max_row.map(|row| row + 1).unwrap_or(0)
+  }
+
+  /// Smallest k with room for the rows used, plus the blinding rows
+  pub fn min_k(&self) -> u32 {
+    let unusable_rows = (1usize << self.k) - self.usable_rows.end;
+    (self.rows_used() + unusable_rows).next_power_of_two().trailing_zeros()
+  }
+
+  fn check_row(&self, row: usize) -> Result<(), Error> {
+    if !self.usable_rows.contains(&row) {
+      return Err(Error::NotEnoughRowsAvailable { current_k: self.k });
+    }
+    Ok(())
+  }
+}
+
+impl<F: Field> Assignment<F> for WitnessCollector<F> {
+  fn enter_region<NR, N>(&mut self, _: N)
+  where
+    NR: Into<String>,
+    N: FnOnce() -> NR,
+  {
+  }
+
+  fn annotate_column<A, AR>(&mut self, _: A, _: Column<Any>)
+  where
+    A: FnOnce() -> AR,
+    AR: Into<String>,
+  {
+  }
+
+  fn exit_region(&mut self) {}
+
+  fn enable_selector<A, AR>(&mut self, _: A, selector: &Selector, row: usize) -> Result<(), Error>
+  where
+    A: FnOnce() -> AR,
+    AR: Into<String>,
+  {
+    self.check_row(row)?;
+    if let Some(cells) = self.lookup_cells.as_mut() {
+      if let Some(rows) = cells.selectors[selector.index()].as_mut() {
+        rows[row] = true;
+      }
+    }
+    Ok(())
+  }
+
+  fn query_instance(&self, _: Column<Instance>, row: usize) -> Result<Value<F>, Error> {
+    self.check_row(row)?;
+    // The public values are an output of this pass, not an input
+    Ok(Value::unknown())
+  }
+
+  fn assign_advice<V, VR, A, AR>(
+    &mut self,
+    _: A,
+    column: Column<Advice>,
+    row: usize,
+    to: V,
+  ) -> Result<(), Error>
+  where
+    V: FnOnce() -> Value<VR>,
+    VR: Into<Assigned<F>>,
+    A: FnOnce() -> AR,
+    AR: Into<String>,
+  {
+    self.check_row(row)?;
+    // The layouter records the cell's value from inside `to`, so it has to run
+    let value = to();
+    if let Some(cells) = self.lookup_cells.as_mut() {
+      if let Some(rows) = cells.advice[column.index()].as_mut() {
+        value.map(|v| rows[row] = v.into().evaluate());
+      }
+    }
+    self.max_row = Some(self.max_row.map_or(row, |max_row| max_row.max(row)));
+    Ok(())
+  }
+
+  fn assign_fixed<V, VR, A, AR>(
+    &mut self,
+    _: A,
+    column: Column<Fixed>,
+    row: usize,
+    to: V,
+  ) -> Result<(), Error>
+  where
+    V: FnOnce() -> Value<VR>,
+    VR: Into<Assigned<F>>,
+    A: FnOnce() -> AR,
+    AR: Into<String>,
+  {
+    self.check_row(row)?;
+    if let Some(cells) = self.lookup_cells.as_mut() {
+      if let Some(rows) = cells.fixed[column.index()].as_mut() {
+        to().map(|v| rows[row] = v.into().evaluate());
+      }
+    }
+    Ok(())
+  }
+
+  fn copy(
+    &mut self,
+    _: Column<Any>,
+    left_row: usize,
+    _: Column<Any>,
+    right_row: usize,
+  ) -> Result<(), Error> {
+    self.check_row(left_row)?;
+    self.check_row(right_row)
+  }
+
+  fn fill_from_row(
+    &mut self,
+    column: Column<Fixed>,
+    row: usize,
+    to: Value<Assigned<F>>,
+  ) -> Result<(), Error> {
+    self.check_row(row)?;
+    if let Some(cells) = self.lookup_cells.as_mut() {
+      if let Some(rows) = cells.fixed[column.index()].as_mut() {
+        let end = self.usable_rows.end;
+        to.map(|v| rows[row..end].fill(v.evaluate()));
+      }
+    }
+    Ok(())
+  }
+
+  fn get_challenge(&self, _: Challenge) -> Value<F> {
+    Value::unknown()
+  }
+
+  fn push_namespace<NR, N>(&mut self, _: N)
+  where
+    NR: Into<String>,
+    N: FnOnce() -> NR,
+  {
+  }
+
+  fn pop_namespace(&mut self, _: Option<String>) {}
+}
+
+// Synthesize `circuit` against a `WitnessCollector`, which keeps the cells read by
+// lookups if `track_lookups` is set
+fn collect_witness<F: Field, C: Circuit<F, Params = GadgetConfig>>(
+  circuit: &C,
+  k: u32,
+  track_lookups: bool,
+) -> Result<(WitnessCollector<F>, ConstraintSystem<F>), Error> {
+  let mut cs = ConstraintSystem::<F>::default();
+  let config = C::configure_with_params(&mut cs, circuit.params());
+
+  let mut collector = WitnessCollector::new(k, cs.blinding_factors());
+  if track_lookups {
+    collector = collector.track_lookups(&cs);
+  }
+  C::FloorPlanner::synthesize(&mut collector, circuit, config, cs.constants().clone())?;
+
+  Ok((collector, cs))
+}
+
+/// Run the circuit's synthesis without building the constraint tables.
+///
+/// Afterwards the circuit's public values can be read with `get_public_values(circuit)`,
+/// as after a `MockProver` run. Returns the number of advice rows used. Fails with
+/// `NotEnoughRowsAvailable` if the circuit does not fit in 2^k rows.
+pub fn synthesize_witness<F: PrimeField + Ord + FromUniformBytes<64>>(
+  circuit: &ModelCircuit<F>,
+  k: u32,
+) -> Result<usize, Error> {
+  collect_witness(circuit, k, false).map(|(collector, _)| collector.rows_used())
+}
+
+/// `synthesize_witness`, also checking that every lookup input is in its table.
+///
+/// The lookup tables (and the range of values they accept) shrink with k, so a circuit
+/// with room for its rows at some k may still need a larger k for its values, e.g. the
+/// pre-activations of a fused ReLU. Fails with `ConstraintSystemFailure` if a lookup
+/// input is outside its table, as proving would.
+pub fn synthesize_witness_checked<F: PrimeField + Ord + FromUniformBytes<64>>(
+  circuit: &ModelCircuit<F>,
+  k: u32,
+) -> Result<usize, Error> {
+  let (collector, cs) = collect_witness(circuit, k, true)?;
+  match collector.failed_lookup(&cs) {
+    Some(_) => Err(Error::ConstraintSystemFailure),
+    None => Ok(collector.rows_used()),
+  }
+}
+
+/// Smallest k with room for the rows the circuit uses, measured at `circuit.k`.
+///
+/// The advice rows a circuit uses don't depend on k, but the lookup tables grow with
+/// it; see `synthesize_witness_checked` for the values they must still accept.
+pub fn min_k_for_rows<F: PrimeField + Ord + FromUniformBytes<64>>(
+  circuit: &ModelCircuit<F>,
+) -> Result<u32, Error> {
+  collect_witness(circuit, circuit.k as u32, false).map(|(collector, _)| collector.min_k())
+}
+
+/// Integer values of the tensors computed by a model's layers, by tensor index
+pub type Activations = BTreeMap<usize, Array<i64, IxDyn>>;
+
+// Circuit that only runs the model's layers and records their outputs
+struct DagEvaluation<'a, F: PrimeField> {
+  circuit: &'a ModelCircuit<F>,
+  activations: RefCell<Activations>,
+}
+
+impl<'a, F: PrimeField + Ord + FromUniformBytes<64>> Circuit<F> for DagEvaluation<'a, F> {
+  type Config = ModelConfig<F>;
+  type FloorPlanner = SimpleFloorPlanner;
+  type Params = GadgetConfig;
+
+  fn without_witnesses(&self) -> Self {
+    unreachable!("DagEvaluation is only run by evaluate_dag's witness pass, never by keygen")
+  }
+
+  fn params(&self) -> Self::Params {
+    self.circuit.params()
+  }
+
+  fn configure(_meta: &mut ConstraintSystem<F>) -> Self::Config {
+    panic!("DagEvaluation must be configured with its GadgetConfig (configure_with_params)")
+  }
+
+  fn configure_with_params(meta: &mut ConstraintSystem<F>, params: Self::Params) -> Self::Config {
+    ModelCircuit::<F>::configure_with_params(meta, params)
+  }
+
+  fn synthesize(&self, config: Self::Config, mut layouter: impl Layouter<F>) -> Result<(), Error> {
+    let circuit = self.circuit;
+    let gadget_config = config.gadget_config.clone();
+    let constants_base =
+      circuit.assign_constants(layouter.namespace(|| "constants"), gadget_config.clone())?;
+    let constants = circuit.assign_constants2(
+      layouter.namespace(|| "constants 2"),
+      gadget_config.clone(),
+      &constants_base,
+    )?;
+    let tensors = circuit.assign_tensors_vec(
+      layouter.namespace(|| "assignment"),
+      &gadget_config.columns,
+      &circuit.assigned_tensors(),
+    )?;
+
+    let dag_chip = DAGLayerChip::<F>::construct(circuit.dag_config.clone());
+    let (layers, (tensor_map, _)) = match (circuit.chunk_start, circuit.chunk_end) {
+      (Some(chunk_start), Some(chunk_end)) => (
+        chunk_start..chunk_end,
+        dag_chip.forward_chunk(
+          layouter.namespace(|| "chunk"),
+          &tensors,
+          &constants,
+          gadget_config,
+          chunk_start,
+          chunk_end,
+        )?,
+      ),
+      _ => (
+        0..circuit.dag_config.ops.len(),
+        dag_chip.forward(
+          layouter.namespace(|| "dag"),
+          &tensors,
+          &constants,
+          gadget_config,
+          &LayerConfig::default(),
+        )?,
+      ),
+    };
+
+    let mut activations = self.activations.borrow_mut();
+    for layer_idx in layers {
+      for tensor_idx in circuit.dag_config.out_idxes[layer_idx].iter() {
+        if let Some(tensor) = tensor_map.get(tensor_idx) {
+          activations.insert(*tensor_idx, assigned_tensor_values(tensor));
+        }
+      }
+    }
+    Ok(())
+  }
+}
+
+/// Compute the outputs of every layer the circuit executes (the whole model, or only
+/// `[chunk_start, chunk_end)` if a chunk is set), without proving.
+///
+/// Runs the same chips as proving, so the values match the circuit's witness exactly.
+pub fn evaluate_dag<F: PrimeField + Ord + FromUniformBytes<64>>(
+  circuit: &ModelCircuit<F>,
+) -> Result<Activations, Error> {
+  let evaluation = DagEvaluation {
+    circuit,
+    activations: RefCell::default(),
+  };
+  collect_witness(&evaluation, circuit.k as u32, false)?;
+  Ok(evaluation.activations.into_inner())
+}
+
+/// Activations in the input msgpack format (a list of {idx, shape, data} tensors)
+pub fn activations_to_msgpack(activations: &Activations) -> Vec<TensorMsgpack> {
+  activations
+    .iter()
+    .map(|(idx, tensor)| TensorMsgpack {
+      idx: *idx as i64,
+      shape: tensor.shape().iter().map(|dim| *dim as i64).collect(),
+      data: tensor.iter().cloned().collect(),
+    })
+    .collect()
+}
+
+/// The boundary a chunk ending at layer `end` hands to the next chunk (see
+/// `ModelCircuit::boundary_idxes`), from the `activations` of the whole model
+/// (`evaluate_dag` of `circuit` without a chunk).
+///
+/// Equals the boundary that proving `[.., end)` writes, so chunk `[end, ..)` can be
+/// proven without proving the layers before it first.
+pub fn boundary_from_activations<F: PrimeField>(
+  circuit: &ModelCircuit<F>,
+  activations: &Activations,
+  end: usize,
+) -> Vec<TensorMsgpack> {
+  circuit
+    .boundary_idxes(end)
+    .into_iter()
+    .filter_map(|idx| {
+      // Model inputs are not in the activations
+      let values = match activations.get(&idx) {
+        Some(values) => values.clone(),
+        None => circuit
+          .tensors
+          .get(&(idx as i64))?
+          .map(|x| convert_pos_int(Value::known(*x)) as i64),
+      };
+      Some(TensorMsgpack {
+        idx: idx as i64,
+        shape: values.shape().iter().map(|dim| *dim as i64).collect(),
+        data: values.iter().cloned().collect(),
+      })
+    })
+    .collect()
+}
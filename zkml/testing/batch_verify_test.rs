@@ -0,0 +1,126 @@
+//! Tests for deferred batch verification of chunk proofs
+//!
+//! Proofs made with verification off are checked together with `verify_batches_kzg`,
+//! which must report exactly the invalid proofs of a batch. The verifying keys
+//! `verify_chunks` rebuilds from the model config must be the ones the prover used.
+//!
+//! Note: slow test (real proofs).
+//! Run with: cargo test --test batch_verify_test --release -- --nocapture
+
+#[cfg(test)]
+mod tests {
+    use halo2_proofs::{
+        halo2curves::{bn256::Fr, ff::Field},
+        plonk::{Circuit, VerifyingKey},
+        SerdeFormat,
+    };
+    use zkml::{
+        model::ModelCircuit,
+        utils::{
+            loader::{encode_input_msgpack, load_config_msgpack},
+            proving_kzg::{
+                chunk_vk, get_kzg_params, verify_batches_kzg, ChunkProofResult, ChunkProver,
+                PendingChunkProof,
+            },
+        },
+    };
+
+    #[test]
+    fn test_batch_verification_flags_tampered_proof() {
+        let config_file = "examples/mnist/model.msgpack";
+        let input_file = "examples/mnist/inp.msgpack";
+
+        if !std::path::Path::new(config_file).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+
+        let params_dir = "./params_kzg_batch_verify_test";
+        std::fs::create_dir_all(params_dir).ok();
+
+        let mut prover = ChunkProver::new(params_dir);
+        prover.set_verify(false);
+        let results: Vec<_> = (0..3)
+            .map(|_| prover.prove(config_file, input_file, 0, 2, false, None))
+            .collect();
+
+        let k = results[0].k;
+        let mut circuit = prover.build_circuit(config_file, input_file, 0, 2, false, None);
+        circuit.set_k(k as usize);
+        let vk_bytes = results[0].vk.clone().expect("vk is returned when verification is deferred");
+        let vk = VerifyingKey::read::<_, ModelCircuit<Fr>>(
+            &mut &vk_bytes[..],
+            SerdeFormat::RawBytes,
+            circuit.params(),
+        )
+        .unwrap();
+        let params = get_kzg_params(params_dir, k);
+
+        let mut pending: Vec<PendingChunkProof> = results
+            .iter()
+            .map(|result| PendingChunkProof {
+                vk: &vk,
+                proof: result.proof.clone(),
+                instances: vec![result.public_vals.clone()],
+            })
+            .collect();
+        assert_eq!(verify_batches_kzg(&params, &pending, 3), vec![true, true, true]);
+
+        // Claim a different public value for the second proof
+        pending[1].instances[0][0] += Fr::ONE;
+        for batch_size in [1, 2, 3] {
+            assert_eq!(
+                verify_batches_kzg(&params, &pending, batch_size),
+                vec![true, false, true],
+                "batch size {}",
+                batch_size
+            );
+        }
+
+        println!("✓ Batch verification reports exactly the tampered proof");
+    }
+
+    #[test]
+    fn test_chunk_vk_matches_prover_vk() {
+        let config_file = "examples/mnist/model.msgpack";
+        let input_file = "examples/mnist/inp.msgpack";
+
+        if !std::path::Path::new(config_file).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+
+        let params_dir = "./params_kzg_chunk_vk_test";
+        std::fs::create_dir_all(params_dir).ok();
+
+        let config = load_config_msgpack(config_file);
+        let num_layers = config.layers.len();
+        let full_circuit = ModelCircuit::<Fr>::generate_from_msgpack(config.clone(), false);
+
+        let mut prover = ChunkProver::new(params_dir);
+        prover.set_verify(false);
+        let first = prover.prove(config_file, input_file, 0, 2, false, None);
+        let boundary_path = format!("{}/boundary_2.msgpack", params_dir);
+        std::fs::write(&boundary_path, encode_input_msgpack(&first.boundary)).unwrap();
+        let second = prover.prove(config_file, &boundary_path, 2, num_layers, false, None);
+
+        let rebuilt_vk = |result: &ChunkProofResult, start: usize, end: usize| {
+            let params = get_kzg_params(params_dir, result.k);
+            let input_idxes: Vec<i64> = full_circuit
+                .boundary_idxes(start)
+                .into_iter()
+                .map(|idx| idx as i64)
+                .collect();
+            chunk_vk(&params, &config, &input_idxes, start, end, false, false, None)
+                .unwrap()
+                .to_bytes(SerdeFormat::RawBytes)
+        };
+
+        assert_eq!(first.vk.clone().unwrap(), rebuilt_vk(&first, 0, 2));
+        assert_eq!(second.vk.clone().unwrap(), rebuilt_vk(&second, 2, num_layers));
+        // Another chunk at the same k has another key
+        assert_ne!(first.vk.clone().unwrap(), rebuilt_vk(&first, 0, 1));
+
+        println!("✓ Rebuilt verifying keys match the prover's");
+    }
+}
@@ -3,14 +3,16 @@
 //! These tests verify that:
 //! 1. Real KZG proofs can be generated for model chunks
 //! 2. Proofs verify correctly
-//! 3. Chunks can be chained via Merkle root verification
+//! 3. A chunk can expose the previous chunk's Merkle root (not checked in the circuit)
+//! 4. Several inputs of a chunk can be proven in one proof
+//! 5. Chunks proven one after another through their boundaries give the model's outputs
 //!
 //! Note: These are slow tests (~50s each) as they generate real cryptographic proofs.
 //! Run with: cargo test --test chunk_proof_test --release -- --nocapture
 
 #[cfg(test)]
 mod tests {
-    use zkml::utils::proving_kzg::prove_chunk_kzg;
+    use zkml::utils::proving_kzg::{prove_chunk_kzg, prove_chunk_multi_kzg};
     use std::fs;
 
     /// Test: Generate and verify a real KZG proof for a chunk
@@ -85,12 +87,12 @@ mod tests {
         );
     }
 
-    /// Test: Chain two chunk proofs via Merkle root
+    /// Test: Expose a previous chunk's Merkle root in a chunk proof
     /// 
-    /// This demonstrates the key distributed proving pattern:
-    /// - Chunk 0 produces a Merkle root as a public output
-    /// - Chunk 1 includes that Merkle root as a public input
-    /// - Verifier can check that chunks are properly linked
+    /// - Chunk 0 is proven on its own
+    /// - Chunk 1 includes a prev_merkle_root as its first public value
+    /// - The circuit does not check the root against chunk 1's input, so any value
+    ///   proves; linking the chunks is up to the verifier
     #[test]
     fn test_chained_chunk_proofs() {
         let config_file = "examples/mnist/model.msgpack";
@@ -136,7 +138,7 @@ mod tests {
             0,     // chunk_start (same layers for simplicity)
             2,     // chunk_end
             false, // use_merkle
-            Some(dummy_prev_root), // This chunk verifies it received correct input from chunk 0
+            Some(dummy_prev_root), // Exposed only; not checked against the input
             params_dir,
         );
         
@@ -158,10 +160,107 @@ mod tests {
             "First public value should be the prev_merkle_root"
         );
         
-        println!("\n✓ Chained proof verification successful!");
+        println!("\n✓ prev_merkle_root exposed as a public value");
         println!("  Chunk 0 public values: {}", chunk0_public_count);
         println!("  Chunk 1 public values: {} (+1 for prev_merkle_root)", chunk1_public_count);
-        println!("  Chain link verified: first public value matches prev_merkle_root");
     }
-}
 
+    /// Test: Prove two inputs of the same chunk in one proof
+    ///
+    /// Each instance must get the public values of its own input, as if it had been
+    /// proven alone.
+    #[test]
+    fn test_multi_input_chunk_proof() {
+        let config_file = "examples/mnist/model.msgpack";
+        let input_file = "examples/mnist/inp.msgpack";
+
+        if !std::path::Path::new(config_file).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+
+        let params_dir = "./params_kzg_multi_test";
+        fs::create_dir_all(params_dir).ok();
+
+        let single = prove_chunk_kzg(config_file, input_file, 0, 2, true, None, params_dir);
+        let multi = prove_chunk_multi_kzg(
+            config_file,
+            &[(input_file, None), (input_file, None)],
+            0,
+            2,
+            true,
+            params_dir,
+        );
+
+        assert!(!multi.proof.is_empty(), "Proof should not be empty");
+        assert_eq!(multi.instances.len(), 2, "Should have one instance per input");
+        for instance in multi.instances.iter() {
+            assert_eq!(instance.public_vals, single.public_vals, "Public values should match");
+            assert_eq!(instance.merkle_root, single.merkle_root, "Merkle root should match");
+        }
+
+        println!("✓ Multi-input proof generated and verified successfully");
+        println!("  Proof size: {} bytes (single input: {})", multi.proof.len(), single.proof.len());
+        println!("  Proving time: {}ms (single input: {}ms)", multi.proving_time_ms, single.proving_time_ms);
+    }
+
+    /// Test: Prove a model chunk by chunk, each chunk from the previous one's boundary
+    ///
+    /// The last chunk's public values must be the outputs of the whole model. Each
+    /// boundary must also equal the one derived from a single evaluation of the model,
+    /// which is what chunks proven in parallel start from.
+    #[test]
+    fn test_chunks_through_boundaries_match_model() {
+        use halo2_proofs::halo2curves::bn256::Fr;
+        use zkml::{
+            model::ModelCircuit,
+            utils::{
+                helpers::get_public_values,
+                loader::{encode_input_msgpack, load_config_msgpack},
+                proving_kzg::ChunkProver,
+                witness::{boundary_from_activations, evaluate_dag, synthesize_witness},
+            },
+        };
+
+        let config_file = "examples/mnist/model.msgpack";
+        let input_file = "examples/mnist/inp.msgpack";
+
+        if !std::path::Path::new(config_file).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+
+        let num_layers = load_config_msgpack(config_file).layers.len();
+        let model = ModelCircuit::<Fr>::generate_from_file(config_file, input_file);
+        let activations = evaluate_dag(&model).unwrap();
+        synthesize_witness(&model, model.k as u32).unwrap();
+        let model_public_vals = get_public_values(&model);
+
+        let dir = std::env::temp_dir().join(format!("zkml_boundary_test_{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        let mut prover = ChunkProver::new("./params_kzg_boundary_test");
+        let mut input = input_file.to_string();
+        let mut start = 0;
+        let mut public_vals = vec![];
+        for end in [2, num_layers / 2, num_layers] {
+            let result = prover.prove(config_file, &input, start, end, false, None);
+            let boundary = encode_input_msgpack(&result.boundary);
+            assert_eq!(
+                boundary,
+                encode_input_msgpack(&boundary_from_activations(&model, &activations, end)),
+                "Boundary after layer {} differs from the evaluated one",
+                end
+            );
+            let path = dir.join(format!("boundary_{}.msgpack", end));
+            fs::write(&path, boundary).unwrap();
+            input = path.to_str().unwrap().to_string();
+            println!("✓ Chunk [{}, {}) proven, k={}", start, end, result.k);
+            start = end;
+            public_vals = result.public_vals;
+        }
+
+        assert_eq!(public_vals, model_public_vals, "Last chunk should output the model's outputs");
+        println!("✓ Chunks through their boundaries give the model's {} outputs", public_vals.len());
+        fs::remove_dir_all(&dir).ok();
+    }
+}
@@ -0,0 +1,32 @@
+//! Tests for the per-proof peak RSS measurement in `utils::helpers`
+//!
+//! The peak counter belongs to the whole process, so a proof's peak is only reported
+//! if no other proof overlapped it. Kept in its own test binary: the proof counter is
+//! process-wide, and tests of one binary run concurrently.
+
+#[cfg(test)]
+mod tests {
+    use zkml::utils::helpers::{peak_rss_bytes, PeakRssScope};
+
+    #[test]
+    fn test_peak_rss_only_for_proofs_that_ran_alone() {
+        let supported = peak_rss_bytes().is_some();
+
+        let alone = PeakRssScope::start();
+        assert_eq!(alone.peak_rss_bytes().is_some(), supported);
+        drop(alone);
+
+        // Both measurements are void once the proofs overlap, even after one ends
+        let first = PeakRssScope::start();
+        let second = PeakRssScope::start();
+        assert_eq!(first.peak_rss_bytes(), None);
+        assert_eq!(second.peak_rss_bytes(), None);
+        drop(second);
+        assert_eq!(first.peak_rss_bytes(), None);
+        drop(first);
+
+        // A proof that starts after they ended is measured again
+        let next = PeakRssScope::start();
+        assert_eq!(next.peak_rss_bytes().is_some(), supported);
+    }
+}
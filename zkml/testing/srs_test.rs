@@ -0,0 +1,72 @@
+//! Tests for the shared KZG setup in `utils::srs`
+//!
+//! Params for every k must come from the master SRS: deriving them has to give exactly
+//! what `downsize` gives on the full master params, and a `{k}.params` left over from a
+//! different setup must not be used.
+
+#[cfg(test)]
+mod tests {
+    use std::{fs, path::PathBuf};
+
+    use halo2_proofs::{
+        halo2curves::bn256::Bn256,
+        poly::{commitment::Params, kzg::commitment::ParamsKZG},
+    };
+    use zkml::utils::srs::{load_params, master_srs_path, MasterSrs};
+
+    const MASTER_K: u32 = 5;
+
+    fn to_bytes(params: &ParamsKZG<Bn256>) -> Vec<u8> {
+        let mut bytes = vec![];
+        params.write(&mut bytes).unwrap();
+        bytes
+    }
+
+    // A params dir holding a freshly generated master SRS
+    fn params_dir(name: &str) -> (PathBuf, ParamsKZG<Bn256>) {
+        let dir = std::env::temp_dir().join(format!("zkml_srs_test_{}_{}", name, std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        let master = ParamsKZG::<Bn256>::setup(MASTER_K, rand::thread_rng());
+        fs::write(master_srs_path(dir.to_str().unwrap()), to_bytes(&master)).unwrap();
+        (dir, master)
+    }
+
+    #[test]
+    fn test_derive_matches_downsize() {
+        let (dir, master) = params_dir("derive");
+        let srs = MasterSrs::open(&master_srs_path(dir.to_str().unwrap())).unwrap();
+        assert_eq!(srs.k(), MASTER_K);
+
+        for k in 1..=MASTER_K {
+            let mut expected = master.clone();
+            expected.downsize(k);
+            let derived = to_bytes(&srs.derive(k).unwrap());
+            assert_eq!(derived, to_bytes(&expected), "derive({}) differs from downsize", k);
+            assert!(srs.derived(k, &derived));
+        }
+        assert!(srs.derive(MASTER_K + 1).is_err());
+        fs::remove_dir_all(&dir).ok();
+    }
+
+    #[test]
+    fn test_load_params_replaces_params_from_another_setup() {
+        let (dir, mut master) = params_dir("legacy");
+        let params_dir = dir.to_str().unwrap();
+        let k = 3;
+        master.downsize(k);
+        let expected = to_bytes(&master);
+
+        // Left over from an older setup
+        let legacy = to_bytes(&ParamsKZG::<Bn256>::setup(k, rand::thread_rng()));
+        let path = dir.join(format!("{}.params", k));
+        fs::write(&path, &legacy).unwrap();
+        let srs = MasterSrs::open(&master_srs_path(params_dir)).unwrap();
+        assert!(!srs.derived(k, &legacy));
+
+        assert_eq!(to_bytes(&load_params(params_dir, k).unwrap()), expected);
+        assert_eq!(fs::read(&path).unwrap(), expected);
+        // The rewritten file is used as is
+        assert_eq!(to_bytes(&load_params(params_dir, k).unwrap()), expected);
+        fs::remove_dir_all(&dir).ok();
+    }
+}
@@ -4,6 +4,7 @@
 //! 1. When a circuit is configured for chunk execution with Merkle, the Merkle root is computed
 //! 2. The Merkle root is added to public values (verified by comparing with/without Merkle)
 //! 3. The circuit can be verified with MockProver using the public values
+//! 4. Circuits synthesized concurrently each get their own public values
 
 #[cfg(test)]
 mod tests {
@@ -13,6 +14,7 @@ mod tests {
         utils::{
             helpers::get_public_values,
             loader::load_model_msgpack,
+            witness::synthesize_witness,
         },
     };
 
@@ -52,7 +54,7 @@ mod tests {
             eprintln!("Skipping test: MockProver failed for baseline: {:?}", e);
             return;
         }
-        let public_vals_no_merkle: Vec<Fr> = get_public_values();
+        let public_vals_no_merkle: Vec<Fr> = get_public_values(&circuit_no_merkle);
         let count_without_merkle = public_vals_no_merkle.len();
         println!("Public values WITHOUT Merkle: {}", count_without_merkle);
         
@@ -76,7 +78,7 @@ mod tests {
             return;
         }
         
-        let public_vals_with_merkle: Vec<Fr> = get_public_values();
+        let public_vals_with_merkle: Vec<Fr> = get_public_values(&circuit_with_merkle);
         let count_with_merkle = public_vals_with_merkle.len();
         println!("Public values WITH Merkle: {}", count_with_merkle);
         
@@ -134,7 +136,7 @@ mod tests {
         }
         let _prover1 = prover1_result.unwrap();
         
-        let public_vals = get_public_values();
+        let public_vals = get_public_values(&circuit);
         
         let prover2 = MockProver::run(config.k.try_into().unwrap(), &circuit, vec![public_vals])
             .expect("Failed to run MockProver with public values");
@@ -180,7 +182,7 @@ mod tests {
         }
         let _prover1 = prover1_result.unwrap();
         
-        let public_vals = get_public_values();
+        let public_vals = get_public_values(&circuit);
         
         let prover2 = MockProver::run(config.k.try_into().unwrap(), &circuit, vec![public_vals])
             .expect("Failed to run MockProver with public values");
@@ -188,5 +190,56 @@ mod tests {
         assert_eq!(prover2.verify(), Ok(()), "Chunk execution without Merkle should work");
         println!("✓ Chunk execution without Merkle works");
     }
-}
 
+    /// Test that public values are per circuit: chunks with and without Merkle,
+    /// synthesized on separate threads, match their sequentially computed values.
+    #[test]
+    fn test_concurrent_synthesis_public_values() {
+        let config_file = "examples/mnist/model.msgpack";
+        let input_file = "examples/mnist/inp.msgpack";
+
+        if !std::path::Path::new(config_file).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+
+        let config = load_model_msgpack(config_file, input_file);
+        let k: u32 = config.k.try_into().unwrap();
+        let chunk_end = std::cmp::min(2, config.layers.len());
+
+        let circuits: Vec<ModelCircuit<Fr>> = [false, true]
+            .iter()
+            .map(|&use_merkle| {
+                let mut circuit = ModelCircuit::<Fr>::generate_from_file(config_file, input_file);
+                circuit.set_chunk_config(0, chunk_end, use_merkle);
+                circuit
+            })
+            .collect();
+
+        let expected: Vec<Vec<Fr>> = circuits
+            .iter()
+            .map(|circuit| {
+                let circuit = circuit.clone();
+                synthesize_witness(&circuit, k).expect("witness synthesis failed");
+                get_public_values(&circuit)
+            })
+            .collect();
+
+        let concurrent: Vec<Vec<Fr>> = std::thread::scope(|scope| {
+            let handles: Vec<_> = circuits
+                .iter()
+                .map(|circuit| {
+                    scope.spawn(move || {
+                        synthesize_witness(circuit, k).expect("witness synthesis failed");
+                        get_public_values(circuit)
+                    })
+                })
+                .collect();
+            handles.into_iter().map(|h| h.join().unwrap()).collect()
+        });
+
+        assert_eq!(concurrent, expected, "Concurrent synthesis should not mix public values");
+        assert_eq!(concurrent[1].len(), concurrent[0].len() + 1, "Merkle root should be added");
+        println!("✓ Concurrent synthesis keeps public values per circuit");
+    }
+}
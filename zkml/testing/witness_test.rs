@@ -0,0 +1,230 @@
+//! Tests for the witness-only synthesis in `utils::witness`
+//!
+//! `WitnessCollector` replaces `MockProver` for computing public values and counting
+//! rows, so both must agree on every circuit the provers build: the whole model and
+//! chunks, including a chunk that starts from the previous chunk's boundary. The
+//! checked pass must also catch lookup inputs that a smaller k's tables can't hold, and
+//! `evaluate_dag` must compute the values the circuit makes public.
+
+#[cfg(test)]
+mod tests {
+    use halo2_proofs::{
+        dev::{CellValue, MockProver},
+        halo2curves::bn256::Fr,
+        plonk::{Circuit, ConstraintSystem, Error},
+    };
+    use zkml::{
+        model::ModelCircuit,
+        utils::{
+            helpers::get_public_values,
+            loader::{encode_input_msgpack, load_config_msgpack, TensorMsgpack},
+            proving_kzg::ChunkProver,
+            witness::{
+                boundary_from_activations, evaluate_dag, min_k_for_rows, synthesize_witness,
+                synthesize_witness_checked, Activations,
+            },
+        },
+    };
+
+    const CONFIG_FILE: &str = "examples/mnist/model.msgpack";
+    const INPUT_FILE: &str = "examples/mnist/inp.msgpack";
+
+    // Rows assigned in the circuit's advice columns, read back from a MockProver run
+    fn mock_rows_used(mock: &MockProver<Fr>, circuit: &ModelCircuit<Fr>) -> usize {
+        let mut cs = ConstraintSystem::<Fr>::default();
+        let config = ModelCircuit::<Fr>::configure_with_params(&mut cs, circuit.params());
+        config
+            .gadget_config
+            .columns
+            .iter()
+            .filter_map(|col| {
+                mock.advice_values(*col)
+                    .iter()
+                    .rposition(|cell| matches!(cell, CellValue::Assigned(_)))
+            })
+            .map(|row| row + 1)
+            .max()
+            .unwrap_or(0)
+    }
+
+    // Assert that the witness pass and MockProver agree on `circuit`
+    fn assert_matches_mock_prover(circuit: &ModelCircuit<Fr>, name: &str) {
+        let k = circuit.k as u32;
+
+        let mock_circuit = circuit.clone();
+        let mock = MockProver::run(k, &mock_circuit, vec![vec![]]).unwrap();
+        let mock_public_vals = get_public_values(&mock_circuit);
+        let mock_rows = mock_rows_used(&mock, &mock_circuit);
+
+        let witness_circuit = circuit.clone();
+        let rows = synthesize_witness(&witness_circuit, k).unwrap();
+        let public_vals = get_public_values(&witness_circuit);
+
+        assert!(!public_vals.is_empty(), "{}: no public values", name);
+        assert_eq!(public_vals, mock_public_vals, "{}: public values differ", name);
+        assert_eq!(rows, mock_rows, "{}: rows used differ", name);
+        println!("✓ {}: {} public values, {} rows", name, public_vals.len(), rows);
+    }
+
+    // Public values of the tensors `idxes` in `activations`, as the circuit assigns them
+    fn public_values_of(activations: &Activations, idxes: &[usize]) -> Vec<Fr> {
+        idxes
+            .iter()
+            .flat_map(|idx| activations[idx].iter())
+            .map(|val| {
+                let abs = Fr::from(val.unsigned_abs());
+                if *val < 0 {
+                    -abs
+                } else {
+                    abs
+                }
+            })
+            .collect()
+    }
+
+    #[test]
+    fn test_witness_pass_matches_mock_prover() {
+        if !std::path::Path::new(CONFIG_FILE).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+        let num_layers = load_config_msgpack(CONFIG_FILE).layers.len();
+        let split = 2.min(num_layers - 1);
+
+        // Whole model
+        let circuit = ModelCircuit::<Fr>::generate_from_file(CONFIG_FILE, INPUT_FILE);
+        assert_matches_mock_prover(&circuit, "model");
+
+        // First chunk, with a Merkle root
+        let mut prover = ChunkProver::new("./params_kzg_witness_test");
+        let first = prover.build_circuit(CONFIG_FILE, INPUT_FILE, 0, split, true, None);
+        assert_matches_mock_prover(&first, "chunk 0");
+
+        // Second chunk, from the first chunk's boundary
+        synthesize_witness(&first, first.k as u32).unwrap();
+        let dir = std::env::temp_dir().join(format!("zkml_witness_test_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let boundary_path = dir.join("boundary.msgpack");
+        std::fs::write(&boundary_path, encode_input_msgpack(&first.boundary.get())).unwrap();
+        let second = prover.build_circuit(
+            CONFIG_FILE,
+            boundary_path.to_str().unwrap(),
+            split,
+            num_layers,
+            false,
+            None,
+        );
+        assert_matches_mock_prover(&second, "chunk 1");
+        std::fs::remove_dir_all(&dir).ok();
+    }
+
+    #[test]
+    fn test_k_holds_fused_relu_pre_activations() {
+        if !std::path::Path::new(CONFIG_FILE).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+        // Conv2D [1, 3, 3, 4] -> [1, 1, 1, 64] with a fused ReLU6: its outputs stay in
+        // [0, 6 * scale factor] however large the pre-activations get
+        let (layer, inp_idx, outp_idx) = (14, 35, 36usize);
+        let config = load_config_msgpack(CONFIG_FILE);
+        assert_eq!(config.layers[layer].layer_type, "Conv2D");
+        assert_eq!(config.layers[layer].inp_idxes[0], inp_idx);
+
+        let dir = std::env::temp_dir().join(format!("zkml_relu_k_test_{}", std::process::id()));
+        std::fs::create_dir_all(&dir).unwrap();
+        let inp_path = dir.join("inp.msgpack");
+        let mut prover = ChunkProver::new(dir.join("params").to_str().unwrap());
+        prover.set_key_cache(false);
+        let mut circuit_for = |value: i64| {
+            let inp = TensorMsgpack {
+                idx: inp_idx,
+                shape: vec![1, 3, 3, 4],
+                data: vec![value; 36],
+            };
+            std::fs::write(&inp_path, encode_input_msgpack(&vec![inp])).unwrap();
+            let inp_path = inp_path.to_str().unwrap();
+            prover.build_circuit(CONFIG_FILE, inp_path, layer, layer + 1, false, None)
+        };
+
+        // The largest input the model's own k holds, so the pre-activations come close
+        // to the edge of its lookup range
+        let model_k = circuit_for(1).k as u32;
+        let fits =
+            |circuit: &ModelCircuit<Fr>| synthesize_witness_checked(circuit, model_k).is_ok();
+        assert!(fits(&circuit_for(1)));
+        let (mut lo, mut hi) = (1, 1 << model_k);
+        assert!(!fits(&circuit_for(hi)));
+        while hi - lo > 1 {
+            let mid = (lo + hi) / 2;
+            if fits(&circuit_for(mid)) {
+                lo = mid;
+            } else {
+                hi = mid;
+            }
+        }
+        // Also leaves this input in `inp_path` for the proof below
+        let mut circuit = circuit_for(lo);
+
+        let activations = evaluate_dag(&circuit).unwrap();
+        let max_outp = activations[&outp_idx].iter().map(|x| x.abs()).max().unwrap();
+        assert!(max_outp <= 6 * circuit.gadget_config.scale_factor as i64);
+
+        // The rows fit in fewer rows than the model's k, but the pre-activations don't fit
+        // in those tables
+        let rows_k = min_k_for_rows(&circuit).unwrap();
+        assert!(rows_k < model_k, "chunk needs k={} for its rows", rows_k);
+        circuit.set_k(rows_k as usize);
+        assert!(synthesize_witness(&circuit, rows_k).is_ok());
+        assert!(matches!(
+            synthesize_witness_checked(&circuit, rows_k),
+            Err(Error::ConstraintSystemFailure)
+        ));
+
+        // The prover raises k until they do, so the proof verifies
+        let inp_path = inp_path.to_str().unwrap();
+        let result = prover.prove(CONFIG_FILE, inp_path, layer, layer + 1, false, None);
+        assert!(result.k > rows_k);
+        println!("✓ rows fit k={}, pre-activations need k={}", rows_k, result.k);
+        std::fs::remove_dir_all(&dir).ok();
+    }
+
+    #[test]
+    fn test_evaluate_dag_matches_public_values() {
+        if !std::path::Path::new(CONFIG_FILE).exists() {
+            eprintln!("Skipping test: example files not found");
+            return;
+        }
+        let config = load_config_msgpack(CONFIG_FILE);
+        let split = 2.min(config.layers.len() - 1);
+
+        // Whole model: its outputs are the public values
+        let circuit = ModelCircuit::<Fr>::generate_from_file(CONFIG_FILE, INPUT_FILE);
+        let activations = evaluate_dag(&circuit).unwrap();
+        synthesize_witness(&circuit, circuit.k as u32).unwrap();
+        let out_idxes: Vec<usize> = config.out_idxes.iter().map(|idx| *idx as usize).collect();
+        assert_eq!(public_values_of(&activations, &out_idxes), get_public_values(&circuit));
+
+        // A chunk makes its last layer's outputs public, and hands on the boundary that
+        // the whole model's activations give
+        let mut prover = ChunkProver::new("./params_kzg_witness_test");
+        let chunk = prover.build_circuit(CONFIG_FILE, INPUT_FILE, 0, split, false, None);
+        let chunk_activations = evaluate_dag(&chunk).unwrap();
+        synthesize_witness(&chunk, chunk.k as u32).unwrap();
+        let last_out_idxes: Vec<usize> =
+            config.layers[split - 1].out_idxes.iter().map(|idx| *idx as usize).collect();
+        assert_eq!(
+            public_values_of(&chunk_activations, &last_out_idxes),
+            get_public_values(&chunk)
+        );
+        assert_eq!(
+            public_values_of(&activations, &last_out_idxes),
+            get_public_values(&chunk)
+        );
+        assert_eq!(
+            encode_input_msgpack(&boundary_from_activations(&circuit, &activations, split)),
+            encode_input_msgpack(&chunk.boundary.get())
+        );
+        println!("✓ evaluate_dag agrees with the public values and chunk boundary");
+    }
+}